@@ -0,0 +1,198 @@
+"""
+Benchmarks for the Terralith biome remapper.
+
+Usage:
+  python terralith_biome_remap_benchmark.py executors "C:\\path\\to\\world" [--repeat 3] [--write] [remapper flags...]
+  python terralith_biome_remap_benchmark.py chunk-order "C:\\path\\to\\world" [--regions 8] [--repeat 3]
+
+executors:
+  Runs the same world through each --executor backend (process, thread, serial)
+  and prints the wall time per backend. Runs use --dry-run unless --write is
+  given, in which case every run works on a fresh temporary copy of the region
+  folder (without backups). Every run uses --incremental off, so an earlier
+  run's manifest never lets it skip regions. Any flags not listed here (eg
+  --processes 8, --pipeline) are passed through to the remapper.
+
+chunk-order:
+  Copies the largest regions of the world into a temporary folder with their
+  chunks stored in shuffled order, like a region that the game has rewritten
+  many times. It then times reading every chunk in chunk index order against
+  sector offset order. The page cache is dropped before each pass
+  (posix_fadvise, Linux and most Unixes), so the numbers show cold reads.
+  Elsewhere, or on a RAM disk, both orders read from memory. Run it with the
+  temporary folder on the disk you care about (set TMPDIR).
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import terralith_biome_remap_standalone as core
+
+
+def _timed_run(argv: List[str]) -> float:
+    lines: List[str] = []
+    started = time.perf_counter()
+    core.run(argv, log=lines.append)
+    elapsed = time.perf_counter() - started
+    for line in lines:
+        if line.startswith("ERROR"):
+            print(f"    {line}")
+    return elapsed
+
+
+def bench_executors(world: Path, dimension: str, repeat: int, write: bool, extra: List[str]) -> None:
+    region_dir = core._region_dir(world, dimension)
+    if not region_dir.exists():
+        raise SystemExit(f"Region folder not found: {region_dir}")
+    n_regions = len(list(region_dir.glob("r.*.*.mca")))
+    print(f"Region folder: {region_dir} ({n_regions} regions)")
+    print(f"Mode: {'write (temporary copies)' if write else 'dry-run'}; repeat {repeat}; extra flags: {' '.join(extra) or '-'}")
+
+    times: Dict[str, List[float]] = {}
+    for executor in core.EXECUTORS:
+        times[executor] = []
+        for i in range(repeat):
+            if write:
+                with tempfile.TemporaryDirectory(prefix="tbr-bench-") as tmp:
+                    copy = Path(tmp) / "region"
+                    shutil.copytree(region_dir, copy, ignore=shutil.ignore_patterns(core.MANIFEST_NAME))
+                    argv = [tmp, "--dimension", str(copy), "--executor", executor, "--no-backup", "--incremental", "off"] + extra
+                    elapsed = _timed_run(argv)
+            else:
+                argv = [str(world), "--dimension", str(region_dir), "--executor", executor, "--dry-run", "--incremental", "off"] + extra
+                elapsed = _timed_run(argv)
+            times[executor].append(elapsed)
+            print(f"  {executor:<8} run {i + 1}/{repeat}: {elapsed:.2f}s")
+
+    print()
+    print(f"{'executor':<10}{'best':>10}{'median':>10}{'regions/s':>12}")
+    for executor, runs in times.items():
+        best = min(runs)
+        print(f"{executor:<10}{best:>9.2f}s{statistics.median(runs):>9.2f}s{n_regions / best:>12.1f}")
+
+
+def _fragment_region(src: Path, dst: Path, rng: random.Random) -> int:
+    """Copy a region with its chunks stored in shuffled order; returns the number of chunks."""
+    with core._map_region(src) as original:
+        ptrs = list(core._iter_present_chunks(original))
+        rng.shuffle(ptrs)
+        header = bytearray(core.HEADER_BYTES)
+        header[core.SECTOR_BYTES :] = original[core.SECTOR_BYTES : core.HEADER_BYTES]
+        sector = 2
+        with open(dst, "wb") as f:
+            f.write(bytes(core.HEADER_BYTES))
+            for ptr in ptrs:
+                start = ptr.off_sectors * core.SECTOR_BYTES
+                data = bytes(original[start : start + ptr.sector_count * core.SECTOR_BYTES])
+                f.write(data.ljust(ptr.sector_count * core.SECTOR_BYTES, b"\0"))
+                header[ptr.idx * 4 : ptr.idx * 4 + 4] = ((sector << 8) | ptr.sector_count).to_bytes(4, "big")
+                sector += ptr.sector_count
+            f.seek(0)
+            f.write(header)
+    return len(ptrs)
+
+
+def _drop_cache(path: Path) -> bool:
+    """Evict a file from the page cache. Returns False where that is not supported."""
+    if not hasattr(os, "posix_fadvise"):
+        return False
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)  # dirty pages stay cached
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+    return True
+
+
+def _read_chunks(path: Path, by_offset: bool) -> int:
+    """Read and decompress every chunk of a region in the given order; returns the bytes read."""
+    total = 0
+    with core._map_region(path) as original:
+        ptrs = core._iter_present_chunks(original)
+        if not by_offset:
+            ptrs = sorted(ptrs, key=lambda p: p.idx)
+        for ptr in ptrs:
+            blob = core._get_chunk_blob(original, ptr.off_sectors, ptr.sector_count)
+            if blob is not None:
+                core._decompress_chunk_nbt(blob)
+                total += len(blob)
+            del blob
+    return total
+
+
+def bench_chunk_order(world: Path, dimension: str, n_regions: int, repeat: int, seed: int) -> None:
+    region_dir = core._region_dir(world, dimension)
+    if not region_dir.exists():
+        raise SystemExit(f"Region folder not found: {region_dir}")
+    regions = sorted(region_dir.glob("r.*.*.mca"), key=lambda p: p.stat().st_size, reverse=True)[:n_regions]
+    if not regions:
+        raise SystemExit(f"No region files found in: {region_dir}")
+    rng = random.Random(seed)
+
+    with tempfile.TemporaryDirectory(prefix="tbr-bench-") as tmp:
+        copies = [Path(tmp) / p.name for p in regions]
+        n_chunks = sum(_fragment_region(src, dst, rng) for src, dst in zip(regions, copies))
+        mib = sum(p.stat().st_size for p in copies) / (1024 * 1024)
+        cold = all([_drop_cache(p) for p in copies])
+        print(f"Fragmented copies: {len(copies)} regions, {n_chunks} chunks, {mib:.1f} MiB in {tmp}")
+        print(f"Page cache: {'dropped before each pass' if cold else 'cannot be dropped here; timings are warm'}")
+
+        times: Dict[str, List[float]] = {"index": [], "sector": []}
+        for i in range(repeat):
+            for order in times:
+                for p in copies:
+                    _drop_cache(p)
+                started = time.perf_counter()
+                for p in copies:
+                    _read_chunks(p, order == "sector")
+                elapsed = time.perf_counter() - started
+                times[order].append(elapsed)
+                print(f"  {order:<7} order run {i + 1}/{repeat}: {elapsed:.2f}s")
+
+    print()
+    print(f"{'order':<10}{'best':>10}{'median':>10}{'MiB/s':>10}")
+    for order, runs in times.items():
+        best = min(runs)
+        print(f"{order:<10}{best:>9.2f}s{statistics.median(runs):>9.2f}s{mib / best:>10.1f}")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks for the Terralith biome remapper.")
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p = sub.add_parser("executors", help="Compare the process, thread and serial executors on one world.")
+    p.add_argument("world", type=str, help="Path to the Minecraft world folder (contains region/).")
+    p.add_argument("--dimension", type=str, default="overworld", help="overworld|nether|end|or explicit region folder path.")
+    p.add_argument("--repeat", type=int, default=3, help="Runs per executor (default: 3).")
+    p.add_argument("--write", action="store_true", help="Write changes to temporary copies instead of using --dry-run.")
+
+    p = sub.add_parser("chunk-order", help="Compare cold reads of a fragmented region in index and sector order.")
+    p.add_argument("world", type=str, help="Path to the Minecraft world folder (contains region/).")
+    p.add_argument("--dimension", type=str, default="overworld", help="overworld|nether|end|or explicit region folder path.")
+    p.add_argument("--regions", type=int, default=8, help="Largest N regions to copy and fragment (default: 8).")
+    p.add_argument("--repeat", type=int, default=3, help="Runs per order (default: 3).")
+    p.add_argument("--seed", type=int, default=1, help="Shuffle seed for the fragmented layout (default: 1).")
+
+    args, extra = parser.parse_known_args(list(argv) if argv is not None else None)
+    if args.bench == "executors":
+        bench_executors(Path(args.world), args.dimension, max(1, args.repeat), args.write, extra)
+    elif args.bench == "chunk-order":
+        if extra:
+            parser.error(f"unrecognized arguments: {' '.join(extra)}")
+        bench_chunk_order(Path(args.world), args.dimension, max(1, args.regions), max(1, args.repeat), args.seed)
+    return 0
+
+
+if __name__ == "__main__":
+    core.multiprocessing.freeze_support()
+    raise SystemExit(main())
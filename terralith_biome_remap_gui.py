@@ -5,7 +5,7 @@ import queue
 import re
 import threading
 import tkinter as tk
-from tkinter import filedialog, ttk
+from tkinter import filedialog, messagebox, ttk
 from pathlib import Path
 import sys
 import webbrowser
@@ -68,7 +68,8 @@ class App(tk.Tk):
         # Start blank. If blank, the program uses the built-in default mapping.
         self.mapping_ini = tk.StringVar(value="")
         self.dimension = tk.StringVar(value="overworld")
-        self.processes = tk.IntVar(value=(os.cpu_count() or 1))
+        # "auto" lets the remapper size the pool (usable CPUs, lowered to fit the memory budget).
+        self.processes = tk.StringVar(value="auto")
         self.backups = tk.BooleanVar(value=True)
         self.dry_run = tk.BooleanVar(value=False)
         self.unmapped_fallback = tk.StringVar(value="")
@@ -290,7 +291,11 @@ class App(tk.Tk):
             "  [mapping]\n"
             "  from_namespace:biome = to_namespace:biome\n"
             "Example:\n"
-            "  terralith:yellowstone = minecraft:badlands",
+            "  terralith:yellowstone = minecraft:badlands\n"
+            "Wildcards and regexes are allowed as keys:\n"
+            "  mymod:* = minecraft:plains\n"
+            "  terralith:cave/* = minecraft:dripstone_caves\n"
+            "  ^mymod:.*_ocean$ = minecraft:ocean",
         )
         row2 = ttk.Frame(lf_map)
         row2.grid(row=1, column=0, sticky="ew", pady=(4, 6))
@@ -347,20 +352,24 @@ class App(tk.Tk):
         row4.grid(row=3, column=0, sticky="ew", pady=(6, 0))
         row4.columnconfigure(1, weight=1)
         cpu_threads = max(1, os.cpu_count() or 1)
+        usable_threads = core.available_cpu_count()
         workers_label = ttk.Label(row4, text="Workers (CPU threads)")
         workers_label.grid(row=0, column=0, sticky="w")
-        workers_spin = ttk.Spinbox(row4, from_=1, to=cpu_threads, textvariable=self.processes)
+        workers_spin = ttk.Spinbox(
+            row4, values=["auto", *range(1, usable_threads + 1)], textvariable=self.processes, wrap=False
+        )
         workers_spin.grid(row=0, column=1, sticky="ew", padx=(6, 0))
         add_tooltip(
             workers_label,
             f"How many worker processes to use.\n"
-            f"This is typically set to your CPU logical thread count.\n"
-            f"Detected CPU threads: {cpu_threads}",
+            f"auto (default) uses the CPU threads this app may use (CPU affinity and container limits),\n"
+            f"lowered if needed so the workers fit in memory.\n"
+            f"Detected CPU threads: {cpu_threads} (usable: {usable_threads})",
         )
         add_tooltip(
             workers_spin,
-            f"How many worker processes to use.\n"
-            f"Detected CPU threads: {cpu_threads}",
+            f"How many worker processes to use, or auto.\n"
+            f"Detected CPU threads: {cpu_threads} (usable: {usable_threads})",
         )
 
         # Y filter (optional)
@@ -407,7 +416,10 @@ class App(tk.Tk):
         actions.columnconfigure(0, weight=1)
         self.start_btn = ttk.Button(actions, text="Run", command=self._start)
         self.start_btn.grid(row=0, column=0, sticky="ew")
-        ttk.Button(actions, text="Clear output", command=self._clear_output).grid(row=1, column=0, sticky="ew", pady=(6, 0))
+        self.restore_btn = ttk.Button(actions, text="Restore backups", command=self._start_restore)
+        self.restore_btn.grid(row=1, column=0, sticky="ew", pady=(6, 0))
+        add_tooltip(self.restore_btn, "Put back the .bak files and delta journals of earlier runs on this dimension")
+        ttk.Button(actions, text="Clear output", command=self._clear_output).grid(row=2, column=0, sticky="ew", pady=(6, 0))
 
         # Bottom: progress bar
         bottom = ttk.Frame(root)
@@ -474,6 +486,7 @@ class App(tk.Tk):
         self._is_running.set(running)
         state = "disabled" if running else "normal"
         self.start_btn.configure(state=state)
+        self.restore_btn.configure(state=state)
         if running:
             self.progress.configure(mode="indeterminate")
             self.progress["value"] = 0
@@ -492,7 +505,7 @@ class App(tk.Tk):
             self._append_output("ERROR: Please select a world folder.")
             return
 
-        argv: list[str] = [world, "--dimension", self.dimension.get(), "--processes", str(int(self.processes.get()))]
+        argv: list[str] = [world, "--dimension", self.dimension.get(), "--processes", self.processes.get().strip() or "auto"]
 
         if self.dry_run.get():
             argv.append("--dry-run")
@@ -527,6 +540,29 @@ class App(tk.Tk):
 
         # Debug options are intentionally CLI-only.
 
+        self._launch(argv)
+
+    def _start_restore(self) -> None:
+        if self._worker_thread and self._worker_thread.is_alive():
+            return
+
+        world = self.world_path.get().strip()
+        if not world:
+            self._append_output("ERROR: Please select a world folder.")
+            return
+
+        argv: list[str] = [world, "--dimension", self.dimension.get(), "--processes", self.processes.get().strip() or "auto", "--restore"]
+        if self.dry_run.get():
+            argv.append("--dry-run")
+        elif not messagebox.askyesno(
+            "Restore backups",
+            "Replace the remapped region files of this dimension with their backups?\n\nClose the world in Minecraft first.",
+        ):
+            return
+
+        self._launch(argv)
+
+    def _launch(self, argv: list[str]) -> None:
         self._append_output("Running with args: " + " ".join(argv))
         self._set_running(True)
 
@@ -534,6 +570,8 @@ class App(tk.Tk):
             try:
                 rc = core.run(argv, log=self._log_queue.put)
                 self._log_queue.put(f"Done. Exit code: {rc}")
+            except SystemExit as e:
+                self._log_queue.put(f"ERROR: {e}")
             except Exception as e:
                 self._log_queue.put(f"ERROR: {type(e).__name__}: {e}")
             finally:
@@ -22,20 +22,35 @@ from __future__ import annotations
 
 import argparse
 import ast
+import base64
 import configparser
+import contextlib
+import fnmatch
+import functools
+import gc
+import hashlib
+import heapq
 import io
+import itertools
+import json
 import math
+import mmap
 import os
+import queue
+import shutil
 import sys
 import re
 import struct
+import threading
 import time
+import types
 import zlib
 import gzip
-from concurrent.futures import ProcessPoolExecutor, as_completed
-from dataclasses import dataclass
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+from collections import OrderedDict, deque
 from collections.abc import MutableSequence
 import multiprocessing
 
@@ -135,6 +150,11 @@ def _load_mapping_from_ini(ini_path: Path) -> Dict[str, str]:
       [mapping]
       terralith:alpha_islands = minecraft:mushroom_fields
       terralith:cave/mantle_caves = minecraft:dripstone_caves
+
+    Keys may also be rules (see BiomeMatcher):
+      mymod:* = minecraft:plains                       (whole namespace)
+      terralith:cave/* = minecraft:dripstone_caves     (path prefix)
+      ^mymod:.*_ocean$ = minecraft:ocean               (regex, matched against the full id)
     """
     fallback = {"terralith:yellowstone": "minecraft:badlands"}
     if not ini_path.exists():
@@ -307,6 +327,171 @@ def _default_mapping_ini_path() -> Path:
     return Path(__file__).resolve().parent / "mapping.ini"
 
 
+# --- Compiled mapping ---------------------------------------------------------
+# Mapping keys are exact biome ids by default. A key ending in "*" is a prefix
+# rule ("mymod:*" for a whole namespace, "terralith:cave/*" for a path prefix),
+# other "*" globs are allowed too, and a key starting with "^" is a regex that
+# must match the whole (normalized) biome id.
+#
+# Precedence: exact id, then the longest matching prefix, then regex/glob rules
+# in file order, then the --unmapped-terralith-to fallback.
+
+MATCHER_CACHE_SIZE = 65536
+PALETTE_CACHE_SIZE = 4096
+
+# Per-process registry so a matcher shipped to a worker process is rebuilt once and
+# keeps its warm caches across all region tasks that worker runs.
+_MATCHER_REGISTRY: Dict[Tuple, "BiomeMatcher"] = {}
+
+
+class BiomeMatcher:
+    def __init__(
+        self,
+        mapping: Dict[str, str],
+        unmapped_terralith_to: Optional[str] = None,
+        cache_size: int = MATCHER_CACHE_SIZE,
+        palette_cache_size: int = PALETTE_CACHE_SIZE,
+    ) -> None:
+        self.rules: Tuple[Tuple[str, str], ...] = tuple(mapping.items())
+        self.unmapped_terralith_to = unmapped_terralith_to
+        self.cache_size = max(1, int(cache_size))
+        self.palette_cache_size = max(0, int(palette_cache_size))
+
+        self.exact: Dict[str, str] = {}
+        prefixes: List[Tuple[str, str]] = []
+        self.patterns: List[Tuple["re.Pattern[str]", str]] = []
+        for key, target in self.rules:
+            if key.startswith("^"):
+                try:
+                    self.patterns.append((re.compile(key), target))
+                except re.error as e:
+                    raise ValueError(f"Invalid regex mapping rule {key!r}: {e}") from None
+            elif key.endswith("*") and "*" not in key[:-1] and "?" not in key and "[" not in key:
+                prefixes.append((key[:-1], target))
+            elif any(c in key for c in "*?["):
+                self.patterns.append((re.compile(fnmatch.translate(key)), target))
+            else:
+                self.exact[key] = target
+        # Longest prefix wins; the sort is stable so equal-length prefixes keep file order.
+        self.prefixes: List[Tuple[str, str]] = sorted(prefixes, key=lambda r: -len(r[0]))
+
+        # raw palette string -> replacement (None = leave as-is)
+        self._cache: Dict[str, Optional[str]] = {}
+        # LRU: whole palette (tuple of raw strings) -> (replacement per entry, change count).
+        # Biome palettes are tiny and repeat across sections and chunks.
+        self._palette_cache: "OrderedDict[Tuple[str, ...], Tuple[Tuple[Optional[str], ...], int]]" = OrderedDict()
+        self.palette_hits = 0
+        self.palette_misses = 0
+        # Interned replacement tags for the nbtlib path.
+        self._nbt_strings: Dict[str, nbtlib.String] = {}
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def __reduce__(self):
+        return (_restore_matcher, (self.rules, self.unmapped_terralith_to, self.cache_size, self.palette_cache_size))
+
+    def copy(self) -> "BiomeMatcher":
+        """Same rules, empty caches and counters (for a worker thread of its own)."""
+        return BiomeMatcher(dict(self.rules), self.unmapped_terralith_to, self.cache_size, self.palette_cache_size)
+
+    def describe(self) -> str:
+        return f"{len(self.exact)} exact, {len(self.prefixes)} prefix, {len(self.patterns)} regex/glob"
+
+    def _lookup(self, norm: str) -> Optional[str]:
+        new = self.exact.get(norm)
+        if new:
+            return new
+        for prefix, target in self.prefixes:
+            if norm.startswith(prefix):
+                return target
+        for pattern, target in self.patterns:
+            if pattern.fullmatch(norm):
+                return target
+        if self.unmapped_terralith_to and norm.startswith("terralith:"):
+            return self.unmapped_terralith_to
+        return None
+
+    def resolve(self, raw: str) -> Optional[str]:
+        """Return the replacement for a raw palette entry, or None if it should stay as-is."""
+        try:
+            return self._cache[raw]
+        except KeyError:
+            pass
+        norm = _normalize_biome_name(raw)
+        new = self._lookup(norm)
+        if not new or new == norm:
+            new = None
+        if len(self._cache) >= self.cache_size:
+            self._cache.clear()
+        self._cache[raw] = new
+        return new
+
+    def remap_palette(self, palette: Tuple[str, ...]) -> Tuple[Tuple[Optional[str], ...], int]:
+        """Resolve a whole palette: (replacement or None per entry, number of entries that change)."""
+        cache = self._palette_cache
+        hit = cache.get(palette)
+        if hit is not None:
+            self.palette_hits += 1
+            cache.move_to_end(palette)
+            return hit
+        self.palette_misses += 1
+        replacements = tuple(self.resolve(v) for v in palette)
+        result = (replacements, len(replacements) - replacements.count(None))
+        if self.palette_cache_size:
+            cache[palette] = result
+            if len(cache) > self.palette_cache_size:
+                cache.popitem(last=False)
+        return result
+
+    def palette_cache_len(self) -> int:
+        return len(self._palette_cache)
+
+    def nbt_string(self, value: str) -> nbtlib.String:
+        tag = self._nbt_strings.get(value)
+        if tag is None:
+            tag = self._nbt_strings[value] = nbtlib.String(value)
+        return tag
+
+    def prefilter_needles(self) -> Optional[List[str]]:
+        """
+        Substrings at least one of which must occur in a chunk for any entry to change.
+        None means no such set exists (regex/glob rules can match anything).
+        """
+        if self.patterns:
+            return None
+        needles = list(self.exact)
+        for prefix, _ in self.prefixes:
+            if not prefix:
+                return None
+            needles.append(prefix)
+        if self.unmapped_terralith_to:
+            needles.append("terralith:")
+        return needles
+
+
+def _restore_matcher(
+    rules: Tuple[Tuple[str, str], ...],
+    unmapped_terralith_to: Optional[str],
+    cache_size: int = MATCHER_CACHE_SIZE,
+    palette_cache_size: int = PALETTE_CACHE_SIZE,
+) -> BiomeMatcher:
+    key = (rules, unmapped_terralith_to, cache_size, palette_cache_size)
+    matcher = _MATCHER_REGISTRY.get(key)
+    if matcher is None:
+        matcher = BiomeMatcher(dict(rules), unmapped_terralith_to, cache_size, palette_cache_size)
+        _MATCHER_REGISTRY.clear()
+        _MATCHER_REGISTRY[key] = matcher
+    return matcher
+
+
+def _as_matcher(mapping, unmapped_terralith_to: Optional[str] = None) -> BiomeMatcher:
+    """Accept either a compiled BiomeMatcher or a plain mapping dict."""
+    if isinstance(mapping, BiomeMatcher):
+        return mapping
+    return _restore_matcher(tuple(mapping.items()), unmapped_terralith_to)
+
+
 def _region_dir(world_path: Path, dimension: str) -> Path:
     dim = dimension.lower()
     if dim in ("overworld", "world", "0"):
@@ -325,31 +510,78 @@ class ChunkPointer:
     sector_count: int
 
 
+_LOCATION_TABLE = struct.Struct(">1024I")
+_U32 = struct.Struct(">I")
+
+
+@contextlib.contextmanager
+def _map_region(path: Path) -> Iterator[memoryview]:
+    """
+    Memory-map a region file read-only and yield a memoryview over it.
+
+    Chunk blobs are sliced out of this view without copying and handed straight
+    to zlib, so the compressed data is never duplicated in the worker. The map
+    is closed on exit; slices must not outlive the `with` block (Windows cannot
+    replace a file that is still mapped).
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            # mmap can't map empty files; an empty region simply has no chunks.
+            yield memoryview(b"")
+            return
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mm)
+    try:
+        yield view
+    finally:
+        view.release()
+        try:
+            mm.close()
+        except BufferError:
+            # A slice is still referenced somewhere (eg a traceback); collect and retry.
+            gc.collect()
+            try:
+                mm.close()
+            except BufferError:
+                pass
+
+
 def _read_locations(region_bytes: bytes) -> List[Tuple[int, int]]:
-    locs: List[Tuple[int, int]] = []
-    for i in range(1024):
-        entry = region_bytes[i * 4 : i * 4 + 4]
-        off = int.from_bytes(entry[:3], "big")
-        count = entry[3]
-        locs.append((off, count))
-    return locs
+    if len(region_bytes) < SECTOR_BYTES:
+        # Truncated/empty region file: nothing to read.
+        return [(0, 0)] * 1024
+    return [(v >> 8, v & 0xFF) for v in _LOCATION_TABLE.unpack_from(region_bytes, 0)]
 
 
 def _iter_present_chunks(region_bytes: bytes) -> Iterable[ChunkPointer]:
+    """
+    Present chunks in file order (by sector offset), not index order. Chunks are
+    stored wherever they fit, so index order jumps back and forth across the file;
+    reading in file order turns cold-cache reads on a spinning disk into a sweep.
+    """
     locs = _read_locations(region_bytes)
-    for idx, (off, count) in enumerate(locs):
-        if off and count:
-            yield ChunkPointer(idx=idx, off_sectors=off, sector_count=count)
+    ptrs = [
+        ChunkPointer(idx=idx, off_sectors=off, sector_count=count)
+        for idx, (off, count) in enumerate(locs)
+        if off and count
+    ]
+    ptrs.sort(key=lambda p: p.off_sectors)
+    return ptrs
 
 
 def _get_chunk_blob(region_bytes: bytes, off_sectors: int, sector_count: int) -> Optional[bytes]:
+    """
+    Return the chunk blob (length + compression byte + payload). Slicing a
+    memoryview returns a zero-copy view; slicing bytes returns a copy.
+    """
     if off_sectors == 0 or sector_count == 0:
         return None
     start = off_sectors * SECTOR_BYTES
     end = start + sector_count * SECTOR_BYTES
     if start + 5 > len(region_bytes) or end > len(region_bytes):
         return None
-    length = struct.unpack(">I", region_bytes[start : start + 4])[0]
+    length = _U32.unpack_from(region_bytes, start)[0]
     if length <= 0:
         return None
     blob_end = start + 4 + length
@@ -365,8 +597,9 @@ def _chunk_blob_compression_type(blob: bytes) -> int:
 def _decompress_chunk_nbt(blob: bytes) -> bytes:
     if len(blob) < 5:
         raise ValueError("Invalid chunk blob")
-    length = struct.unpack(">I", blob[:4])[0]
+    length = _U32.unpack_from(blob, 0)[0]
     comp = blob[4]
+    # Works on bytes or a memoryview into the mapped region (no copy before zlib).
     payload = blob[5:]
     if length != len(payload) + 1:
         if length - 1 <= len(payload):
@@ -378,7 +611,7 @@ def _decompress_chunk_nbt(blob: bytes) -> bytes:
     if comp == 2:
         return zlib.decompress(payload)
     if comp == 3:
-        return payload
+        return bytes(payload)
     raise ValueError(f"Unknown compression type: {comp}")
 
 
@@ -442,9 +675,260 @@ def _iter_biome_palette_lists(section) -> Iterable[List]:
             yield pal
 
 
+# --- Raw NBT cursor -----------------------------------------------------------
+# We only ever need sections[*].Y and sections[*].biomes.palette, so instead of
+# building a full nbtlib tree for every chunk we walk the decompressed bytes and
+# skip every other payload by its length prefix. Anything the cursor does not
+# understand raises _NbtCursorError and the caller falls back to nbtlib.
+
+TAG_END = 0
+TAG_COMPOUND = 10
+TAG_LIST = 9
+TAG_STRING = 8
+
+# Fixed payload sizes (bytes) for numeric tags.
+_NBT_FIXED_SIZES = {1: 1, 2: 2, 3: 4, 4: 8, 5: 4, 6: 8}
+# Element sizes for the length-prefixed array tags (byte/int/long arrays).
+_NBT_ARRAY_ELEM_SIZES = {7: 1, 11: 4, 12: 8}
+_NBT_INT_FORMATS = {1: ">b", 2: ">h", 3: ">i", 4: ">q"}
+
+_U16 = struct.Struct(">H")
+_I32 = struct.Struct(">i")
+
+
+class _NbtCursorError(ValueError):
+    """Raised when the raw NBT cursor hits data it does not understand."""
+
+
+@dataclass(frozen=True)
+class PaletteString:
+    # Offset of the 2-byte length prefix; `end` is the offset just past the payload.
+    offset: int
+    end: int
+    value: str
+
+
+@dataclass(frozen=True)
+class SectionBiomes:
+    y: Optional[int]
+    y_offset: Optional[int]
+    palettes: Tuple[Tuple[PaletteString, ...], ...]
+
+
+def _nbt_skip_payload(buf: bytes, pos: int, tag_type: int) -> int:
+    size = _NBT_FIXED_SIZES.get(tag_type)
+    if size is not None:
+        return pos + size
+    if tag_type == TAG_STRING:
+        return pos + 2 + _U16.unpack_from(buf, pos)[0]
+    elem_size = _NBT_ARRAY_ELEM_SIZES.get(tag_type)
+    if elem_size is not None:
+        count = _I32.unpack_from(buf, pos)[0]
+        if count < 0:
+            raise _NbtCursorError(f"Negative array length at {pos}")
+        return pos + 4 + count * elem_size
+    if tag_type == TAG_LIST:
+        elem_type = buf[pos]
+        count = _I32.unpack_from(buf, pos + 1)[0]
+        pos += 5
+        if count <= 0:
+            return pos
+        size = _NBT_FIXED_SIZES.get(elem_type)
+        if size is not None:
+            return pos + count * size
+        for _ in range(count):
+            pos = _nbt_skip_payload(buf, pos, elem_type)
+        return pos
+    if tag_type == TAG_COMPOUND:
+        while True:
+            child_type = buf[pos]
+            if child_type == TAG_END:
+                return pos + 1
+            pos = _nbt_skip_payload(buf, pos + 3 + _U16.unpack_from(buf, pos + 1)[0], child_type)
+    raise _NbtCursorError(f"Unknown tag type {tag_type} at {pos}")
+
+
+def _nbt_walk_compound(buf: bytes, pos: int, wanted: Dict[bytes, int]) -> Tuple[Dict[bytes, int], int]:
+    """
+    Walk one compound payload and return ({name: payload_pos}, end_pos) for the
+    entries in `wanted` whose tag type matches. Everything else is skipped.
+    """
+    found: Dict[bytes, int] = {}
+    while True:
+        tag_type = buf[pos]
+        if tag_type == TAG_END:
+            return (found, pos + 1)
+        name_len = _U16.unpack_from(buf, pos + 1)[0]
+        name = bytes(buf[pos + 3 : pos + 3 + name_len])
+        pos += 3 + name_len
+        if name in wanted:
+            if name in found:
+                # nbtlib keeps the last duplicate; don't guess, let it decide.
+                raise _NbtCursorError(f"Duplicate {name!r} tag")
+            if tag_type != wanted[name]:
+                raise _NbtCursorError(f"Unexpected tag type {tag_type} for {name!r}")
+            found[name] = pos
+        pos = _nbt_skip_payload(buf, pos, tag_type)
+
+
+def _nbt_read_string_list(buf: bytes, pos: int) -> Tuple[PaletteString, ...]:
+    elem_type = buf[pos]
+    count = _I32.unpack_from(buf, pos + 1)[0]
+    pos += 5
+    if count <= 0:
+        return ()
+    if elem_type != TAG_STRING:
+        raise _NbtCursorError(f"Palette list has element type {elem_type}")
+    out = []
+    for _ in range(count):
+        n = _U16.unpack_from(buf, pos)[0]
+        end = pos + 2 + n
+        if end > len(buf):
+            raise _NbtCursorError("String runs past end of data")
+        out.append(PaletteString(pos, end, bytes(buf[pos + 2 : end]).decode("utf-8")))
+        pos = end
+    return tuple(out)
+
+
+_SECTION_TAGS = frozenset((b"Y", b"biomes", b"Biomes"))
+
+
+def _nbt_read_section(buf: bytes, pos: int) -> Tuple[SectionBiomes, int]:
+    y: Optional[int] = None
+    y_offset: Optional[int] = None
+    palettes: List[Tuple[PaletteString, ...]] = []
+    seen = set()
+    while True:
+        tag_type = buf[pos]
+        if tag_type == TAG_END:
+            pos += 1
+            break
+        name_len = _U16.unpack_from(buf, pos + 1)[0]
+        name = bytes(buf[pos + 3 : pos + 3 + name_len])
+        pos += 3 + name_len
+        if name in _SECTION_TAGS:
+            if name in seen:
+                raise _NbtCursorError(f"Duplicate {name!r} tag")
+            seen.add(name)
+            if name == b"Y":
+                fmt = _NBT_INT_FORMATS.get(tag_type)
+                if fmt is None:
+                    raise _NbtCursorError(f"Unexpected tag type {tag_type} for section Y")
+                y = struct.unpack_from(fmt, buf, pos)[0]
+                y_offset = pos
+            elif tag_type == TAG_COMPOUND:
+                # 1.18+: biomes.palette; some converters write Biomes.palette / Biomes.Palette.
+                keys = {b"palette": TAG_LIST} if name == b"biomes" else {b"palette": TAG_LIST, b"Palette": TAG_LIST}
+                found, end = _nbt_walk_compound(buf, pos, keys)
+                pal: Tuple[PaletteString, ...] = ()
+                if b"palette" in found:
+                    pal = _nbt_read_string_list(buf, found[b"palette"])
+                if not pal and b"Palette" in found:
+                    pal = _nbt_read_string_list(buf, found[b"Palette"])
+                if b"palette" in found or b"Palette" in found:
+                    palettes.append(pal)
+                pos = end
+                continue
+            # A non-compound biomes tag (eg pre-1.18 IntArray) has no palette to remap.
+        pos = _nbt_skip_payload(buf, pos, tag_type)
+    # Keep the same order as _iter_biome_palette_lists (biomes before Biomes).
+    return (SectionBiomes(y, y_offset, tuple(palettes)), pos)
+
+
+def _nbt_read_sections(buf: bytes, pos: int) -> List[SectionBiomes]:
+    elem_type = buf[pos]
+    count = _I32.unpack_from(buf, pos + 1)[0]
+    pos += 5
+    if count <= 0:
+        return []
+    if elem_type != TAG_COMPOUND:
+        raise _NbtCursorError(f"Sections list has element type {elem_type}")
+    out: List[SectionBiomes] = []
+    for _ in range(count):
+        sec, pos = _nbt_read_section(buf, pos)
+        out.append(sec)
+    return out
+
+
+def _scan_chunk_biomes(raw_nbt: bytes) -> List[SectionBiomes]:
+    """
+    Locate section Y values and biome palette strings in raw (decompressed) chunk NBT.
+
+    Section lookup follows _get_sections: sections, Sections, Level.sections, Level.Sections.
+    Returns an empty list if the chunk has no sections.
+    Raises _NbtCursorError if the data is malformed or not in a shape the cursor handles.
+    """
+    try:
+        buf = raw_nbt
+        if buf[0] != TAG_COMPOUND:
+            raise _NbtCursorError("Root tag is not a compound")
+        pos = 3 + _U16.unpack_from(buf, 1)[0]
+        found, end = _nbt_walk_compound(
+            buf, pos, {b"sections": TAG_LIST, b"Sections": TAG_LIST, b"Level": TAG_COMPOUND}
+        )
+        if end > len(buf):
+            raise _NbtCursorError("Compound runs past end of data")
+        for key in (b"sections", b"Sections"):
+            if key in found:
+                return _nbt_read_sections(buf, found[key])
+        if b"Level" in found:
+            lvl, _ = _nbt_walk_compound(buf, found[b"Level"], {b"sections": TAG_LIST, b"Sections": TAG_LIST})
+            for key in (b"sections", b"Sections"):
+                if key in lvl:
+                    return _nbt_read_sections(buf, lvl[key])
+        return []
+    except _NbtCursorError:
+        raise
+    except (IndexError, struct.error, UnicodeDecodeError, RecursionError) as e:
+        raise _NbtCursorError(f"{type(e).__name__}: {e}") from e
+
+
+def _section_in_y_range(sy: Optional[int], y_min: Optional[int], y_max: Optional[int]) -> bool:
+    if sy is not None and y_min is not None and y_max is not None:
+        sec_min = sy * 16
+        sec_max = sec_min + 15
+        if sec_max < y_min or sec_min > y_max:
+            return False
+    return True
+
+
+def _plan_palette_edits(
+    sections: Sequence[SectionBiomes],
+    mapping: Union[BiomeMatcher, Dict[str, str]],
+    y_min: Optional[int],
+    y_max: Optional[int],
+    unmapped_terralith_to: Optional[str],
+    debug_samples: List[str],
+    debug_limit: int,
+) -> List[Tuple[PaletteString, str]]:
+    """
+    Cursor counterpart of _remap_chunk_biome_palettes: returns (palette string, new value)
+    for every entry that would change, without touching the chunk.
+    """
+    edits: List[Tuple[PaletteString, str]] = []
+    matcher = _as_matcher(mapping, unmapped_terralith_to)
+    for section in sections:
+        if not _section_in_y_range(section.y, y_min, y_max):
+            continue
+        for palette in section.palettes:
+            if not palette:
+                continue
+            if debug_limit > 0 and len(debug_samples) < debug_limit:
+                for ps in palette:
+                    if len(debug_samples) >= debug_limit:
+                        break
+                    debug_samples.append(_normalize_biome_name(ps.value))
+            replacements, n = matcher.remap_palette(tuple(ps.value for ps in palette))
+            if n:
+                for ps, new in zip(palette, replacements):
+                    if new is not None:
+                        edits.append((ps, new))
+    return edits
+
+
 def _remap_chunk_biome_palettes(
     root,
-    mapping: Dict[str, str],
+    mapping: Union[BiomeMatcher, Dict[str, str]],
     y_min: Optional[int],
     y_max: Optional[int],
     unmapped_terralith_to: Optional[str],
@@ -455,6 +939,7 @@ def _remap_chunk_biome_palettes(
     if not sections:
         return (False, 0)
 
+    matcher = _as_matcher(mapping, unmapped_terralith_to)
     changed = False
     entries_changed = 0
 
@@ -480,28 +965,22 @@ def _remap_chunk_biome_palettes(
                         continue
                     debug_samples.append(s)
 
-            palette_len = len(palette)
-            for i in range(palette_len):
-                try:
-                    # Double-check bounds in case palette was modified
-                    if i >= len(palette):
-                        break
-                    raw = str(palette[i])
-                except (IndexError, AttributeError, TypeError):
-                    continue
-                except Exception:
+            try:
+                raw_values = tuple(str(v) for v in palette)
+            except Exception:
+                continue
+            replacements, n = matcher.remap_palette(raw_values)
+            if not n:
+                continue
+            for i, new in enumerate(replacements):
+                if new is None:
                     continue
                 try:
-                    norm = _normalize_biome_name(raw)
-                    new = mapping.get(norm)
-                    if (not new) and unmapped_terralith_to and norm.startswith("terralith:"):
-                        new = unmapped_terralith_to
-                    if new and new != norm:
-                        # Final bounds check before assignment
-                        if i < len(palette):
-                            palette[i] = nbtlib.String(new)
-                            changed = True
-                            entries_changed += 1
+                    # Final bounds check before assignment
+                    if i < len(palette):
+                        palette[i] = matcher.nbt_string(new)
+                        changed = True
+                        entries_changed += 1
                 except (IndexError, AttributeError, TypeError):
                     continue
                 except Exception:
@@ -511,6 +990,147 @@ def _remap_chunk_biome_palettes(
     return (changed, entries_changed)
 
 
+def _read_section_palettes(raw_nbt: bytes, fast_nbt: bool = True) -> List[Tuple[Optional[int], List[List[str]]]]:
+    """
+    Return [(section Y, [palette values, ...]), ...] for a chunk.
+    Uses the raw NBT cursor when possible and falls back to a full nbtlib parse.
+    """
+    if fast_nbt:
+        try:
+            return [
+                (sec.y, [[ps.value for ps in pal] for pal in sec.palettes])
+                for sec in _scan_chunk_biomes(raw_nbt)
+            ]
+        except _NbtCursorError:
+            pass
+    root = nbtlib.File.parse(io.BytesIO(raw_nbt), byteorder="big")
+    out: List[Tuple[Optional[int], List[List[str]]]] = []
+    for section in _get_sections(root) or []:
+        palettes = []
+        for palette in _iter_biome_palette_lists(section):
+            values = []
+            for v in palette:
+                try:
+                    values.append(str(v))
+                except Exception:
+                    continue
+            palettes.append(values)
+        out.append((_section_y(section), palettes))
+    return out
+
+
+def _splice_palette_edits(raw_nbt: bytes, edits: Sequence[Tuple[PaletteString, str]]) -> bytes:
+    """
+    Rewrite palette strings directly in raw chunk NBT.
+
+    Each edited TAG_String payload and its 2-byte length prefix are replaced in one
+    pass over the buffer. NBT has no global offsets or sizes, so nothing else needs
+    fixing up and every untouched tag is copied through byte-for-byte.
+    """
+    parts: List[bytes] = []
+    pos = 0
+    for ps, new in sorted(edits, key=lambda e: e[0].offset):
+        data = new.encode("utf-8")
+        if len(data) > 0xFFFF:
+            raise ValueError(f"Biome id too long for NBT string: {new[:40]!r}...")
+        parts.append(raw_nbt[pos : ps.offset])
+        parts.append(_U16.pack(len(data)))
+        parts.append(data)
+        pos = ps.end
+    parts.append(raw_nbt[pos:])
+    return b"".join(parts)
+
+
+def _remap_raw_nbt_with_nbtlib(
+    raw_nbt: bytes,
+    mapping: Union[BiomeMatcher, Dict[str, str]],
+    y_min: Optional[int],
+    y_max: Optional[int],
+    unmapped_terralith_to: Optional[str],
+) -> Tuple[bytes, int]:
+    """Reference implementation for --verify-splice: full nbtlib parse, remap and write."""
+    nbt_file = nbtlib.File.parse(io.BytesIO(raw_nbt), byteorder="big")
+    _, ec = _remap_chunk_biome_palettes(nbt_file, mapping, y_min, y_max, unmapped_terralith_to, [], 0)
+    buf = io.BytesIO()
+    nbt_file.write(buf, byteorder="big")
+    return (buf.getvalue(), ec)
+
+
+# --- Byte prefilter -----------------------------------------------------------
+# Most chunks contain no biome we would touch. Every palette entry we could
+# change contains one of BiomeMatcher.prefilter_needles() as a substring of the
+# raw NBT bytes (a `universal_*` alias contains its canonical id), so a chunk
+# with no needle hit can be skipped without parsing it at all.
+
+
+@functools.lru_cache(maxsize=8)
+def _compile_prefilter(needles: Tuple[str, ...]) -> Optional["re.Pattern[bytes]"]:
+    """
+    Compile needles into a single multi-needle byte matcher.
+
+    Returns None when no safe prefilter can be built (no needles, or needles whose
+    Java modified-UTF-8 encoding differs from plain UTF-8).
+    """
+    uniq = sorted(set(n for n in needles if n))
+    if not uniq:
+        return None
+    if any(ord(c) == 0 or ord(c) > 0xFFFF for n in uniq for c in n):
+        return None
+    # Drop needles that already contain a shorter needle; they can never add a hit.
+    minimal: List[str] = []
+    for n in sorted(uniq, key=len):
+        if not any(m in n for m in minimal):
+            minimal.append(n)
+    # re factors shared prefixes (eg "terralith:") out of the alternation, so this
+    # behaves like a trie walk in C rather than one scan per needle.
+    return re.compile(b"|".join(re.escape(n.encode("utf-8")) for n in sorted(minimal)))
+
+
+def _probe_region(
+    original: bytes,
+    pref: str,
+    prefilter: Optional["re.Pattern[bytes]"],
+    y_min: Optional[int],
+    y_max: Optional[int],
+    budget: int,
+    fast_nbt: bool,
+) -> Tuple[Optional[Tuple[int, Optional[int], List[str]]], int, int]:
+    """
+    Probe one region for palette entries starting with `pref`, scanning at most
+    `budget` chunks (-1 = no limit). Returns ((chunk_idx, section Y, hits) or None, scanned, skipped).
+    """
+    scanned = 0
+    skipped = 0
+    for ptr in _iter_present_chunks(original):
+        if budget >= 0 and scanned >= budget:
+            break
+        blob = _get_chunk_blob(original, ptr.off_sectors, ptr.sector_count)
+        if blob is None:
+            continue
+        scanned += 1
+        try:
+            raw_nbt = _decompress_chunk_nbt(blob)
+            if prefilter is not None and prefilter.search(raw_nbt) is None:
+                skipped += 1
+                continue
+            section_palettes = _read_section_palettes(raw_nbt, fast_nbt)
+        except Exception:
+            continue
+
+        for sy, palettes in section_palettes:
+            if not _section_in_y_range(sy, y_min, y_max):
+                continue
+            for palette in palettes:
+                hits = []
+                for v in palette:
+                    s = _normalize_biome_name(v)
+                    if s.startswith(pref):
+                        hits.append(s)
+                if hits:
+                    return ((ptr.idx, sy, list(dict.fromkeys(hits))), scanned, skipped)
+    return (None, scanned, skipped)
+
+
 def _probe_for_biome_prefix(
     region_files: Sequence[Path],
     prefix: str,
@@ -519,6 +1139,8 @@ def _probe_for_biome_prefix(
     max_regions: int,
     max_chunks: int,
     log,
+    fast_nbt: bool = True,
+    use_prefilter: bool = True,
 ) -> int:
     """
     Scan region files until we find any biome palette entry starting with `prefix`.
@@ -531,93 +1153,85 @@ def _probe_for_biome_prefix(
 
     regions_scanned = 0
     chunks_scanned = 0
+    chunks_skipped = 0
+    prefilter = _compile_prefilter((pref,)) if use_prefilter else None
 
     for rf in region_files:
         if max_regions > 0 and regions_scanned >= max_regions:
             break
         regions_scanned += 1
+        budget = max(0, max_chunks - chunks_scanned) if max_chunks > 0 else -1
         try:
-            original = rf.read_bytes()
-        except Exception:
+            with _map_region(rf) as original:
+                hit, scanned, skipped = _probe_region(original, pref, prefilter, y_min, y_max, budget, fast_nbt)
+        except (OSError, ValueError):
             continue
-
-        for ptr in _iter_present_chunks(original):
-            if max_chunks > 0 and chunks_scanned >= max_chunks:
-                break
-            blob = _get_chunk_blob(original, ptr.off_sectors, ptr.sector_count)
-            if blob is None:
-                continue
-            chunks_scanned += 1
-            try:
-                raw_nbt = _decompress_chunk_nbt(blob)
-                nbt_file = nbtlib.File.parse(io.BytesIO(raw_nbt), byteorder="big")
-                root = nbt_file
-            except Exception:
-                continue
-
-            sections = _get_sections(root)
-            if not sections:
-                continue
-
-            for section in sections:
-                sy = _section_y(section)
-                if sy is not None and y_min is not None and y_max is not None:
-                    sec_min = sy * 16
-                    sec_max = sec_min + 15
-                    if sec_max < y_min or sec_min > y_max:
-                        continue
-                for palette in _iter_biome_palette_lists(section):
-                    hits = []
-                    for v in palette:
-                        try:
-                            s = _normalize_biome_name(str(v))
-                        except Exception:
-                            continue
-                        if s.startswith(pref):
-                            hits.append(s)
-                    if hits:
-                        uniq_hits = list(dict.fromkeys(hits))
-                        log(f"FOUND in {rf.name} (chunk_idx={ptr.idx}, sectionY={sy}):")
-                        for h in uniq_hits[:20]:
-                            log(f"  - {h}")
-                        return 0
+        chunks_scanned += scanned
+        chunks_skipped += skipped
+        if hit is not None:
+            chunk_idx, sy, uniq_hits = hit
+            log(f"FOUND in {rf.name} (chunk_idx={chunk_idx}, sectionY={sy}):")
+            for h in uniq_hits[:20]:
+                log(f"  - {h}")
+            return 0
 
         if max_chunks > 0 and chunks_scanned >= max_chunks:
             break
 
-    log(f"Not found. Scanned regions={regions_scanned}, chunks={chunks_scanned}, prefix={pref!r}")
+    log(
+        f"Not found. Scanned regions={regions_scanned}, chunks={chunks_scanned} "
+        f"(skipped by prefilter={chunks_skipped}), prefix={pref!r}"
+    )
     return 2
 
 
 def _read_timestamps(region_bytes: bytes) -> List[int]:
-    ts: List[int] = []
-    base = SECTOR_BYTES
-    for i in range(1024):
-        entry = region_bytes[base + i * 4 : base + i * 4 + 4]
-        ts.append(int.from_bytes(entry, "big"))
-    return ts
+    if len(region_bytes) < HEADER_BYTES:
+        return [0] * 1024
+    return list(_LOCATION_TABLE.unpack_from(region_bytes, SECTOR_BYTES))
 
 
-def _rebuild_region(original: bytes, updated_blobs: Dict[int, Tuple[bytes, bool]]) -> bytes:
-    locs = _read_locations(original)
+_ZERO_SECTOR = bytes(SECTOR_BYTES)
+
+
+def _write_rebuilt_region(
+    out,
+    original: bytes,
+    updated_blobs: Dict[int, Tuple[bytes, bool]],
+    timestamps: Optional[Dict[int, int]] = None,
+) -> int:
+    """
+    Stream a rebuilt region to the binary file object `out` and return its size.
+
+    The header is reserved first, chunk blobs and padding are written as they are
+    produced (unchanged blobs straight from the mapped original), and then we seek
+    back to fill in the header. Nothing larger than one chunk is held in memory.
+
+    Restores pass the saved `timestamps` of their chunks; they may also bring back
+    chunks the original no longer has, or drop one with an empty blob.
+    """
     ts = _read_timestamps(original)
     now_ts = int(time.time())
 
-    header = bytearray(HEADER_BYTES)
-    out = bytearray(header)
+    out.write(bytes(HEADER_BYTES))
 
     current_sector = 2
     new_locs: List[Tuple[int, int]] = [(0, 0)] * 1024
     new_ts: List[int] = [0] * 1024
 
-    for idx in range(1024):
-        off, count = locs[idx]
-        if off == 0 or count == 0:
-            continue
-
+    # Keep the original chunk order, so the new file reads back as one sweep as well.
+    present = _iter_present_chunks(original)
+    restored = sorted(set(updated_blobs).difference(ptr.idx for ptr in present))
+    for ptr in itertools.chain(present, (ChunkPointer(idx, 0, 0) for idx in restored)):
+        idx, off, count = ptr.idx, ptr.off_sectors, ptr.sector_count
         if idx in updated_blobs:
             blob, was_changed = updated_blobs[idx]
-            new_ts[idx] = now_ts if was_changed else ts[idx]
+            if not blob:
+                continue
+            if timestamps is not None and idx in timestamps:
+                new_ts[idx] = timestamps[idx]
+            else:
+                new_ts[idx] = now_ts if was_changed else ts[idx]
         else:
             blob = _get_chunk_blob(original, off, count)
             if blob is None:
@@ -630,12 +1244,13 @@ def _rebuild_region(original: bytes, updated_blobs: Dict[int, Tuple[bytes, bool]
 
         new_locs[idx] = (current_sector, sectors_needed)
 
-        out.extend(blob)
+        out.write(blob)
         pad = sectors_needed * SECTOR_BYTES - len(blob)
         if pad:
-            out.extend(b"\x00" * pad)
+            out.write(_ZERO_SECTOR[:pad])
         current_sector += sectors_needed
 
+    header = bytearray(HEADER_BYTES)
     # location table
     for idx, (off, count) in enumerate(new_locs):
         header[idx * 4 : idx * 4 + 3] = int(off).to_bytes(3, "big")
@@ -646,149 +1261,2619 @@ def _rebuild_region(original: bytes, updated_blobs: Dict[int, Tuple[bytes, bool]
     for idx, tsv in enumerate(new_ts):
         header[base + idx * 4 : base + idx * 4 + 4] = int(tsv).to_bytes(4, "big")
 
-    out[0:HEADER_BYTES] = header
-    return bytes(out)
+    out.seek(0)
+    out.write(header)
+    out.seek(0, io.SEEK_END)
+    return current_sector * SECTOR_BYTES
 
 
-def _process_region_file(
-    region_file: str,
-    mapping: Dict[str, str],
-    y_min: Optional[int],
-    y_max: Optional[int],
-    unmapped_terralith_to: Optional[str],
-    debug_limit: int,
-    debug_errors: int,
-    debug_structure: int,
-    dry_run: bool,
-    make_backup: bool,
-) -> Tuple[str, int, int, int, List[str]]:
-    path = Path(region_file)
-    original = path.read_bytes()
+def _rebuild_region(original: bytes, updated_blobs: Dict[int, Tuple[bytes, bool]]) -> bytes:
+    """In-memory variant of _write_rebuilt_region (returns the whole region as bytes)."""
+    buf = io.BytesIO()
+    _write_rebuilt_region(buf, original, updated_blobs)
+    return buf.getvalue()
 
-    processed = 0
-    changed = 0
-    entries_changed = 0
-    parse_errors = 0
-    structure_printed = 0
 
-    debug_samples: List[str] = []
+def _keep_largest(heap: List[Any], item: Any, n: int) -> None:
+    """Push item onto a min-heap that keeps only the n largest items."""
+    if len(heap) < n:
+        heapq.heappush(heap, item)
+    elif item > heap[0]:
+        heapq.heapreplace(heap, item)
 
-    updated_blobs: Dict[int, Tuple[bytes, bool]] = {}
 
-    for ptr in _iter_present_chunks(original):
-        blob = _get_chunk_blob(original, ptr.off_sectors, ptr.sector_count)
-        if blob is None:
-            continue
-        processed += 1
+@dataclass
+class RegionResult:
+    name: str
+    chunks_processed: int = 0
+    chunks_changed: int = 0
+    entries_changed: int = 0
+    debug_samples: List[str] = field(default_factory=list)
+    # Chunks the byte prefilter ruled out without parsing.
+    chunks_skipped: int = 0
+    # Palette cache activity during this task, and the worker's cache size afterwards.
+    palette_cache_hits: int = 0
+    palette_cache_misses: int = 0
+    palette_cache_size: int = 0
+    # Bytes written to disk for this region (backups, journals and region data).
+    bytes_written: int = 0
+    # Set when the region failed inside a batch task; the other fields are then empty.
+    error: str = ""
+    # Worker time spent reading and remapping chunks (seconds).
+    elapsed: float = 0.0
+    # Region bytes read (header and chunk sectors).
+    bytes_read: int = 0
+    # Slowest chunks of this task as (seconds, region name, chunk index), for --slow-report.
+    slow_chunks: List[Tuple[float, str, int]] = field(default_factory=list)
+    # Set when the soft deadline stopped the task early: the sector offset of the first
+    # chunk left unprocessed. The main process reschedules the rest and writes the region.
+    resume_sector: int = 0
+    # Changed chunks of a whole-region task stopped by the deadline (nothing was written).
+    deferred_blobs: Optional[Dict[int, Tuple[bytes, bool]]] = None
+    # How the .bak backup was made (see _backup_region); "" if none was made.
+    backup_method: str = ""
+    # Chunks skipped because the manifest shows them unchanged since the last run.
+    chunks_unchanged: int = 0
+    # Chunks that failed to parse or remap. Such regions stay out of the manifest,
+    # so the next incremental run reads them again.
+    chunk_errors: int = 0
 
-        comp = _chunk_blob_compression_type(blob)
-        try:
-            raw_nbt = _decompress_chunk_nbt(blob)
-            # Region chunk payloads are full NBT files, so parse as File for compatibility.
-            nbt_file = nbtlib.File.parse(io.BytesIO(raw_nbt), byteorder="big")
-            # In nbtlib 2.x, File behaves like the root Compound (no `.root` attribute).
-            root = nbt_file
+    def merge(self, other: "RegionResult") -> None:
+        # Fold in the result of another chunk range of the same region.
+        self.chunks_processed += other.chunks_processed
+        self.chunks_changed += other.chunks_changed
+        self.entries_changed += other.entries_changed
+        self.debug_samples.extend(other.debug_samples)
+        self.chunks_skipped += other.chunks_skipped
+        self.palette_cache_hits += other.palette_cache_hits
+        self.palette_cache_misses += other.palette_cache_misses
+        self.palette_cache_size = max(self.palette_cache_size, other.palette_cache_size)
+        self.bytes_written += other.bytes_written
+        self.elapsed += other.elapsed
+        self.bytes_read += other.bytes_read
+        self.slow_chunks.extend(other.slow_chunks)
+        self.chunks_unchanged += other.chunks_unchanged
+        self.chunk_errors += other.chunk_errors
 
-            if debug_structure > 0 and structure_printed < debug_structure:
-                try:
-                    top_keys = list(root.keys()) if isinstance(root, dict) else []
-                    print(f"[debug-structure] {path.name} idx={ptr.idx}: root keys={top_keys}")
-                    secs = _get_sections(root)
-                    if not secs:
-                        print("[debug-structure]  sections: <missing/empty>")
-                    else:
-                        print(f"[debug-structure]  sections type={type(secs).__name__} len={len(secs)}")
-                        if len(secs) > 0:
-                            s0 = secs[0]
-                            s0_keys = list(s0.keys()) if isinstance(s0, dict) else []
-                            print(f"[debug-structure]  section[0] keys={s0_keys}")
-                            if isinstance(s0, dict):
-                                b = s0.get('biomes') or s0.get('Biomes')
-                                if b is None:
-                                    print("[debug-structure]  section[0].biomes: <missing>")
-                                else:
-                                    b_keys = list(b.keys()) if isinstance(b, dict) else []
-                                    print(f"[debug-structure]  section[0].biomes type={type(b).__name__} keys={b_keys}")
-                                    if isinstance(b, dict):
-                                        pal = b.get("palette") or b.get("Palette")
-                                        print(f"[debug-structure]  section[0].biomes.palette type={type(pal).__name__}")
-                except Exception:
-                    pass
-                structure_printed += 1
 
-            was_changed, ec = _remap_chunk_biome_palettes(
-                root, mapping, y_min, y_max, unmapped_terralith_to, debug_samples, debug_limit
-            )
-            if was_changed:
-                buf = io.BytesIO()
-                nbt_file.write(buf, byteorder="big")
-                new_raw = buf.getvalue()
-                new_blob = _compress_chunk_nbt(new_raw, compression_type=comp)
-                updated_blobs[ptr.idx] = (new_blob, True)
-                changed += 1
-                entries_changed += ec
-        except Exception as e:
-            parse_errors += 1
-            # Always log IndexError and other critical errors, even if debug_errors is 0
-            is_critical = isinstance(e, (IndexError, KeyError, AttributeError))
-            if is_critical or (debug_errors > 0 and parse_errors <= debug_errors):
-                try:
-                    error_msg = f"[error] {path.name} chunk_idx={ptr.idx}: {type(e).__name__}: {e}"
-                    print(error_msg, flush=True)
-                except Exception:
-                    pass
-            # For critical errors, also include a traceback hint for debugging
-            if is_critical and parse_errors == 1:
-                try:
-                    import traceback
-                    tb_lines = traceback.format_exc().splitlines()
-                    if len(tb_lines) > 1:
-                        print(f"[error] Traceback (first occurrence):", flush=True)
-                        for line in tb_lines[-5:]:  # Last 5 lines of traceback
-                            print(f"[error]   {line}", flush=True)
-                except Exception:
-                    pass
-            continue
+def _region_result(
+    name: str,
+    processed: int,
+    changed: int,
+    entries_changed: int,
+    debug_samples: List[str],
+    skipped: int,
+    matcher: BiomeMatcher,
+    hits_before: int,
+    misses_before: int,
+) -> RegionResult:
+    return RegionResult(
+        name,
+        processed,
+        changed,
+        entries_changed,
+        debug_samples,
+        skipped,
+        palette_cache_hits=matcher.palette_hits - hits_before,
+        palette_cache_misses=matcher.palette_misses - misses_before,
+        palette_cache_size=matcher.palette_cache_len(),
+    )
 
-    if changed == 0 or dry_run:
-        if debug_errors > 0:
-            print(f"[debug] {path.name}: chunks processed={processed}, parse_errors={parse_errors}")
-        return (path.name, processed, changed, entries_changed, debug_samples)
 
-    rebuilt = _rebuild_region(original, updated_blobs)
+# --- In-place region writes ---------------------------------------------------
+# Instead of rebuilding the whole region, rewritten chunks go back into their
+# existing sectors when they fit. Chunks that grew move to a free gap or the end
+# of the file, and only the header entries of changed chunks are updated.
+#
+# Crash safety comes from an undo journal next to the region (r.X.Z.mca.journal).
+# It holds the original bytes of every range we are about to overwrite, plus the
+# original file size. It is fsynced before the region is touched and deleted once
+# the region is fsynced. If a journal is found later, the region is rolled back
+# to its original contents. A journal without a valid trailer was never
+# committed, which means the region was never touched.
+#
+# The journal also records what the write was going to leave behind: the final
+# file size, the final header and a CRC-32 of every chunk sector written. Before
+# rolling back, every header entry and written sector must still hold either its
+# old or its new bytes. Anything else means the region was saved again after the
+# crash (eg by the game), and the rollback is refused rather than undoing that.
 
-    # backups + atomic replace
-    if make_backup:
-        backup_path = path.with_suffix(path.suffix + ".bak")
-        if not backup_path.exists():
-            backup_path.write_bytes(original)
-    tmp = path.with_suffix(path.suffix + ".tmp")
-    tmp.write_bytes(rebuilt)
-    tmp.replace(path)
+WRITE_MODES = ("rebuild", "inplace")
 
-    return (path.name, processed, changed, entries_changed, debug_samples)
+_JOURNAL_MAGIC = b"TBRJOURNAL2\n"
+_JOURNAL_TRAILER = b"END!"
+_JOURNAL_RANGE = struct.Struct(">QI")
+_JOURNAL_SECTOR = struct.Struct(">II")
 
 
-def run(argv: Optional[Sequence[str]] = None, *, log=print) -> int:
+def _journal_path(path: Path) -> Path:
+    return path.with_suffix(path.suffix + ".journal")
+
+
+def _fsync_dir(path: Path) -> None:
+    # Make a newly created/removed directory entry durable (POSIX only; best effort).
+    if os.name != "posix":
+        return
+    try:
+        fd = os.open(str(path), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _plan_in_place_layout(
+    original: bytes, updated_blobs: Dict[int, Tuple[bytes, bool]]
+) -> Optional[List[Tuple[int, int, int, bytes, bool]]]:
     """
-    Main implementation. Kept separate so a GUI can call this and capture output via `log`.
+    Decide where each rewritten chunk goes: [(idx, off_sectors, sector_count, blob, was_changed)].
+    Returns None if the existing header is inconsistent (overlapping chunks), in which
+    case the caller should rebuild the region instead.
     """
-    parser = argparse.ArgumentParser(description="Remap Terralith biomes to vanilla biomes by editing .mca region files directly.")
-    parser.add_argument("world", type=str, help="Path to the Minecraft world folder (contains region/).")
-    parser.add_argument("--dimension", type=str, default="overworld", help="overworld|nether|end|or explicit region folder path.")
-    parser.add_argument("--y", nargs=2, type=int, metavar=("Y_MIN", "Y_MAX"), help="Optional Y filter (inclusive).")
-    parser.add_argument(
-        "--processes",
-        type=int,
-        default=(os.cpu_count() or 1),
-        help="Worker processes (default: CPU logical thread count).",
-    )
-    parser.add_argument("--dry-run", action="store_true", help="Do not write files, just report what would change.")
-    parser.add_argument("--no-backup", action="store_true", help="Do not create .bak backups for modified region files.")
-    parser.add_argument(
-        "--mapping-ini",
-        type=str,
-        default="",
+    locs = _read_locations(original)
+    file_sectors = max(2, math.ceil(len(original) / SECTOR_BYTES))
+    # 1 = in use, 0 = free. Sectors 0-1 hold the header.
+    used = bytearray(file_sectors)
+    used[0:2] = b"\x01\x01"
+    for off, count in locs:
+        if off == 0 or count == 0:
+            continue
+        if off < 2:
+            return None
+        end = min(off + count, file_sectors)
+        if off >= end:
+            continue
+        if any(used[off:end]):
+            return None
+        used[off:end] = b"\x01" * (end - off)
+
+    plan: List[Tuple[int, int, int, bytes, bool]] = []
+    pending: List[Tuple[int, int, bytes, bool]] = []
+    for idx in sorted(updated_blobs):
+        blob, was_changed = updated_blobs[idx]
+        need = max(1, math.ceil(len(blob) / SECTOR_BYTES))
+        if need > 255:
+            raise ValueError(f"Chunk too large for region format ({need} sectors)")
+        off, count = locs[idx]
+        if off and need <= count:
+            plan.append((idx, off, need, blob, was_changed))
+            # The tail of a shrunk chunk becomes free space.
+            tail_end = min(off + count, file_sectors)
+            if off + need < tail_end:
+                used[off + need : tail_end] = bytes(tail_end - off - need)
+        else:
+            if off:
+                end = min(off + count, file_sectors)
+                if off < end:
+                    used[off:end] = bytes(end - off)
+            pending.append((idx, need, blob, was_changed))
+
+    # Grown chunks: first fit in a free gap, otherwise append at the end of the file.
+    for idx, need, blob, was_changed in pending:
+        pos = used.find(bytes(need), 2)
+        if pos == -1:
+            pos = len(used)
+            while pos > 2 and not used[pos - 1]:
+                pos -= 1
+        if pos + need > len(used):
+            used.extend(bytes(pos + need - len(used)))
+        used[pos : pos + need] = b"\x01" * need
+        plan.append((idx, pos, need, blob, was_changed))
+    return plan
+
+
+def _write_region_journal(
+    journal: Path,
+    region: Path,
+    original_size: int,
+    ranges: List[Tuple[int, int]],
+    expected_size: int,
+    expected_header: bytes,
+    expected_sectors: List[Tuple[int, int]],
+) -> int:
+    """
+    Save the bytes of `ranges` (the first is the header) and the expected result of
+    the write: file size, header and (sector, CRC-32) of every chunk sector written.
+    """
+    parts = [_JOURNAL_MAGIC, struct.pack(">QI", original_size, len(ranges))]
+    with open(region, "rb") as f:
+        for off, length in ranges:
+            f.seek(off)
+            data = f.read(length)
+            parts.append(_JOURNAL_RANGE.pack(off, len(data)))
+            parts.append(data)
+    parts.append(struct.pack(">Q", expected_size))
+    parts.append(expected_header)
+    parts.append(struct.pack(">I", len(expected_sectors)))
+    parts.extend(_JOURNAL_SECTOR.pack(sector, crc) for sector, crc in expected_sectors)
+    body = b"".join(parts)
+    payload = body + struct.pack(">I", zlib.crc32(body)) + _JOURNAL_TRAILER
+    with open(journal, "wb") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    _fsync_dir(journal.parent)
+    return len(payload)
+
+
+def _region_left_by_write(
+    f,
+    original_size: int,
+    ranges: List[Tuple[int, bytes]],
+    expected_size: int,
+    expected_header: bytes,
+    expected_sectors: List[Tuple[int, int]],
+) -> bool:
+    """
+    True if the region holds nothing but a mix of its old and expected new bytes,
+    ie nothing but the interrupted write has touched it since the journal was made.
+    """
+    size = os.fstat(f.fileno()).st_size
+    if not original_size <= size <= max(original_size, expected_size):
+        return False
+    old_header = ranges[0][1].ljust(HEADER_BYTES, b"\0")
+    f.seek(0)
+    header = f.read(HEADER_BYTES).ljust(HEADER_BYTES, b"\0")
+    for i in range(0, HEADER_BYTES, 4):
+        entry = header[i : i + 4]
+        if entry != old_header[i : i + 4] and entry != expected_header[i : i + 4]:
+            return False
+    old_sectors: Dict[int, bytes] = {}
+    for off, data in ranges[1:]:
+        for k in range(0, len(data), SECTOR_BYTES):
+            old_sectors[(off + k) // SECTOR_BYTES] = data[k : k + SECTOR_BYTES]
+    for sector, crc in expected_sectors:
+        f.seek(sector * SECTOR_BYTES)
+        current = f.read(SECTOR_BYTES)
+        if zlib.crc32(current) == crc:
+            continue
+        old = old_sectors.get(sector)
+        if old is not None and current[: len(old)] == old and not any(current[len(old) :]):
+            continue
+        if old is None and not any(current):
+            continue  # past the old end of the file and not written yet
+        return False
+    return True
+
+
+def _rollback_region_journal(region: Path) -> bool:
+    """
+    Undo an interrupted in-place write using its journal. Returns True if the region
+    was rolled back, False if the journal was never committed (region untouched).
+    Raises ValueError, keeping the journal, if the region changed after the write.
+    """
+    journal = _journal_path(region)
+    data = journal.read_bytes()
+    if data.startswith(b"TBRJOURNAL") and not data.startswith(_JOURNAL_MAGIC):
+        raise ValueError(f"{journal.name} was written by another version of this tool; not rolling back")
+    ok = (
+        data.startswith(_JOURNAL_MAGIC)
+        and data.endswith(_JOURNAL_TRAILER)
+        and len(data) >= len(_JOURNAL_MAGIC) + 12 + 8
+        and struct.unpack(">I", data[-8:-4])[0] == zlib.crc32(data[:-8])
+    )
+    if not ok:
+        journal.unlink()
+        return False
+    pos = len(_JOURNAL_MAGIC)
+    original_size, n_ranges = struct.unpack_from(">QI", data, pos)
+    pos += 12
+    ranges: List[Tuple[int, bytes]] = []
+    for _ in range(n_ranges):
+        off, length = _JOURNAL_RANGE.unpack_from(data, pos)
+        pos += _JOURNAL_RANGE.size
+        ranges.append((off, data[pos : pos + length]))
+        pos += length
+    (expected_size,) = struct.unpack_from(">Q", data, pos)
+    pos += 8
+    expected_header = data[pos : pos + HEADER_BYTES]
+    pos += HEADER_BYTES
+    (n_sectors,) = struct.unpack_from(">I", data, pos)
+    pos += 4
+    expected_sectors = [_JOURNAL_SECTOR.unpack_from(data, pos + i * _JOURNAL_SECTOR.size) for i in range(n_sectors)]
+    with open(region, "r+b") as f:
+        if not _region_left_by_write(f, original_size, ranges, expected_size, expected_header, expected_sectors):
+            raise ValueError(
+                f"{region.name} changed after an interrupted in-place write (was the world opened in the game?); "
+                f"not rolling back. Check the region, then delete {journal.name} to keep it as it is, "
+                f"or restore it from a backup"
+            )
+        for off, old in ranges:
+            f.seek(off)
+            f.write(old)
+        f.truncate(original_size)
+        f.flush()
+        os.fsync(f.fileno())
+    journal.unlink()
+    _fsync_dir(region.parent)
+    return True
+
+
+def _write_region_in_place(
+    path: Path,
+    original_size: int,
+    plan: List[Tuple[int, int, int, bytes, bool]],
+    write_limiter: Optional[RateLimiter] = None,
+) -> int:
+    """
+    Write the chunks placed by _plan_in_place_layout into the existing region file.
+    Returns bytes written (journal included).
+    """
+    # Everything we overwrite inside the current file goes into the journal.
+    ranges: List[Tuple[int, int]] = [(0, HEADER_BYTES)]
+    for _, off, need, _, _ in plan:
+        start = off * SECTOR_BYTES
+        end = min(start + need * SECTOR_BYTES, original_size)
+        if start < end:
+            ranges.append((start, end - start))
+
+    # What the region will look like afterwards, so a rollback can tell whether
+    # anything else wrote to it in between.
+    now_ts = int(time.time())
+    with open(path, "rb") as f:
+        header = bytearray(f.read(HEADER_BYTES).ljust(HEADER_BYTES, b"\0"))
+    expected_sectors: List[Tuple[int, int]] = []
+    expected_size = original_size
+    for idx, off, need, blob, was_changed in plan:
+        header[idx * 4 : idx * 4 + 4] = int(off).to_bytes(3, "big") + bytes([need])
+        if was_changed:
+            header[SECTOR_BYTES + idx * 4 : SECTOR_BYTES + idx * 4 + 4] = int(now_ts).to_bytes(4, "big")
+        padded = bytes(blob).ljust(need * SECTOR_BYTES, b"\0")
+        for k in range(need):
+            expected_sectors.append((off + k, zlib.crc32(padded[k * SECTOR_BYTES : (k + 1) * SECTOR_BYTES])))
+        expected_size = max(expected_size, (off + need) * SECTOR_BYTES)
+    if expected_size % SECTOR_BYTES:
+        expected_size += SECTOR_BYTES - expected_size % SECTOR_BYTES
+
+    journal = _journal_path(path)
+    written = _write_region_journal(
+        journal, path, original_size, ranges, expected_size, bytes(header), expected_sectors
+    )
+    if write_limiter is not None:
+        write_limiter.consume(written)
+
+    end_bytes = original_size
+    with open(path, "r+b") as raw_f:
+        f = _throttled(raw_f, write_limiter)
+        for idx, off, need, blob, was_changed in plan:
+            start = off * SECTOR_BYTES
+            f.seek(start)
+            # One write per chunk, so an interruption never leaves a sector half old, half new.
+            f.write(bytes(blob).ljust(need * SECTOR_BYTES, b"\0"))
+            written += need * SECTOR_BYTES
+            end_bytes = max(end_bytes, start + need * SECTOR_BYTES)
+
+            f.seek(idx * 4)
+            f.write(int(off).to_bytes(3, "big") + bytes([need]))
+            if was_changed:
+                f.seek(SECTOR_BYTES + idx * 4)
+                f.write(int(now_ts).to_bytes(4, "big"))
+            written += 8
+        # Region files are always a whole number of sectors.
+        if end_bytes % SECTOR_BYTES:
+            end_bytes += SECTOR_BYTES - end_bytes % SECTOR_BYTES
+            f.truncate(end_bytes)
+        f.flush()
+        os.fsync(f.fileno())
+
+    journal.unlink()
+    _fsync_dir(path.parent)
+    return written
+
+
+# --- I/O throttling -----------------------------------------------------------
+# For running next to a live server: --max-read-mbps/--max-write-mbps cap the
+# combined disk bandwidth of all workers, and --low-priority lowers their CPU and
+# I/O priority.
+
+_THROTTLE_BLOCK = 1024 * 1024
+LOW_PRIORITY_NICE = 10
+
+# ioprio_set(2) syscall numbers (no libc wrapper exists).
+_IOPRIO_SET_SYSCALL = {
+    "x86_64": 251, "amd64": 251, "i386": 289, "i686": 289,
+    "aarch64": 30, "arm64": 30, "riscv64": 30, "armv7l": 314,
+    "ppc64": 273, "ppc64le": 273, "s390x": 282,
+}
+
+
+class RateLimiter:
+    """
+    Byte-rate limiter shared by every worker (GCRA). All users advance one shared
+    "theoretical arrival time"; a caller that gets too far ahead of it sleeps.
+    Built with a multiprocessing context it works across worker processes (pass
+    it through the pool initializer), otherwise across threads.
+    """
+
+    def __init__(self, bytes_per_sec: float, ctx=None):
+        self.rate = float(bytes_per_sec)
+        # Allow a short burst (a quarter second, at least one block) before pacing.
+        self.burst = max(_THROTTLE_BLOCK, self.rate / 4) / self.rate
+        if ctx is None:
+            self._tat = types.SimpleNamespace(value=0.0)
+            self._lock = threading.Lock()
+        else:
+            self._tat = ctx.Value("d", 0.0, lock=False)
+            self._lock = ctx.Lock()
+
+    def consume(self, n: int) -> None:
+        if n <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            tat = max(self._tat.value, now) + n / self.rate
+            self._tat.value = tat
+        delay = tat - now - self.burst
+        if delay > 0:
+            time.sleep(delay)
+
+
+class _ThrottledFile:
+    """Binary file wrapper that charges writes to a RateLimiter, at most one block at a time."""
+
+    def __init__(self, f, limiter: RateLimiter):
+        self._f = f
+        self._limiter = limiter
+
+    def write(self, data) -> int:
+        with memoryview(data) as view:
+            for start in range(0, len(view), _THROTTLE_BLOCK):
+                piece = view[start : start + _THROTTLE_BLOCK]
+                self._limiter.consume(len(piece))
+                self._f.write(piece)
+            return len(view)
+
+    def __getattr__(self, name):
+        return getattr(self._f, name)
+
+
+def _throttled(f, limiter: Optional[RateLimiter]):
+    return f if limiter is None else _ThrottledFile(f, limiter)
+
+
+def _lower_priority(thread_only: bool = False) -> None:
+    """
+    Best effort: lower the CPU and disk priority of this worker process, or of the
+    calling thread only (thread executors, pipeline threads).
+    """
+    if os.name == "nt":
+        try:
+            import ctypes
+
+            kernel32 = ctypes.windll.kernel32
+            if thread_only:
+                kernel32.SetThreadPriority(kernel32.GetCurrentThread(), 0x00010000)  # THREAD_MODE_BACKGROUND_BEGIN
+            else:
+                kernel32.SetPriorityClass(kernel32.GetCurrentProcess(), 0x00100000)  # PROCESS_MODE_BACKGROUND_BEGIN
+        except Exception:
+            pass
+        return
+    # On Linux both settings apply to the calling thread and are inherited by threads it starts.
+    try:
+        os.nice(LOW_PRIORITY_NICE)
+    except (AttributeError, OSError):
+        pass
+    if sys.platform.startswith("linux"):
+        try:
+            import ctypes
+            import platform
+
+            nr = _IOPRIO_SET_SYSCALL.get(platform.machine().lower())
+            if nr is not None:
+                # IOPRIO_WHO_PROCESS, self, best-effort class (2) at its lowest level (7).
+                ctypes.CDLL(None, use_errno=True).syscall(nr, 1, 0, (2 << 13) | 7)
+        except Exception:
+            pass
+
+
+# --- Backups ------------------------------------------------------------------
+# A plain backup writes every byte of each changed region a second time. Where
+# the file system allows it the copy is made without that: a reflink (FICLONE;
+# btrfs, XFS, bcachefs, ...) shares the original's extents, and copy_file_range
+# or sendfile at least keeps the copy inside the kernel. In rebuild mode the
+# original can instead be hardlinked as the backup, since the rebuilt file
+# replaces it under a new inode anyway. The delta method skips .bak files
+# altogether (see Delta backup journals below).
+
+BACKUP_METHODS = ("auto", "hardlink", "copy", "delta")
+# Linux FICLONE ioctl.
+_FICLONE = 0x40049409
+
+
+def _kernel_copy(src_fd: int, dst_fd: int, size: int, limiter: Optional[RateLimiter] = None) -> Optional[str]:
+    """
+    Copy `size` bytes between files inside the kernel. Returns the call used, or None
+    if none works here or none copied all `size` bytes.
+    """
+    for name in ("copy_file_range", "sendfile"):
+        fn = getattr(os, name, None)
+        if fn is None:
+            continue
+        copied = 0
+        try:
+            while copied < size:
+                n = min(_THROTTLE_BLOCK, size - copied)
+                if limiter is not None:
+                    limiter.consume(n)
+                if name == "copy_file_range":
+                    k = fn(src_fd, dst_fd, n, copied, copied)
+                else:
+                    k = fn(dst_fd, src_fd, copied, n)
+                if k <= 0:
+                    break
+                copied += k
+        except OSError:
+            # Unsupported here (eg across file systems, or sendfile to a file on macOS).
+            if copied:
+                raise
+            continue
+        if copied != size:
+            # Stopped early (eg the source is shorter than expected): never report a
+            # truncated backup as made. The next call, or the plain copy, starts over.
+            continue
+        return name
+    return None
+
+
+def _backup_region(
+    path: Path, backup_path: Path, original: bytes, method: str = "auto", limiter: Optional[RateLimiter] = None
+) -> Tuple[str, int]:
+    """
+    Save the region's current contents (`original`, its mapped bytes) as backup_path,
+    using the cheapest strategy that works. Returns (strategy, bytes written).
+    """
+    if method == "hardlink":
+        try:
+            os.link(path, backup_path)
+            return "hardlink", 0
+        except OSError:
+            pass
+    if method != "copy":
+        try:
+            import fcntl
+
+            with open(path, "rb") as src, open(backup_path, "wb") as dst:
+                fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+            return "reflink", 0
+        except (ImportError, OSError):
+            pass
+        with open(path, "rb") as src, open(backup_path, "wb") as dst:
+            used = _kernel_copy(src.fileno(), dst.fileno(), len(original), limiter)
+        if used is not None:
+            return used, len(original)
+    with open(backup_path, "wb") as f:
+        _throttled(f, limiter).write(original)
+    return "copy", len(original)
+
+
+# --- Delta backup journals ----------------------------------------------------
+# With --backup-method delta, no .bak copy is made. Before a region is written,
+# the original blob, location entry and timestamp of each chunk about to be
+# rewritten are appended to a journal folder for the run
+# (region/remap-journal-<time>/). Each process or thread appends to its own
+# segment file, so writers never share a file. Each record is fsynced before its
+# region is touched, and a torn record at the end of a segment is ignored.
+# --restore-journal (or --restore, for all journals of a dimension) puts the
+# saved chunks back, one task per region.
+#
+# Segment: _DELTA_MAGIC, then records of
+#   u32 body length, body, u32 CRC-32 of body
+#   body = u16 name length, region file name, u32 chunk count,
+#          per chunk: u16 index, u32 location entry, u32 timestamp, u32 blob length, blob
+
+DELTA_JOURNAL_PREFIX = "remap-journal-"
+_DELTA_MAGIC = b"TBRDELTA1\n"
+_DELTA_RECORD_HEAD = struct.Struct(">IH")
+_DELTA_CHUNK = struct.Struct(">HIII")
+
+# Open segment files of this process, by (journal folder, pid, thread id).
+_DELTA_SEGMENTS: Dict[Tuple[str, int, int], Any] = {}
+_DELTA_LOCK = threading.Lock()
+
+
+def _new_delta_journal_dir(region_dir: Path) -> Path:
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    d = region_dir / f"{DELTA_JOURNAL_PREFIX}{stamp}"
+    n = 1
+    while d.exists():
+        n += 1
+        d = region_dir / f"{DELTA_JOURNAL_PREFIX}{stamp}-{n}"
+    d.mkdir()
+    return d
+
+
+def _delta_segment(journal_dir: Path):
+    key = (str(journal_dir), os.getpid(), threading.get_ident())
+    with _DELTA_LOCK:
+        f = _DELTA_SEGMENTS.get(key)
+        if f is None:
+            f = open(journal_dir / f"{key[1]}-{key[2]}.seg", "ab")
+            if f.tell() == 0:
+                f.write(_DELTA_MAGIC)
+            _DELTA_SEGMENTS[key] = f
+        return f
+
+
+def _close_delta_segments() -> None:
+    with _DELTA_LOCK:
+        for f in _DELTA_SEGMENTS.values():
+            f.close()
+        _DELTA_SEGMENTS.clear()
+
+
+def _append_delta_record(
+    journal_dir: Path, region: Path, original: bytes, indices: Iterable[int], limiter: Optional[RateLimiter] = None
+) -> int:
+    """Save the original state of the given chunks of a region; durable on return. Returns bytes written."""
+    locs = _read_locations(original)
+    ts = _read_timestamps(original)
+    indices = sorted(indices)
+    name = region.name.encode("utf-8")
+    parts: List[Any] = [struct.pack(">H", len(name)), name, struct.pack(">I", len(indices))]
+    for idx in indices:
+        off, count = locs[idx]
+        # An empty blob records a chunk that did not exist.
+        blob = _get_chunk_blob(original, off, count) or b""
+        parts.append(_DELTA_CHUNK.pack(idx, (off << 8) | count, ts[idx], len(blob)))
+        parts.append(blob)
+    body = b"".join(parts)
+    record = struct.pack(">I", len(body)) + body + struct.pack(">I", zlib.crc32(body))
+    if limiter is not None:
+        limiter.consume(len(record))
+    f = _delta_segment(journal_dir)
+    f.write(record)
+    f.flush()
+    os.fsync(f.fileno())
+    return len(record)
+
+
+def _scan_delta_journal(journal_dir: Path) -> Dict[str, List[Tuple[str, int]]]:
+    """
+    Index a journal folder without loading chunk data: region file name ->
+    [(segment path, record offset)] for every complete record.
+    """
+    records: Dict[str, List[Tuple[str, int]]] = {}
+    for seg in sorted(journal_dir.glob("*.seg")):
+        with open(seg, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if f.read(len(_DELTA_MAGIC)) != _DELTA_MAGIC:
+                continue
+            pos = len(_DELTA_MAGIC)
+            while pos + _DELTA_RECORD_HEAD.size <= size:
+                f.seek(pos)
+                body_len, name_len = _DELTA_RECORD_HEAD.unpack(f.read(_DELTA_RECORD_HEAD.size))
+                end = pos + 4 + body_len + 4
+                if end > size:
+                    break  # torn record from an interrupted run
+                name = f.read(name_len).decode("utf-8", "replace")
+                records.setdefault(name, []).append((str(seg), pos))
+                pos = end
+    return records
+
+
+def _read_delta_record(segment: str, offset: int) -> List[Tuple[int, int, bytes]]:
+    """Chunks of one journal record as [(index, timestamp, original blob)]."""
+    with open(segment, "rb") as f:
+        f.seek(offset)
+        (body_len,) = struct.unpack(">I", f.read(4))
+        body = f.read(body_len)
+        crc = f.read(4)
+    if len(body) != body_len or len(crc) != 4 or struct.unpack(">I", crc)[0] != zlib.crc32(body):
+        raise ValueError(f"damaged journal record in {Path(segment).name} at byte {offset}")
+    (name_len,) = struct.unpack_from(">H", body, 0)
+    pos = 2 + name_len
+    (n,) = struct.unpack_from(">I", body, pos)
+    pos += 4
+    chunks: List[Tuple[int, int, bytes]] = []
+    for _ in range(n):
+        idx, _, ts, blob_len = _DELTA_CHUNK.unpack_from(body, pos)
+        pos += _DELTA_CHUNK.size
+        chunks.append((idx, ts, body[pos : pos + blob_len]))
+        pos += blob_len
+    return chunks
+
+
+# --- Restoring backups ---------------------------------------------------------
+# --restore puts a dimension back the way it was before it was remapped: regions
+# with a .bak file get it copied back, regions recorded in delta journals get
+# their saved chunks back. Regions that already match are not written, and every
+# write goes to a .tmp file that replaces the region. Backups are kept.
+
+
+@dataclass
+class RestoreResult:
+    name: str
+    # "bak" or "journal"
+    source: str
+    restored: bool = False
+    # Chunks put back (journal restores only).
+    chunks: int = 0
+    bytes_written: int = 0
+
+
+def _files_identical(a: Path, b: Path) -> bool:
+    """Same file, or the same size and contents."""
+    try:
+        if os.path.samefile(a, b):
+            return True
+        if a.stat().st_size != b.stat().st_size:
+            return False
+    except FileNotFoundError:
+        return False
+    with open(a, "rb") as fa, open(b, "rb") as fb:
+        while True:
+            x = fa.read(_THROTTLE_BLOCK)
+            if x != fb.read(_THROTTLE_BLOCK):
+                return False
+            if not x:
+                return True
+
+
+def _restore_region_from_backup(
+    region_file: str, backup_file: str, dry_run: bool, write_limiter: Optional[RateLimiter] = None
+) -> RestoreResult:
+    """Copy a .bak file back over its region unless they already match."""
+    path, backup = Path(region_file), Path(backup_file)
+    result = RestoreResult(path.name, "bak")
+    if path.exists():
+        _recover_interrupted_write(path, dry_run)
+    size = backup.stat().st_size
+    if size % SECTOR_BYTES:
+        raise ValueError(f"backup {backup.name} is not a whole number of sectors ({size} bytes)")
+    if _files_identical(path, backup):
+        return result
+    result.restored = True
+    if dry_run:
+        return result
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with _map_region(backup) as data:
+        # Never hardlink: the next run would then modify the backup along with the region.
+        _, result.bytes_written = _backup_region(backup, tmp, data, "auto", write_limiter)
+    tmp.replace(path)
+    return result
+
+
+def _restore_region_from_delta(
+    region_file: str,
+    records: Sequence[Tuple[str, int]],
+    dry_run: bool,
+    write_limiter: Optional[RateLimiter] = None,
+) -> RestoreResult:
+    """
+    Put the chunks saved in a region's journal records back, oldest record first.
+    Chunks that already match are left alone, and a region with nothing to
+    restore is not written.
+    """
+    path = Path(region_file)
+    _recover_interrupted_write(path, dry_run)
+    saved: Dict[int, Tuple[int, bytes]] = {}
+    for segment, offset in records:
+        for idx, ts, blob in _read_delta_record(segment, offset):
+            # The first record of a chunk holds its oldest state.
+            saved.setdefault(idx, (ts, blob))
+
+    result = RestoreResult(path.name, "journal")
+    blobs: Dict[int, Tuple[bytes, bool]] = {}
+    timestamps: Dict[int, int] = {}
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with _map_region(path) as current:
+        locs = _read_locations(current)
+        current_ts = _read_timestamps(current)
+        for idx, (ts, blob) in saved.items():
+            off, count = locs[idx]
+            now = _get_chunk_blob(current, off, count) if off and count else None
+            same = (now if now is not None else b"") == blob and (not blob or current_ts[idx] == ts)
+            # A slice of the map left alive past the `with` keeps the region mapped, and
+            # Windows cannot replace a mapped file.
+            del now
+            if same:
+                continue
+            blobs[idx] = (blob, False)
+            timestamps[idx] = ts
+        result.chunks = len(blobs)
+        result.restored = bool(blobs)
+        if blobs and not dry_run:
+            with open(tmp, "wb") as f:
+                result.bytes_written = _write_rebuilt_region(_throttled(f, write_limiter), current, blobs, timestamps)
+    if blobs and not dry_run:
+        tmp.replace(path)
+    return result
+
+
+def _find_backups(
+    region_dir: Path, journal_dirs: Sequence[Path]
+) -> Tuple[Dict[str, Path], Dict[str, List[Tuple[str, int]]]]:
+    """
+    Backups for the regions of a folder: region name -> .bak file, and region
+    name -> journal records (journals in the given order, oldest first).
+    """
+    baks = {p.name[: -len(".bak")]: p for p in sorted(region_dir.glob("r.*.*.mca.bak"))}
+    records: Dict[str, List[Tuple[str, int]]] = {}
+    for d in journal_dirs:
+        for name, recs in _scan_delta_journal(d).items():
+            records.setdefault(name, []).extend(recs)
+    return baks, records
+
+
+# --- Output worlds ---------------------------------------------------------------
+# --output-world leaves the source world alone: the whole world is first cloned
+# into the output folder without copying data where the file system allows it,
+# then the run works on the output's region folder as usual. Rebuilt regions are
+# written to a .tmp file that replaces the clone, which never touches the
+# source file, even through a hardlink.
+
+# Backups and leftovers of this tool that are not carried over.
+_MIRROR_SKIP_SUFFIXES = (".mca.bak", ".mca.tmp")
+
+
+def _clone_file(src: Path, dst: Path, hardlink: bool = True) -> str:
+    """Make dst a copy of src, cheapest first: reflink, hardlink, then a real copy. Returns the one used."""
+    try:
+        import fcntl
+
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+        shutil.copystat(src, dst)
+        return "reflink"
+    except (ImportError, OSError):
+        pass
+    if hardlink:
+        try:
+            if dst.exists():
+                dst.unlink()  # left behind by the failed reflink
+            os.link(src, dst)
+            return "hardlink"
+        except OSError:
+            pass
+    shutil.copy2(src, dst)
+    return "copy"
+
+
+def _mirror_world(world: Path, out: Path) -> Dict[str, int]:
+    """Clone every file of a world folder into out (see _clone_file). Returns counts per method."""
+    counts: Dict[str, int] = {}
+    for root, dirs, files in os.walk(world, followlinks=True):
+        dirs[:] = sorted(d for d in dirs if not d.startswith(DELTA_JOURNAL_PREFIX))
+        target = out / Path(root).relative_to(world)
+        target.mkdir(parents=True, exist_ok=True)
+        for name in sorted(files):
+            if name.endswith(_MIRROR_SKIP_SUFFIXES):
+                continue
+            src = Path(root) / name
+            # Rolling back an interrupted in-place write rewrites the region file itself.
+            hardlink = not (name.endswith(".mca") and _journal_path(src).exists())
+            used = _clone_file(src, target / name, hardlink)
+            counts[used] = counts.get(used, 0) + 1
+    return counts
+
+
+# --- Incremental manifest ----------------------------------------------------------
+# After a run, the region folder gets a manifest of every region that finished:
+# its size, mtime and chunk timestamp table. It is keyed by a hash of the mapping
+# and the options that change the output. The next run with the same key skips
+# regions whose size and mtime have not moved. In the regions that did change, it
+# skips the chunks whose timestamp has not moved: the game stamps every chunk it
+# saves, and this tool stamps every chunk it rewrites.
+
+MANIFEST_NAME = "remap-manifest.json"
+INCREMENTAL_MODES = ("on", "rescan", "off")
+# Bump when a change to the remapper would change the output for the same options.
+_MANIFEST_VERSION = 1
+
+
+def _manifest_key(
+    mapping: Dict[str, str], unmapped_terralith_to: Optional[str], y_min: Optional[int], y_max: Optional[int]
+) -> str:
+    text = json.dumps(
+        {
+            "version": _MANIFEST_VERSION,
+            "mapping": sorted(mapping.items()),
+            "unmapped_terralith_to": unmapped_terralith_to,
+            "y": [y_min, y_max],
+        }
+    )
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _load_manifest(region_dir: Path, key: str) -> Dict[str, Dict[str, Any]]:
+    """Entries of the region folder's manifest, by region file name; empty if it is missing or for other options."""
+    try:
+        data = json.loads((region_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("key") != key:
+        return {}
+    return data.get("regions") or {}
+
+
+def _region_state(path: Path) -> Dict[str, Any]:
+    """Manifest entry for a region as it is on disk now."""
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        header = f.read(HEADER_BYTES)
+    return {
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "timestamps": base64.b64encode(zlib.compress(header[SECTOR_BYTES:HEADER_BYTES])).decode("ascii"),
+    }
+
+
+def _region_unchanged(path: Path, entry: Dict[str, Any]) -> bool:
+    try:
+        st = path.stat()
+    except OSError:
+        return False
+    return st.st_size == entry.get("size") and st.st_mtime_ns == entry.get("mtime_ns")
+
+
+def _manifest_timestamps(entry: Dict[str, Any]) -> Optional[bytes]:
+    try:
+        table = zlib.decompress(base64.b64decode(entry["timestamps"]))
+    except (KeyError, TypeError, ValueError, zlib.error):
+        return None
+    return table if len(table) == SECTOR_BYTES else None
+
+
+def _save_manifest(region_dir: Path, key: str, regions: Dict[str, Dict[str, Any]]) -> None:
+    # Replaced, never rewritten, so a hardlinked copy (eg --output-world) keeps its own.
+    path = region_dir / MANIFEST_NAME
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"key": key, "regions": dict(sorted(regions.items()))}, f, separators=(",", ":"))
+    tmp.replace(path)
+
+
+# --- Threaded chunk (de)compression ------------------------------------------
+# zlib releases the GIL while it works, so a few threads per worker can decompress
+# upcoming chunks and compress finished ones while the worker parses and splices
+# (--compress-threads). This helps most when there are fewer tasks than cores.
+# The pool belongs to the worker thread, so thread workers (--executor thread) get
+# a pool each, just like worker processes, instead of queueing on a shared one.
+
+_CODEC_POOLS = threading.local()
+
+
+def _codec_pool(threads: int) -> Optional[ThreadPoolExecutor]:
+    """The calling worker's (de)compression thread pool, created on first use; None when disabled."""
+    if threads <= 0:
+        return None
+    pool = getattr(_CODEC_POOLS, "pool", None)
+    if pool is None or _CODEC_POOLS.threads != threads:
+        if pool is not None:
+            pool.shutdown(wait=True)
+        # Dropped with the worker thread; its idle threads then exit on their own.
+        pool = _CODEC_POOLS.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="chunk-codec")
+        _CODEC_POOLS.threads = threads
+    return pool
+
+
+def _iter_chunk_payloads(
+    original: bytes,
+    lo: int,
+    hi: int,
+    pool: Optional[ThreadPoolExecutor],
+    depth: int,
+    sectors: Optional[Tuple[int, int]] = None,
+    skip: Optional[Set[int]] = None,
+    limiter: Optional[RateLimiter] = None,
+) -> Iterator[Tuple[ChunkPointer, bytes, Callable[[], bytes]]]:
+    """
+    Yield (pointer, blob, decompress) for the present chunks with lo <= idx < hi (and,
+    with `sectors`, a sector offset in that [start, end) range), where decompress()
+    returns the chunk's raw NBT (or raises). Chunk indices in `skip` are not read.
+    With a pool, up to `depth` chunks ahead of the caller are decompressed in the
+    background.
+
+    `original` is usually a memory map, so touching a chunk's bytes is what reads it
+    from disk. Each chunk's sectors are charged to `limiter` before that happens,
+    including for chunks read ahead for the pool.
+    """
+    s_lo, s_hi = sectors if sectors is not None else (0, 1 << 24)
+
+    def read(ptr: ChunkPointer) -> Optional[bytes]:
+        if limiter is not None:
+            limiter.consume(ptr.sector_count * SECTOR_BYTES)
+        return _get_chunk_blob(original, ptr.off_sectors, ptr.sector_count)
+
+    chunks = (
+        (ptr, blob)
+        for ptr in _iter_present_chunks(original)
+        if lo <= ptr.idx < hi and s_lo <= ptr.off_sectors < s_hi and not (skip and ptr.idx in skip)
+        for blob in (read(ptr),)
+        if blob is not None
+    )
+    if pool is None:
+        for ptr, blob in chunks:
+            yield ptr, blob, functools.partial(_decompress_chunk_nbt, blob)
+        return
+    ahead: "deque[Tuple[ChunkPointer, bytes, Future]]" = deque()
+    try:
+        for ptr, blob in chunks:
+            ahead.append((ptr, blob, pool.submit(_decompress_chunk_nbt, blob)))
+            if len(ahead) > depth:
+                ptr, blob, fut = ahead.popleft()
+                yield ptr, blob, fut.result
+        while ahead:
+            ptr, blob, fut = ahead.popleft()
+            yield ptr, blob, fut.result
+    finally:
+        # Nothing may still be reading the mapped region once the caller is done with it.
+        for _, _, fut in ahead:
+            fut.cancel()
+        wait([fut for _, _, fut in ahead])
+
+
+def _recover_interrupted_write(path: Path, dry_run: bool) -> None:
+    if not _journal_path(path).exists():
+        return
+    if dry_run:
+        print(f"[warn] {path.name}: interrupted in-place write found (journal present); run without --dry-run to roll it back", flush=True)
+    elif _rollback_region_journal(path):
+        print(f"[warn] {path.name}: rolled back an interrupted in-place write", flush=True)
+
+
+def _remap_region_chunks(
+    path: Path,
+    original: bytes,
+    chunk_range: Optional[Tuple[int, int]],
+    mapping: BiomeMatcher,
+    y_min: Optional[int],
+    y_max: Optional[int],
+    unmapped_terralith_to: Optional[str],
+    debug_limit: int,
+    debug_errors: int,
+    debug_structure: int,
+    fast_nbt: bool,
+    verify_splice: bool,
+    use_prefilter: bool,
+    compress_threads: int = 0,
+    read_limiter: Optional[RateLimiter] = None,
+    sectors: Optional[Tuple[int, int]] = None,
+    deadline: float = 0.0,
+    slow_chunks: int = 0,
+    known_timestamps: Optional[bytes] = None,
+) -> Tuple[RegionResult, Dict[int, Tuple[bytes, bool]]]:
+    """
+    Remap the chunks of a mapped region whose index falls in chunk_range (all chunks if None)
+    and, if given, whose sector offset falls in `sectors`. Returns the stats and the
+    recompressed blobs of changed chunks, keyed by chunk index. Nothing is written to disk.
+
+    With a deadline (seconds), the loop stops at the first chunk that starts after it;
+    result.resume_sector is then that chunk's sector offset, and the caller reschedules
+    the rest. The `slow_chunks` slowest chunks are kept in result.slow_chunks.
+
+    known_timestamps is the region's timestamp table from the manifest; chunks whose
+    timestamp still matches it are skipped without being read (result.chunks_unchanged).
+    """
+    processed = 0
+    changed = 0
+    entries_changed = 0
+    skipped = 0
+    parse_errors = 0
+    cursor_fallbacks = 0
+    structure_printed = 0
+
+    debug_samples: List[str] = []
+
+    updated_blobs: Dict[int, Tuple[bytes, bool]] = {}
+    needles = mapping.prefilter_needles() if use_prefilter else None
+    prefilter = _compile_prefilter(tuple(needles)) if needles else None
+    hits_before, misses_before = mapping.palette_hits, mapping.palette_misses
+    lo, hi = chunk_range if chunk_range is not None else (0, 1024)
+    t0 = time.perf_counter()
+    bytes_read = HEADER_BYTES if chunk_range is None else 0
+    if read_limiter is not None:
+        read_limiter.consume(bytes_read)
+
+    pool = _codec_pool(compress_threads)
+    depth = 2 * compress_threads
+    compressing: "deque[Tuple[int, Future]]" = deque()
+    unchanged: Optional[Set[int]] = None
+    if known_timestamps is not None and len(original) >= HEADER_BYTES:
+        current_ts = original[SECTOR_BYTES:HEADER_BYTES]
+        unchanged = {i for i in range(lo, hi) if current_ts[i * 4 : i * 4 + 4] == known_timestamps[i * 4 : i * 4 + 4]}
+
+    def store(idx: int, new_raw: bytes, comp: Optional[int]) -> None:
+        if pool is None:
+            updated_blobs[idx] = (_compress_chunk_nbt(new_raw, compression_type=comp), True)
+            return
+        compressing.append((idx, pool.submit(_compress_chunk_nbt, new_raw, comp)))
+        if len(compressing) > depth:
+            done_idx, fut = compressing.popleft()
+            updated_blobs[done_idx] = (fut.result(), True)
+
+    slowest: List[Tuple[float, int]] = []
+    resume_sector = 0
+    timed_idx = -1
+    timed_start = 0.0
+    with contextlib.closing(_iter_chunk_payloads(original, lo, hi, pool, depth, sectors, unchanged, read_limiter)) as payloads:
+        for ptr, blob, decompress in payloads:
+            now = time.perf_counter()
+            if timed_idx >= 0 and slow_chunks:
+                _keep_largest(slowest, (now - timed_start, timed_idx), slow_chunks)
+            if deadline and processed and now - t0 > deadline:
+                resume_sector = ptr.off_sectors
+                timed_idx = -1
+                break
+            timed_idx, timed_start = ptr.idx, now
+            processed += 1
+            bytes_read += ptr.sector_count * SECTOR_BYTES
+
+            comp = _chunk_blob_compression_type(blob)
+            try:
+                raw_nbt = decompress()
+                want_structure = debug_structure > 0 and structure_printed < debug_structure
+                # Keep parsing everything while we still owe debug samples / structure dumps.
+                if (
+                    prefilter is not None
+                    and not want_structure
+                    and len(debug_samples) >= debug_limit
+                    and prefilter.search(raw_nbt) is None
+                ):
+                    skipped += 1
+                    continue
+                if fast_nbt and not want_structure:
+                    # Fast path: find palette strings without building an nbtlib tree.
+                    # Only chunks that actually need rewriting are parsed below.
+                    try:
+                        edits = _plan_palette_edits(
+                            _scan_chunk_biomes(raw_nbt), mapping, y_min, y_max, unmapped_terralith_to, debug_samples, debug_limit
+                        )
+                    except _NbtCursorError:
+                        cursor_fallbacks += 1
+                    else:
+                        if not edits:
+                            continue
+                        new_raw = _splice_palette_edits(raw_nbt, edits)
+                        if verify_splice:
+                            ref_raw, _ = _remap_raw_nbt_with_nbtlib(raw_nbt, mapping, y_min, y_max, unmapped_terralith_to)
+                            if ref_raw != new_raw:
+                                diff_at = next(
+                                    (i for i, (a, b) in enumerate(zip(ref_raw, new_raw)) if a != b),
+                                    min(len(ref_raw), len(new_raw)),
+                                )
+                                print(
+                                    f"[verify-splice] {path.name} chunk_idx={ptr.idx}: spliced NBT differs from the "
+                                    f"nbtlib round-trip at byte {diff_at}",
+                                    flush=True,
+                                )
+                        store(ptr.idx, new_raw, comp)
+                        changed += 1
+                        entries_changed += len(edits)
+                        continue
+
+                # Slow path: the cursor could not read this chunk (or --no-fast-nbt / --debug-structure).
+                # Region chunk payloads are full NBT files, so parse as File for compatibility.
+                nbt_file = nbtlib.File.parse(io.BytesIO(raw_nbt), byteorder="big")
+                # In nbtlib 2.x, File behaves like the root Compound (no `.root` attribute).
+                root = nbt_file
+
+                if want_structure:
+                    try:
+                        top_keys = list(root.keys()) if isinstance(root, dict) else []
+                        print(f"[debug-structure] {path.name} idx={ptr.idx}: root keys={top_keys}")
+                        secs = _get_sections(root)
+                        if not secs:
+                            print("[debug-structure]  sections: <missing/empty>")
+                        else:
+                            print(f"[debug-structure]  sections type={type(secs).__name__} len={len(secs)}")
+                            if len(secs) > 0:
+                                s0 = secs[0]
+                                s0_keys = list(s0.keys()) if isinstance(s0, dict) else []
+                                print(f"[debug-structure]  section[0] keys={s0_keys}")
+                                if isinstance(s0, dict):
+                                    b = s0.get('biomes') or s0.get('Biomes')
+                                    if b is None:
+                                        print("[debug-structure]  section[0].biomes: <missing>")
+                                    else:
+                                        b_keys = list(b.keys()) if isinstance(b, dict) else []
+                                        print(f"[debug-structure]  section[0].biomes type={type(b).__name__} keys={b_keys}")
+                                        if isinstance(b, dict):
+                                            pal = b.get("palette") or b.get("Palette")
+                                            print(f"[debug-structure]  section[0].biomes.palette type={type(pal).__name__}")
+                    except Exception:
+                        pass
+                    structure_printed += 1
+
+                was_changed, ec = _remap_chunk_biome_palettes(
+                    root, mapping, y_min, y_max, unmapped_terralith_to, debug_samples, debug_limit
+                )
+                if was_changed:
+                    buf = io.BytesIO()
+                    nbt_file.write(buf, byteorder="big")
+                    new_raw = buf.getvalue()
+                    store(ptr.idx, new_raw, comp)
+                    changed += 1
+                    entries_changed += ec
+            except Exception as e:
+                parse_errors += 1
+                # Always log IndexError and other critical errors, even if debug_errors is 0
+                is_critical = isinstance(e, (IndexError, KeyError, AttributeError))
+                if is_critical or (debug_errors > 0 and parse_errors <= debug_errors):
+                    try:
+                        error_msg = f"[error] {path.name} chunk_idx={ptr.idx}: {type(e).__name__}: {e}"
+                        print(error_msg, flush=True)
+                    except Exception:
+                        pass
+                # For critical errors, also include a traceback hint for debugging
+                if is_critical and parse_errors == 1:
+                    try:
+                        import traceback
+                        tb_lines = traceback.format_exc().splitlines()
+                        if len(tb_lines) > 1:
+                            print(f"[error] Traceback (first occurrence):", flush=True)
+                            for line in tb_lines[-5:]:  # Last 5 lines of traceback
+                                print(f"[error]   {line}", flush=True)
+                    except Exception:
+                        pass
+                continue
+
+    if timed_idx >= 0 and slow_chunks:
+        _keep_largest(slowest, (time.perf_counter() - timed_start, timed_idx), slow_chunks)
+    while compressing:
+        done_idx, fut = compressing.popleft()
+        updated_blobs[done_idx] = (fut.result(), True)
+
+    if debug_errors > 0:
+        where = f" chunks {lo}..{hi - 1}" if chunk_range is not None else ""
+        print(
+            f"[debug] {path.name}{where}: chunks processed={processed}, parse_errors={parse_errors}, "
+            f"nbt_cursor_fallbacks={cursor_fallbacks}, prefilter_skipped={skipped}"
+        )
+    result = _region_result(path.name, processed, changed, entries_changed, debug_samples, skipped, mapping, hits_before, misses_before)
+    result.elapsed = time.perf_counter() - t0
+    result.bytes_read = bytes_read
+    result.resume_sector = resume_sector
+    result.chunk_errors = parse_errors
+    result.slow_chunks = [(t, path.name, idx) for t, idx in slowest]
+    if unchanged:
+        # Only those before the deadline stop; the rest are counted by the task that resumes.
+        s_lo, s_hi = sectors if sectors is not None else (0, 1 << 24)
+        s_hi = resume_sector or s_hi
+        result.chunks_unchanged = sum(
+            1
+            for ptr in _iter_present_chunks(original)
+            if ptr.idx in unchanged and lo <= ptr.idx < hi and s_lo <= ptr.off_sectors < s_hi
+        )
+    return result, updated_blobs
+
+
+def _commit_region_changes(
+    path: Path,
+    updated_blobs: Dict[int, Tuple[bytes, bool]],
+    make_backup: bool,
+    write_mode: str,
+    write_limiter: Optional[RateLimiter] = None,
+    backup_method: str = "auto",
+    delta_journal: Optional[str] = None,
+) -> Tuple[int, str]:
+    """
+    Back up the region and write the updated chunks into it. Returns the bytes written
+    and the backup strategy used ("" if no backup was made).
+    """
+    written = 0
+    backup_used = ""
+    with _map_region(path) as original:
+        # backups
+        backup_path = path.with_suffix(path.suffix + ".bak")
+        if make_backup and backup_method == "delta":
+            if delta_journal is not None:
+                written += _append_delta_record(Path(delta_journal), path, original, updated_blobs, write_limiter)
+                backup_used = "delta"
+        elif make_backup and not backup_path.exists():
+            backup_used, n = _backup_region(path, backup_path, original, backup_method, write_limiter)
+            written += n
+
+        original_size = len(original)
+        plan = None
+        if write_mode == "inplace" and backup_path.exists() and os.path.samefile(path, backup_path):
+            # A hardlinked backup shares the region's data; writing in place would change it too.
+            write_mode = "rebuild"
+        if write_mode == "inplace":
+            plan = _plan_in_place_layout(original, updated_blobs)
+            if plan is None:
+                print(f"[warn] {path.name}: overlapping chunks in region header; rebuilding the file instead of writing in place", flush=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        if plan is None:
+            # Stream the rebuilt region to disk while the original is still mapped.
+            with open(tmp, "wb") as f:
+                written += _write_rebuilt_region(_throttled(f, write_limiter), original, updated_blobs)
+
+    # The region is unmapped from here on, so it can be modified or replaced.
+    if plan is not None:
+        return written + _write_region_in_place(path, original_size, plan, write_limiter), backup_used
+
+    # atomic replace
+    tmp.replace(path)
+    return written, backup_used
+
+
+def _process_region_file(
+    region_file: str,
+    mapping: Union[BiomeMatcher, Dict[str, str]],
+    y_min: Optional[int],
+    y_max: Optional[int],
+    unmapped_terralith_to: Optional[str],
+    debug_limit: int,
+    debug_errors: int,
+    debug_structure: int,
+    dry_run: bool,
+    make_backup: bool,
+    fast_nbt: bool = True,
+    verify_splice: bool = False,
+    use_prefilter: bool = True,
+    write_mode: str = "rebuild",
+    compress_threads: int = 0,
+    read_limiter: Optional[RateLimiter] = None,
+    write_limiter: Optional[RateLimiter] = None,
+    deadline: float = 0.0,
+    slow_chunks: int = 0,
+    backup_method: str = "auto",
+    delta_journal: Optional[str] = None,
+    known_timestamps: Optional[bytes] = None,
+) -> RegionResult:
+    path = Path(region_file)
+    _recover_interrupted_write(path, dry_run)
+    matcher = _as_matcher(mapping, unmapped_terralith_to)
+
+    with _map_region(path) as original:
+        result, updated_blobs = _remap_region_chunks(
+            path, original, None, matcher, y_min, y_max, unmapped_terralith_to,
+            debug_limit, debug_errors, debug_structure, fast_nbt, verify_splice, use_prefilter, compress_threads,
+            read_limiter, None, deadline, slow_chunks, known_timestamps,
+        )
+
+    if result.resume_sector:
+        # Past the soft deadline: the main process finishes the region and writes it.
+        result.deferred_blobs = updated_blobs
+        return result
+    if result.chunks_changed and not dry_run:
+        written, result.backup_method = _commit_region_changes(
+            path, updated_blobs, make_backup, write_mode, write_limiter, backup_method, delta_journal
+        )
+        result.bytes_written += written
+    return result
+
+
+# --- Chunk-range subtasks -----------------------------------------------------
+# A handful of dense regions would otherwise keep only a handful of workers busy.
+# Regions with many more chunks than a fair per-task share are split into
+# contiguous chunk-index ranges. Workers return the recompressed blobs, and the
+# parent writes each split region once all of its ranges are back. Regions that
+# turn out to be slow only while running (eg chunks with huge block entities) are
+# split the same way once they pass the soft deadline.
+
+SPLIT_MIN_TASK_CHUNKS = 64
+
+# A task still running after --soft-deadline seconds stops at the next chunk and the
+# rest of its chunks are split, by sector range, into tasks for idle workers.
+SOFT_DEADLINE_SECONDS = 60.0
+DEADLINE_SPLIT_MIN_CHUNKS = 4
+# Slowest regions and chunks listed at the end of a run (--slow-report).
+SLOW_REPORT_SIZE = 5
+# Regions with the most skipped chunks listed at the end of a run (--verbose).
+SKIP_REPORT_SIZE = 10
+
+
+@dataclass
+class _SplitRegion:
+    ranges_left: int
+    result: Optional[RegionResult] = None
+    updated_blobs: Dict[int, Tuple[bytes, bool]] = field(default_factory=dict)
+    failed: bool = False
+
+
+def _process_region_chunk_range(
+    region_file: str,
+    chunk_range: Tuple[int, int],
+    mapping: Union[BiomeMatcher, Dict[str, str]],
+    y_min: Optional[int],
+    y_max: Optional[int],
+    unmapped_terralith_to: Optional[str],
+    debug_limit: int,
+    debug_errors: int,
+    debug_structure: int,
+    fast_nbt: bool = True,
+    verify_splice: bool = False,
+    use_prefilter: bool = True,
+    compress_threads: int = 0,
+    read_limiter: Optional[RateLimiter] = None,
+    sectors: Optional[Tuple[int, int]] = None,
+    deadline: float = 0.0,
+    slow_chunks: int = 0,
+    known_timestamps: Optional[bytes] = None,
+) -> Tuple[RegionResult, Dict[int, Tuple[bytes, bool]]]:
+    path = Path(region_file)
+    matcher = _as_matcher(mapping, unmapped_terralith_to)
+    with _map_region(path) as original:
+        return _remap_region_chunks(
+            path, original, chunk_range, matcher, y_min, y_max, unmapped_terralith_to,
+            debug_limit, debug_errors, debug_structure, fast_nbt, verify_splice, use_prefilter, compress_threads,
+            read_limiter, sectors, deadline, slow_chunks, known_timestamps,
+        )
+
+
+def _region_chunk_pointers(path: Path) -> List[ChunkPointer]:
+    """Chunks present in a region (in file order), read from its location table only."""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(SECTOR_BYTES)
+    except OSError:
+        return []
+    return list(_iter_present_chunks(header))
+
+
+def _region_chunk_indices(path: Path) -> List[int]:
+    return sorted(ptr.idx for ptr in _region_chunk_pointers(path))
+
+
+def _split_chunk_ranges(indices: List[int], parts: int) -> List[Tuple[int, int]]:
+    """Cut sorted chunk indices into `parts` contiguous [lo, hi) ranges of similar chunk counts."""
+    ranges: List[Tuple[int, int]] = []
+    lo = 0
+    for k in range(1, parts + 1):
+        cut = (len(indices) * k) // parts
+        hi = indices[cut] if cut < len(indices) else 1024
+        if hi > lo:
+            ranges.append((lo, hi))
+            lo = hi
+    return ranges
+
+
+def _plan_chunk_range_tasks(region_files: List[Path], workers: int) -> Dict[Path, List[Tuple[int, int]]]:
+    """
+    Pick the regions worth splitting into chunk-range subtasks, based on the chunk
+    counts in their headers. Regions that are not returned run as a single task.
+    """
+    if workers <= 1:
+        return {}
+    counts = {p: _region_chunk_indices(p) for p in region_files}
+    total = sum(len(v) for v in counts.values())
+    per_task = max(SPLIT_MIN_TASK_CHUNKS, math.ceil(total / (workers * 2)))
+    plan: Dict[Path, List[Tuple[int, int]]] = {}
+    for p, indices in counts.items():
+        if len(indices) >= 2 * per_task:
+            parts = min(workers, math.ceil(len(indices) / per_task))
+            plan[p] = _split_chunk_ranges(indices, parts)
+    return plan
+
+
+def _split_remaining_chunks(
+    path: Path,
+    chunk_range: Tuple[int, int],
+    sectors: Optional[Tuple[int, int]],
+    resume_sector: int,
+    parts: int,
+) -> List[Tuple[int, int]]:
+    """
+    Sector ranges covering the chunks a task did not reach before its soft deadline
+    (index in chunk_range, sector offset from resume_sector to the end of the task's
+    sectors), cut into at most `parts` pieces with similar chunk counts.
+    """
+    lo, hi = chunk_range
+    s_hi = sectors[1] if sectors is not None else 1 << 24
+    offsets = [
+        ptr.off_sectors
+        for ptr in _region_chunk_pointers(path)
+        if lo <= ptr.idx < hi and resume_sector <= ptr.off_sectors < s_hi
+    ]
+    if not offsets:
+        return []
+    parts = max(1, min(parts, len(offsets) // DEADLINE_SPLIT_MIN_CHUNKS))
+    cuts = [offsets[(len(offsets) * k) // parts] for k in range(parts)] + [s_hi]
+    return [(a, b) for a, b in zip(cuts, cuts[1:]) if b > a]
+
+
+def _chunk_coords(region_name: str, idx: int) -> Optional[Tuple[int, int]]:
+    """World chunk coordinates of chunk `idx` in region r.X.Z.mca."""
+    parts = region_name.split(".")
+    try:
+        rx, rz = int(parts[1]), int(parts[2])
+    except (IndexError, ValueError):
+        return None
+    return rx * 32 + idx % 32, rz * 32 + idx // 32
+
+
+# --- Resource limits ----------------------------------------------------------
+# os.cpu_count() reports the host's CPUs, even inside a container limited to a
+# few of them. `--processes auto` also honours the affinity mask and the cgroup
+# CPU quota. The memory budget caps the worker count and keeps big regions from
+# all being in flight at once.
+
+_CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+# Rough resident memory of an idle worker (interpreter, nbtlib, caches).
+WORKER_BASE_MEMORY = 96 * 1024 * 1024
+# A task holds the mapped region plus the recompressed blobs and parsed chunks,
+# about this many times the region file size at peak.
+REGION_MEMORY_FACTOR = 3
+
+
+def _read_text(path: Path) -> Optional[str]:
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return None
+
+
+def _own_cgroup_dirs(controller: str) -> List[Path]:
+    """Directories of this process's cgroup for `controller` (v1) or the unified tree (v2), deepest first."""
+    text = _read_text(Path("/proc/self/cgroup"))
+    if not text:
+        return []
+    dirs: List[Path] = []
+    for line in text.splitlines():
+        parts = line.split(":", 2)
+        if len(parts) != 3:
+            continue
+        _, controllers, rel = parts
+        if controllers == "":
+            base = _CGROUP_ROOT
+        elif controller in controllers.split(","):
+            base = _CGROUP_ROOT / controllers
+            if not base.exists():
+                base = _CGROUP_ROOT / controller
+        else:
+            continue
+        # Inside a container the cgroup is usually mounted at the root of the tree.
+        d = base / rel.lstrip("/")
+        while True:
+            dirs.append(d)
+            if d == base:
+                break
+            d = d.parent
+        if base not in dirs:
+            dirs.append(base)
+    return dirs
+
+
+def _cgroup_cpu_limit() -> Optional[float]:
+    """CPU quota of this process's cgroup in CPUs (v2 cpu.max or v1 cfs quota), or None if unlimited."""
+    limits: List[float] = []
+    for d in _own_cgroup_dirs("cpu"):
+        text = _read_text(d / "cpu.max")
+        if text:
+            quota, _, period = text.partition(" ")
+            if quota != "max" and period:
+                limits.append(int(quota) / int(period))
+            continue
+        quota_text = _read_text(d / "cpu.cfs_quota_us")
+        period_text = _read_text(d / "cpu.cfs_period_us")
+        if quota_text and period_text and int(quota_text) > 0 and int(period_text) > 0:
+            limits.append(int(quota_text) / int(period_text))
+    return min(limits) if limits else None
+
+
+def _cgroup_memory_limit() -> Optional[int]:
+    """Memory limit of this process's cgroup in bytes (v2 memory.max or v1 limit_in_bytes), or None."""
+    limits: List[int] = []
+    for d in _own_cgroup_dirs("memory"):
+        for name in ("memory.max", "memory.limit_in_bytes"):
+            text = _read_text(d / name)
+            if text and text.isdigit():
+                # v1 reports "no limit" as a huge page-aligned number.
+                if int(text) < (1 << 60):
+                    limits.append(int(text))
+                break
+    return min(limits) if limits else None
+
+
+def available_cpu_count() -> int:
+    """CPUs this process may actually use: affinity mask, capped by the cgroup CPU quota."""
+    if hasattr(os, "process_cpu_count"):
+        cpus = os.process_cpu_count() or 1
+    elif hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0)) or 1
+    else:
+        cpus = os.cpu_count() or 1
+    try:
+        quota = _cgroup_cpu_limit()
+    except (OSError, ValueError):
+        quota = None
+    if quota is not None:
+        cpus = min(cpus, max(1, math.ceil(quota)))
+    return max(1, cpus)
+
+
+def _physical_memory() -> Optional[int]:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def _auto_memory_budget() -> Optional[int]:
+    """Three quarters of the cgroup memory limit (or of physical memory); None if unknown."""
+    try:
+        limit = _cgroup_memory_limit()
+    except (OSError, ValueError):
+        limit = None
+    if limit is None:
+        limit = _physical_memory()
+    return limit * 3 // 4 if limit else None
+
+
+def _parse_size(text: str) -> int:
+    """Parse a byte size such as 512M, 4G or 1.5GiB (binary units; a bare number is bytes)."""
+    m = re.fullmatch(r"\s*([0-9]*\.?[0-9]+)\s*([kmgt]?)(i?b)?\s*", text, re.IGNORECASE)
+    if not m:
+        raise ValueError(f"Invalid size: {text!r}")
+    scale = 1024 ** " kmgt".index(m.group(2).lower() or " ")
+    return int(float(m.group(1)) * scale)
+
+
+def _worker_memory_estimate(region_sizes: Iterable[int]) -> int:
+    """Peak memory of one worker, sized for the larger region files of the world."""
+    sizes = sorted(region_sizes)
+    typical = sizes[(len(sizes) * 9) // 10] if sizes else 0
+    return WORKER_BASE_MEMORY + REGION_MEMORY_FACTOR * typical
+
+
+def _task_memory(task: "RegionTask") -> int:
+    return REGION_MEMORY_FACTOR * task.weight
+
+
+# --- Task scheduling ----------------------------------------------------------
+# Big tasks go first so the end of a run is not one worker chewing on the
+# largest region while the rest idle. Only a small window of tasks is submitted
+# at a time, so huge worlds do not queue tens of thousands of futures up front.
+
+TASKS_IN_FLIGHT_PER_WORKER = 3
+
+# Region files are packed into shared tasks of up to this many bytes (--batch-kib).
+BATCH_BYTES = 1024 * 1024
+BATCH_MAX_REGIONS = 64
+
+
+@dataclass(frozen=True)
+class RegionTask:
+    # Scheduling weight (bytes of region data); larger tasks are submitted first.
+    weight: int
+    regions: Tuple[Path, ...]
+    # Set for one chunk range of a split region; None means whole regions.
+    chunk_range: Optional[Tuple[int, int]] = None
+    # Sector offset range [start, end) within chunk_range, for the rest of a task
+    # that passed the soft deadline; None means every sector.
+    sectors: Optional[Tuple[int, int]] = None
+
+
+def _region_sizes(region_files: Iterable[Path]) -> Dict[Path, int]:
+    sizes: Dict[Path, int] = {}
+    for p in region_files:
+        try:
+            sizes[p] = p.stat().st_size
+        except OSError:
+            sizes[p] = 0
+    return sizes
+
+
+def _plan_region_tasks(
+    region_files: List[Path],
+    workers: int,
+    split_regions: bool,
+    batch_bytes: int = BATCH_BYTES,
+    sizes: Optional[Dict[Path, int]] = None,
+    keep_order: bool = False,
+) -> List[RegionTask]:
+    """
+    Build the task list, largest first. Weights are file sizes; the chunk ranges of a
+    split region share its size evenly, since they hold similar chunk counts. Small
+    regions are packed together (in the given order) until a batch reaches the byte
+    budget, which is capped so that every worker still gets a few tasks. keep_order
+    leaves the tasks in region_files order instead of sorting them by weight.
+    """
+    split_plan = _plan_chunk_range_tasks(region_files, workers) if split_regions else {}
+    if sizes is None:
+        sizes = _region_sizes(region_files)
+    budget = min(batch_bytes, sum(sizes[p] for p in region_files) // (max(1, workers) * TASKS_IN_FLIGHT_PER_WORKER))
+
+    tasks: List[RegionTask] = []
+    batch: List[Path] = []
+    batch_size = 0
+
+    def flush_batch() -> None:
+        nonlocal batch_size
+        if batch:
+            tasks.append(RegionTask(batch_size, tuple(batch)))
+            batch.clear()
+            batch_size = 0
+
+    for p in region_files:
+        size = sizes[p]
+        ranges = split_plan.get(p)
+        if ranges is not None:
+            tasks.extend(RegionTask(size // len(ranges), (p,), r) for r in ranges)
+        elif size >= budget:
+            tasks.append(RegionTask(size, (p,)))
+        else:
+            if batch_size + size > budget or len(batch) >= BATCH_MAX_REGIONS:
+                flush_batch()
+            batch.append(p)
+            batch_size += size
+    flush_batch()
+    if not keep_order:
+        # Stable sort: equal weights keep name order.
+        tasks.sort(key=lambda t: t.weight, reverse=True)
+    return tasks
+
+
+def _iter_bounded(
+    ex: Executor,
+    jobs: Iterable[Tuple[Callable[..., Any], tuple, Any]],
+    window: int,
+    cost: Optional[Callable[[Any], int]] = None,
+    budget: Optional[int] = None,
+    group: Optional[Callable[[Any], Any]] = None,
+    group_limits: Optional[Dict[Any, int]] = None,
+    more: Optional["deque[Tuple[Callable[..., Any], tuple, Any]]"] = None,
+) -> Iterator[Tuple[Future, Any]]:
+    """
+    Submit (fn, args, tag) jobs keeping at most `window` of them in flight, and
+    yield (future, tag) as each one completes.
+
+    With a cost function and budget, a job is only submitted while the cost of
+    everything in flight stays within the budget. Jobs that do not fit are held
+    back (smaller jobs behind them may go first) until enough work completes; a
+    job larger than the whole budget still runs, but on its own.
+
+    With a group function, at most group_limits[key] jobs of a group are in flight
+    at once (groups without a limit are only bound by the window). Jobs over their
+    group's limit wait in a per-group queue, so other groups keep flowing past them.
+    Held and waiting jobs together are bounded by `window` as well: once that many
+    are queued, no more are pulled from `jobs` until some of them are submitted.
+
+    Jobs the caller appends to `more` while consuming results (eg the rest of a task
+    that was cut short) are submitted ahead of the remaining `jobs`.
+    """
+    jobs = iter(jobs)
+    limits = group_limits or {}
+    in_flight: Dict[Future, Tuple[Any, int, Any]] = {}
+    held: "deque[Tuple[Callable[..., Any], tuple, Any, int, Any]]" = deque()
+    waiting: Dict[Any, "deque[Tuple[Callable[..., Any], tuple, Any, int, Any]]"] = {}
+    running: Dict[Any, int] = {}
+    n_waiting = 0
+    in_flight_cost = 0
+    exhausted = False
+
+    def fits(c: int) -> bool:
+        return budget is None or not in_flight or in_flight_cost + c <= budget
+
+    def group_open(g: Any) -> bool:
+        return g not in limits or running.get(g, 0) < max(1, limits[g])
+
+    def next_waiting():
+        nonlocal n_waiting
+        for i, candidate in enumerate(held):
+            if group_open(candidate[4]) and fits(candidate[3]):
+                del held[i]
+                return candidate
+        for g, q in waiting.items():
+            if q and group_open(g) and fits(q[0][3]):
+                n_waiting -= 1
+                return q.popleft()
+        return None
+
+    while True:
+        while len(in_flight) < window:
+            job = next_waiting()
+            while job is None and (more or not exhausted) and len(held) + n_waiting < window:
+                if more:
+                    nxt = more.popleft()
+                else:
+                    nxt = next(jobs, None)
+                    if nxt is None:
+                        exhausted = True
+                        break
+                c = cost(nxt[2]) if cost is not None else 0
+                g = group(nxt[2]) if group is not None else None
+                if not group_open(g):
+                    waiting.setdefault(g, deque()).append((*nxt, c, g))
+                    n_waiting += 1
+                elif fits(c):
+                    job = (*nxt, c, g)
+                else:
+                    held.append((*nxt, c, g))
+            if job is None:
+                break
+            fn, fn_args, tag, c, g = job
+            in_flight[ex.submit(fn, *fn_args)] = (tag, c, g)
+            in_flight_cost += c
+            running[g] = running.get(g, 0) + 1
+        if not in_flight:
+            return
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        for fut in done:
+            tag, c, g = in_flight.pop(fut)
+            in_flight_cost -= c
+            running[g] -= 1
+            yield fut, tag
+
+
+# --- Device-aware scheduling --------------------------------------------------
+# Region files can live on several disks (a symlinked dimension folder, or region
+# files moved to another drive). Many parallel readers keep an SSD busy but make a
+# spinning disk seek back and forth between files. With more than one device, each
+# device gets its own task list: rotational disks are capped at a few tasks in
+# flight (--hdd-workers) and their files are read in physical order; SSDs keep the
+# largest-first order.
+
+DEVICE_SCHEDULING = ("auto", "on", "off")
+HDD_WORKERS = 2
+
+_SYS_DEV_BLOCK = Path("/sys/dev/block")
+# Linux FS_IOC_FIEMAP, with room for a single extent.
+_FS_IOC_FIEMAP = 0xC020660B
+_FIEMAP_FLAG_SYNC = 0x1
+_FIEMAP_HEADER = struct.Struct("=QQIIII")
+_FIEMAP_EXTENT = struct.Struct("=QQQQQIIII")
+
+
+@dataclass(frozen=True)
+class DeviceInfo:
+    dev: int
+    name: str
+    # True for spinning disks, False for SSDs, None if unknown (treated like an SSD).
+    rotational: Optional[bool]
+
+    def describe(self) -> str:
+        return f"{self.name} ({'HDD' if self.rotational else 'SSD' if self.rotational is False else 'unknown type'})"
+
+
+def _block_device_info(dev: int) -> DeviceInfo:
+    """Name and rotational flag of a block device, from sysfs (Linux only)."""
+    try:
+        sys_dir = (_SYS_DEV_BLOCK / f"{os.major(dev)}:{os.minor(dev)}").resolve(strict=True)
+    except (AttributeError, OSError, ValueError):
+        return DeviceInfo(dev, f"device {dev:#x}", None)
+    # A partition keeps its queue attributes on the parent disk.
+    for d in (sys_dir, sys_dir.parent):
+        text = _read_text(d / "queue" / "rotational")
+        if text in ("0", "1"):
+            return DeviceInfo(dev, sys_dir.name, text == "1")
+    return DeviceInfo(dev, sys_dir.name, None)
+
+
+def _region_devices(region_files: Iterable[Path]) -> Dict[Path, DeviceInfo]:
+    devices: Dict[int, DeviceInfo] = {}
+    out: Dict[Path, DeviceInfo] = {}
+    for p in region_files:
+        try:
+            dev = p.stat().st_dev
+        except OSError:
+            dev = 0
+        if dev not in devices:
+            devices[dev] = _block_device_info(dev)
+        out[p] = devices[dev]
+    return out
+
+
+def _physical_offset(path: Path) -> int:
+    """Disk offset of a file's first extent (FIEMAP), or its inode number where FIEMAP is unavailable."""
+    try:
+        import fcntl
+
+        buf = bytearray(_FIEMAP_HEADER.size + _FIEMAP_EXTENT.size)
+        # FIEMAP_FLAG_SYNC: freshly written files have no extents until their delayed allocation is flushed.
+        _FIEMAP_HEADER.pack_into(buf, 0, 0, (1 << 64) - 1, _FIEMAP_FLAG_SYNC, 0, 1, 0)
+        with open(path, "rb") as f:
+            fcntl.ioctl(f.fileno(), _FS_IOC_FIEMAP, buf)
+        if not _FIEMAP_HEADER.unpack_from(buf)[3]:
+            return 0  # empty file
+        return _FIEMAP_EXTENT.unpack_from(buf, _FIEMAP_HEADER.size)[1]
+    except (ImportError, OSError):
+        pass
+    try:
+        # Inode numbers roughly follow allocation order on most Unix file systems.
+        return path.stat().st_ino
+    except OSError:
+        return 0
+
+
+def _plan_device_tasks(
+    region_files: List[Path],
+    devices: Dict[Path, DeviceInfo],
+    workers: int,
+    hdd_workers: int,
+    split_regions: bool,
+    batch_bytes: int = BATCH_BYTES,
+    sizes: Optional[Dict[Path, int]] = None,
+) -> List[RegionTask]:
+    """
+    Plan each device's tasks on its own and interleave the lists, so every device has
+    work near the front of the queue. Regions on a rotational disk are neither split
+    (chunk ranges would be read out of order) nor sorted by size: they are batched and
+    submitted in physical order.
+    """
+    groups: Dict[int, List[Path]] = {}
+    for p in region_files:
+        groups.setdefault(devices[p].dev, []).append(p)
+    per_device: List[List[RegionTask]] = []
+    for files in groups.values():
+        if devices[files[0]].rotational:
+            offsets = {p: _physical_offset(p) for p in files}
+            files = sorted(files, key=offsets.__getitem__)
+            per_device.append(_plan_region_tasks(files, hdd_workers, False, batch_bytes, sizes, keep_order=True))
+        else:
+            per_device.append(_plan_region_tasks(files, workers, split_regions, batch_bytes, sizes))
+    return [t for round_ in itertools.zip_longest(*per_device) for t in round_ if t is not None]
+
+
+# --- Worker bootstrap ---------------------------------------------------------
+# The compiled mapping and run options are sent to each worker once, by the pool
+# initializer, instead of being pickled into every task. Tasks then carry only the
+# region path (and chunk range).
+#
+# The same task functions run under every --executor backend:
+#   process - a ProcessPoolExecutor (default);
+#   thread  - a ThreadPoolExecutor; no pickling or process startup, and it scales on
+#             free-threaded CPython builds (zlib releases the GIL even on normal ones);
+#   serial  - tasks run inline in the calling thread, for profiling or embedding.
+
+EXECUTORS = ("process", "thread", "serial")
+START_METHODS = ("auto", "fork", "forkserver", "spawn")
+
+# Imported by the forkserver before it forks any worker.
+_FORKSERVER_PRELOAD = ["nbtlib"]
+
+
+@dataclass(frozen=True)
+class RunConfig:
+    matcher: BiomeMatcher
+    y_min: Optional[int]
+    y_max: Optional[int]
+    unmapped_terralith_to: Optional[str]
+    debug_limit: int
+    debug_errors: int
+    debug_structure: int
+    dry_run: bool
+    make_backup: bool
+    fast_nbt: bool = True
+    verify_splice: bool = False
+    use_prefilter: bool = True
+    write_mode: str = "rebuild"
+    compress_threads: int = 0
+    # Shared bandwidth limits (None = unlimited) and --low-priority.
+    read_limiter: Optional[RateLimiter] = None
+    write_limiter: Optional[RateLimiter] = None
+    low_priority: bool = False
+    # Soft deadline per task in seconds (0 = off), and slowest chunks kept per task.
+    soft_deadline: float = 0.0
+    slow_report: int = 0
+    backup_method: str = "auto"
+    # Journal folder for --backup-method delta.
+    delta_journal: Optional[str] = None
+    # Manifest timestamp tables of regions changed since the last run, by file name.
+    manifest_timestamps: Optional[Dict[str, bytes]] = None
+
+
+_RUN_CONFIG: Optional[RunConfig] = None
+# Thread workers share module globals, so each keeps its own config (and matcher caches) here.
+_THREAD_CONFIG = threading.local()
+
+
+def _init_worker(config: RunConfig) -> None:
+    global _RUN_CONFIG
+    _RUN_CONFIG = config
+    if config.low_priority:
+        _lower_priority()
+
+
+def _init_thread_worker(config: RunConfig) -> None:
+    _THREAD_CONFIG.config = replace(config, matcher=config.matcher.copy())
+    if config.low_priority:
+        _lower_priority(thread_only=True)
+
+
+def _worker_config() -> RunConfig:
+    return getattr(_THREAD_CONFIG, "config", None) or _RUN_CONFIG
+
+
+def _worker_ready() -> None:
+    pass
+
+
+def _known_timestamps(c: RunConfig, region_file: str) -> Optional[bytes]:
+    return c.manifest_timestamps.get(Path(region_file).name) if c.manifest_timestamps else None
+
+
+def _run_region_task(region_file: str) -> RegionResult:
+    c = _worker_config()
+    return _process_region_file(
+        region_file, c.matcher, c.y_min, c.y_max, c.unmapped_terralith_to,
+        c.debug_limit, c.debug_errors, c.debug_structure, c.dry_run, c.make_backup,
+        c.fast_nbt, c.verify_splice, c.use_prefilter, c.write_mode, c.compress_threads,
+        c.read_limiter, c.write_limiter, c.soft_deadline, c.slow_report, c.backup_method, c.delta_journal,
+        _known_timestamps(c, region_file),
+    )
+
+
+def _run_region_batch_task(region_files: Tuple[str, ...]) -> List[RegionResult]:
+    # One failing region must not take the rest of its batch down with it.
+    results: List[RegionResult] = []
+    for region_file in region_files:
+        try:
+            results.append(_run_region_task(region_file))
+        except Exception as e:
+            results.append(RegionResult(Path(region_file).name, error=f"{type(e).__name__}: {e}"))
+    return results
+
+
+def _run_region_remap_task(
+    region_files: Tuple[str, ...], paid: Tuple[bool, ...] = ()
+) -> List[Tuple[RegionResult, Dict[int, Tuple[bytes, bool]]]]:
+    # Pipeline mode: remap only; the parent's writer thread writes the regions.
+    # paid marks regions the reader thread already read (and charged to the read limit).
+    c = _worker_config()
+    results: List[Tuple[RegionResult, Dict[int, Tuple[bytes, bool]]]] = []
+    for k, region_file in enumerate(region_files):
+        path = Path(region_file)
+        read_limiter = None if k < len(paid) and paid[k] else c.read_limiter
+        try:
+            _recover_interrupted_write(path, c.dry_run)
+            with _map_region(path) as original:
+                results.append(
+                    _remap_region_chunks(
+                        path, original, None, c.matcher, c.y_min, c.y_max, c.unmapped_terralith_to,
+                        c.debug_limit, c.debug_errors, c.debug_structure, c.fast_nbt, c.verify_splice, c.use_prefilter,
+                        c.compress_threads, read_limiter, None, c.soft_deadline, c.slow_report,
+                        _known_timestamps(c, region_file),
+                    )
+                )
+        except Exception as e:
+            results.append((RegionResult(path.name, error=f"{type(e).__name__}: {e}"), {}))
+    return results
+
+
+def _run_chunk_range_task(
+    region_file: str, chunk_range: Tuple[int, int], sectors: Optional[Tuple[int, int]] = None, paid: bool = False
+) -> Tuple[RegionResult, Dict[int, Tuple[bytes, bool]]]:
+    c = _worker_config()
+    return _process_region_chunk_range(
+        region_file, chunk_range, c.matcher, c.y_min, c.y_max, c.unmapped_terralith_to,
+        c.debug_limit, c.debug_errors, c.debug_structure, c.fast_nbt, c.verify_splice, c.use_prefilter,
+        c.compress_threads, None if paid else c.read_limiter, sectors, c.soft_deadline, c.slow_report,
+        _known_timestamps(c, region_file),
+    )
+
+
+def _run_restore_task(region_file: str, backup: Union[str, Tuple[Tuple[str, int], ...]]) -> RestoreResult:
+    # backup is a .bak file path or a region's delta journal records.
+    c = _worker_config()
+    if isinstance(backup, str):
+        return _restore_region_from_backup(region_file, backup, c.dry_run, c.write_limiter)
+    return _restore_region_from_delta(region_file, backup, c.dry_run, c.write_limiter)
+
+
+def _pool_context(start_method: str):
+    """
+    multiprocessing context for the worker pool. "auto" uses a forkserver with nbtlib
+    preloaded where available (Linux), so workers start from an already warmed-up
+    process without forking the caller's threads (e.g. the GUI). Elsewhere it keeps
+    the platform default (spawn on Windows/macOS).
+    """
+    if start_method == "auto":
+        if sys.platform.startswith("linux") and "forkserver" in multiprocessing.get_all_start_methods():
+            start_method = "forkserver"
+        else:
+            return multiprocessing.get_context()
+    ctx = multiprocessing.get_context(start_method)
+    if start_method == "forkserver":
+        preload = list(_FORKSERVER_PRELOAD)
+        if __name__ != "__main__":
+            preload.append(__name__)
+        ctx.set_forkserver_preload(preload)
+    return ctx
+
+
+class _SerialExecutor(Executor):
+    """Runs each task inline when it is submitted, in the calling thread."""
+
+    def __init__(self, initializer=None, initargs: tuple = ()):
+        if initializer is not None:
+            initializer(*initargs)
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        fut: Future = Future()
+        try:
+            fut.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            fut.set_exception(e)
+        return fut
+
+
+def _make_executor(
+    kind: str, workers: int, config: RunConfig, start_method: str = "auto", ctx=None
+) -> Tuple[Executor, str]:
+    """Create the task executor for a run, plus a short description for the log."""
+    if kind == "serial":
+        # Runs in the caller's thread, so only that thread may be reprioritised.
+        return _SerialExecutor(_init_thread_worker, (config,)), "serial"
+    if kind == "thread":
+        gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+        ex = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="remap", initializer=_init_thread_worker, initargs=(config,)
+        )
+        return ex, f"thread, GIL {'on' if gil else 'off'}"
+    if ctx is None:
+        ctx = _pool_context(start_method)
+    ex = ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker, initargs=(config,))
+    return ex, f"process, {ctx.get_start_method()}"
+
+
+# --- Pipeline mode ------------------------------------------------------------
+# With --pipeline the parent overlaps disk I/O with the remap workers:
+#   reader  - a thread that reads upcoming regions ahead of the workers, so their
+#             mmap is served from the page cache instead of waiting on the disk;
+#   workers - remap chunks and return the new blobs without writing anything;
+#   writer  - a thread that makes backups and writes or replaces the regions.
+# Prefetched regions not yet finished, and blobs waiting for the writer, are each
+# held under a byte budget (--pipeline-mib).
+
+PIPELINE_BUDGET_BYTES = 256 * 1024 * 1024
+_PREFETCH_BLOCK = 1024 * 1024
+
+
+class _RegionPrefetcher(threading.Thread):
+    """Reads region files in task order to pull them into the OS page cache."""
+
+    def __init__(
+        self, paths: List[Path], budget: int, limiter: Optional[RateLimiter] = None, low_priority: bool = False
+    ):
+        super().__init__(name="region-prefetch", daemon=True)
+        self._paths = paths
+        self._budget = budget
+        self._limiter = limiter
+        self._low_priority = low_priority
+        self._cond = threading.Condition()
+        self._held: Dict[Path, int] = {}
+        self._held_bytes = 0
+        self._released: set = set()
+        # Regions handed to a worker, and regions read to the end (so their reads are paid for).
+        self._claimed: set = set()
+        self._read: set = set()
+        self._stopped = False
+        self.busy = 0.0
+        self.bytes_read = 0
+
+    def run(self) -> None:
+        if self._low_priority:
+            _lower_priority(thread_only=True)
+        buf = bytearray(_PREFETCH_BLOCK)
+        for path in self._paths:
+            try:
+                size = path.stat().st_size
+            except OSError:
+                continue
+            with self._cond:
+                # Only read ahead while the regions not yet finished fit in the budget.
+                while not self._stopped and self._held and self._held_bytes + size > self._budget:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                if path in self._released or path in self._held or path in self._claimed:
+                    continue
+                self._held[path] = size
+                self._held_bytes += size
+            t0 = time.perf_counter()
+            try:
+                with open(path, "rb", buffering=0) as f:
+                    while path not in self._claimed:
+                        if self._limiter is not None:
+                            self._limiter.consume(_PREFETCH_BLOCK)
+                        n = f.readinto(buf)
+                        if not n:
+                            with self._cond:
+                                self._read.add(path)
+                            break
+                        self.bytes_read += n
+            except OSError:
+                pass
+            self.busy += time.perf_counter() - t0
+
+    def claim(self, path: Path) -> bool:
+        """
+        A worker is about to read the region: stop reading it here. Returns True if it was
+        already read to the end; the worker's reads then come from the page cache and are
+        not charged to the read limit again.
+        """
+        with self._cond:
+            self._claimed.add(path)
+            return path in self._read
+
+    def release(self, path: Path) -> None:
+        # The region is done; its bytes no longer count against the budget.
+        with self._cond:
+            self._released.add(path)
+            size = self._held.pop(path, None)
+            if size is not None:
+                self._held_bytes -= size
+                self._cond.notify_all()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+
+class _RegionWriter(threading.Thread):
+    """Backs up and writes remapped regions; finished results appear in `done`."""
+
+    def __init__(
+        self,
+        budget: int,
+        make_backup: bool,
+        write_mode: str,
+        limiter: Optional[RateLimiter] = None,
+        low_priority: bool = False,
+        backup_method: str = "auto",
+        delta_journal: Optional[str] = None,
+    ):
+        super().__init__(name="region-writer", daemon=True)
+        self._budget = budget
+        self._make_backup = make_backup
+        self._backup_method = backup_method
+        self._delta_journal = delta_journal
+        self._write_mode = write_mode
+        self._limiter = limiter
+        self._low_priority = low_priority
+        self._cond = threading.Condition()
+        self._pending: List[Tuple[Path, RegionResult, Dict[int, Tuple[bytes, bool]], int]] = []
+        self._pending_bytes = 0
+        self._closing = False
+        self.done: "queue.Queue[RegionResult]" = queue.Queue()
+        self.busy = 0.0
+        self.blocked = 0.0
+
+    def put(self, path: Path, result: RegionResult, updated_blobs: Dict[int, Tuple[bytes, bool]]) -> None:
+        size = sum(len(blob) for blob, _ in updated_blobs.values())
+        with self._cond:
+            t0 = time.perf_counter()
+            while self._pending and self._pending_bytes + size > self._budget:
+                self._cond.wait()
+            self.blocked += time.perf_counter() - t0
+            self._pending.append((path, result, updated_blobs, size))
+            self._pending_bytes += size
+            self._cond.notify_all()
+
+    def run(self) -> None:
+        if self._low_priority:
+            _lower_priority(thread_only=True)
+        while True:
+            with self._cond:
+                while not self._pending and not self._closing:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                path, result, updated_blobs, size = self._pending[0]
+            t0 = time.perf_counter()
+            try:
+                written, result.backup_method = _commit_region_changes(
+                    path, updated_blobs, self._make_backup, self._write_mode, self._limiter,
+                    self._backup_method, self._delta_journal,
+                )
+                result.bytes_written += written
+            except Exception as e:
+                result.error = f"write failed: {type(e).__name__}: {e}"
+            self.busy += time.perf_counter() - t0
+            with self._cond:
+                self._pending.pop(0)
+                self._pending_bytes -= size
+                self._cond.notify_all()
+            self.done.put(result)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self.join()
+
+
+@dataclass
+class RunTotals:
+    regions_processed: int = 0
+    regions_changed: int = 0
+    chunks_processed: int = 0
+    chunks_changed: int = 0
+    chunks_skipped: int = 0
+    regions_skipped: int = 0
+    palette_entries_changed: int = 0
+    palette_cache_hits: int = 0
+    palette_cache_misses: int = 0
+    palette_cache_size: int = 0
+    bytes_written: int = 0
+    bytes_read: int = 0
+    worker_seconds: float = 0.0
+    samples: List[str] = field(default_factory=list)
+    # Min-heaps of the slowest regions (seconds, name, chunks) and chunks (seconds, name, index).
+    slow_report: int = 0
+    slowest_regions: List[Tuple[float, str, int]] = field(default_factory=list)
+    slowest_chunks: List[Tuple[float, str, int]] = field(default_factory=list)
+    # Backups made per strategy.
+    backup_methods: Dict[str, int] = field(default_factory=dict)
+    chunks_unchanged: int = 0
+    # Min-heap of the regions with the most skipped chunks, for --verbose:
+    # (prefilter skipped + unchanged, name, prefilter skipped, unchanged, processed).
+    skip_report: int = 0
+    most_skipped: List[Tuple[int, str, int, int, int]] = field(default_factory=list)
+
+    def add(self, res: RegionResult, sample_limit: int) -> None:
+        self.regions_processed += 1
+        self.chunks_processed += res.chunks_processed
+        self.chunks_changed += res.chunks_changed
+        self.chunks_skipped += res.chunks_skipped
+        self.chunks_unchanged += res.chunks_unchanged
+        self.palette_entries_changed += res.entries_changed
+        if res.chunks_changed:
+            self.regions_changed += 1
+        if res.chunks_processed and res.chunks_skipped == res.chunks_processed:
+            self.regions_skipped += 1
+        self.palette_cache_hits += res.palette_cache_hits
+        self.palette_cache_misses += res.palette_cache_misses
+        self.palette_cache_size = max(self.palette_cache_size, res.palette_cache_size)
+        self.bytes_written += res.bytes_written
+        self.bytes_read += res.bytes_read
+        self.worker_seconds += res.elapsed
+        if res.backup_method:
+            self.backup_methods[res.backup_method] = self.backup_methods.get(res.backup_method, 0) + 1
+        if self.slow_report:
+            _keep_largest(self.slowest_regions, (res.elapsed, res.name, res.chunks_processed), self.slow_report)
+            for item in res.slow_chunks:
+                _keep_largest(self.slowest_chunks, item, self.slow_report)
+        if self.skip_report and (res.chunks_skipped or res.chunks_unchanged):
+            item = (res.chunks_skipped + res.chunks_unchanged, res.name, res.chunks_skipped, res.chunks_unchanged, res.chunks_processed)
+            _keep_largest(self.most_skipped, item, self.skip_report)
+        # merge samples until we hit limit
+        for s in res.debug_samples:
+            if len(self.samples) >= sample_limit:
+                break
+            self.samples.append(s)
+
+
+def _restore_backups(
+    region_dir: Path,
+    baks: Dict[str, Path],
+    records: Dict[str, List[Tuple[str, int]]],
+    executor: str,
+    workers: int,
+    start_method: str,
+    dry_run: bool,
+    max_write_mbps: float,
+    low_priority: bool,
+    log=print,
+) -> int:
+    """Restore regions from .bak files and journal records in parallel, one task per region."""
+    both = sorted(set(baks) & set(records))
+    if both:
+        log(f"Regions with both a .bak file and journal records: {len(both)} (restored from the .bak file)")
+    jobs_by_name: Dict[str, Union[str, Tuple[Tuple[str, int], ...]]] = {
+        name: tuple(recs) for name, recs in records.items()
+    }
+    jobs_by_name.update((name, str(p)) for name, p in baks.items())
+    total = len(jobs_by_name)
+    log(f"Regions to check: {total} ({len(baks)} .bak files, {len(set(records) - set(baks))} from journals)")
+    log(f"Workers: {workers} ({executor})")
+
+    ctx = _pool_context(start_method) if executor == "process" else None
+    write_limiter = RateLimiter(max_write_mbps * 1024 * 1024, ctx) if max_write_mbps > 0 else None
+    config = RunConfig(
+        BiomeMatcher({}), None, None, None, 0, 0, 0, dry_run, False,
+        write_limiter=write_limiter, low_priority=low_priority,
+    )
+    started = last_progress = time.time()
+    done = restored = identical = failed = chunks = bytes_written = 0
+    jobs = (
+        (_run_restore_task, (str(region_dir / name), backup), name)
+        for name, backup in sorted(jobs_by_name.items())
+    )
+    ex, _ = _make_executor(executor, workers, config, start_method, ctx)
+    with ex:
+        for fut, name in _iter_bounded(ex, jobs, workers * TASKS_IN_FLIGHT_PER_WORKER):
+            done += 1
+            try:
+                res = fut.result()
+            except Exception as e:
+                log(f"ERROR: Failed to restore region file {name}: {type(e).__name__}: {e}")
+                failed += 1
+                continue
+            if res.restored:
+                restored += 1
+                chunks += res.chunks
+                bytes_written += res.bytes_written
+            else:
+                identical += 1
+            now = time.time()
+            if now - last_progress >= 5.0 or done == total:
+                log(f"Progress: regions {done}/{total}, restored {restored}, identical {identical}")
+                last_progress = now
+    elapsed = time.time() - started
+    log(
+        f"Restore summary: regions {restored} restored, {identical} already identical, {failed} failed; "
+        f"journal chunks restored {chunks}; written {bytes_written / (1024 * 1024):.1f} MiB; "
+        f"elapsed {int(elapsed // 60):02d}:{int(elapsed % 60):02d}"
+    )
+    if dry_run:
+        log("Dry-run: no files were modified.")
+    return 1 if failed else 0
+
+
+def _processes_arg(text: str) -> Union[int, str]:
+    if text.strip().lower() == "auto":
+        return "auto"
+    try:
+        n = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a number or auto, got {text!r}") from None
+    if n < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return n
+
+
+def run(argv: Optional[Sequence[str]] = None, *, log=print) -> int:
+    """
+    Main implementation. Kept separate so a GUI can call this and capture output via `log`.
+    """
+    parser = argparse.ArgumentParser(description="Remap Terralith biomes to vanilla biomes by editing .mca region files directly.")
+    parser.add_argument("world", type=str, help="Path to the Minecraft world folder (contains region/).")
+    parser.add_argument("--dimension", type=str, default="overworld", help="overworld|nether|end|or explicit region folder path.")
+    parser.add_argument("--y", nargs=2, type=int, metavar=("Y_MIN", "Y_MAX"), help="Optional Y filter (inclusive).")
+    parser.add_argument(
+        "--processes",
+        type=_processes_arg,
+        default="auto",
+        help="Worker processes, or auto (default): the CPUs this process may use (affinity mask and "
+        "container CPU quota), lowered if needed to fit the memory budget.",
+    )
+    parser.add_argument(
+        "--memory-budget",
+        type=str,
+        default="auto",
+        help="Memory the run may use, eg 4G or 512M (default auto: 3/4 of the container limit or of "
+        "physical memory; 0 = no limit). Large regions are held back while the budget is used up.",
+    )
+    parser.add_argument(
+        "--split-regions",
+        choices=("auto", "off"),
+        default="auto",
+        help="auto: split regions with many chunks into chunk-range tasks so all workers stay busy (default). "
+        "off: always one task per region file.",
+    )
+    parser.add_argument(
+        "--executor",
+        choices=EXECUTORS,
+        default="process",
+        help="Task backend: process pool (default), thread pool (best on free-threaded Python), "
+        "or serial (no workers; for profiling).",
+    )
+    parser.add_argument(
+        "--start-method",
+        choices=START_METHODS,
+        default="auto",
+        help="How worker processes are started (default auto: forkserver with nbtlib preloaded on Linux, "
+        "the platform default elsewhere).",
+    )
+    parser.add_argument(
+        "--compress-threads",
+        type=int,
+        default=0,
+        help="Threads per worker that decompress and recompress chunks alongside the remap loop "
+        "(default: 0 = off). Helps when there are fewer region tasks than CPU cores.",
+    )
+    parser.add_argument(
+        "--batch-kib",
+        type=int,
+        default=BATCH_BYTES // 1024,
+        help=f"Pack small region files into shared tasks of up to N KiB (default: {BATCH_BYTES // 1024}; 0 disables).",
+    )
+    parser.add_argument(
+        "--soft-deadline",
+        type=float,
+        default=SOFT_DEADLINE_SECONDS,
+        help=f"Seconds a region task may run before the rest of its chunks are split into tasks for idle "
+        f"workers (default: {SOFT_DEADLINE_SECONDS:g}; 0 disables).",
+    )
+    parser.add_argument(
+        "--slow-report",
+        type=int,
+        default=SLOW_REPORT_SIZE,
+        help=f"List the N slowest regions and chunks at the end of the run (default: {SLOW_REPORT_SIZE}; 0 disables).",
+    )
+    parser.add_argument(
+        "--device-scheduling",
+        choices=DEVICE_SCHEDULING,
+        default="auto",
+        help="Schedule each disk separately: cap tasks on spinning disks and read them in on-disk order. "
+        "auto: on when the region files are spread over more than one device (default).",
+    )
+    parser.add_argument(
+        "--hdd-workers",
+        type=int,
+        default=HDD_WORKERS,
+        help=f"With device-aware scheduling, max tasks in flight per spinning disk (default: {HDD_WORKERS}).",
+    )
+    parser.add_argument(
+        "--incremental",
+        choices=INCREMENTAL_MODES,
+        default="on",
+        help=f"on: skip regions, and chunks, unchanged since the last run with the same mapping and options, "
+        f"as recorded in region/{MANIFEST_NAME} (default). rescan: process everything and write a new manifest. "
+        "off: process everything and leave the manifest alone.",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Overlap disk I/O with remapping: a reader thread reads regions ahead of the workers "
+        "and a writer thread writes the results.",
+    )
+    parser.add_argument(
+        "--pipeline-mib",
+        type=int,
+        default=PIPELINE_BUDGET_BYTES // (1024 * 1024),
+        help=f"Pipeline read-ahead and write queue budget in MiB, each (default: {PIPELINE_BUDGET_BYTES // (1024 * 1024)}).",
+    )
+    parser.add_argument(
+        "--max-read-mbps",
+        type=float,
+        default=0,
+        help="Cap the combined read bandwidth of all workers, in MiB/s (default: 0 = unlimited).",
+    )
+    parser.add_argument(
+        "--max-write-mbps",
+        type=float,
+        default=0,
+        help="Cap the combined write bandwidth (backups included), in MiB/s (default: 0 = unlimited).",
+    )
+    parser.add_argument(
+        "--low-priority",
+        action="store_true",
+        help="Run workers at low CPU and disk priority (nice/ionice on Linux, background mode on Windows).",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Do not write files, just report what would change.")
+    parser.add_argument(
+        "--write-mode",
+        choices=WRITE_MODES,
+        default="rebuild",
+        help="rebuild: write a new region file and replace the old one (default). "
+        "inplace: only rewrite changed chunks inside the existing file, protected by a journal.",
+    )
+    parser.add_argument("--no-backup", action="store_true", help="Do not create .bak backups for modified region files.")
+    parser.add_argument(
+        "--output-world",
+        type=str,
+        default=None,
+        help="Leave the world untouched and write the result to this new folder instead. Unchanged files are "
+        "reflinked or hardlinked rather than copied where the file system allows it. Implies no backups and "
+        "--write-mode rebuild.",
+    )
+    parser.add_argument(
+        "--backup-method",
+        choices=BACKUP_METHODS,
+        default="auto",
+        help="auto: reflink the original where the file system supports it, else copy it inside the kernel "
+        "(default). hardlink: keep the original file itself as the backup (rebuild write mode only). "
+        "copy: always write a full copy. delta: no .bak files; save only the original chunks that are "
+        "rewritten, in a journal folder for the run (undo with --restore-journal).",
+    )
+    parser.add_argument(
+        "--restore",
+        action="store_true",
+        help="Undo earlier runs on the dimension: copy .bak files back and put back the chunks saved in "
+        "delta journals, in parallel, skipping regions that already match. Backups are kept.",
+    )
+    parser.add_argument(
+        "--restore-journal",
+        type=str,
+        default=None,
+        help="Undo a --backup-method delta run: put back the chunks saved in this journal folder "
+        "(region/remap-journal-...), in parallel, and exit.",
+    )
+    parser.add_argument(
+        "--mapping-ini",
+        type=str,
+        default="",
         help="Optional path to mapping INI file. If omitted, uses the built-in default mapping.",
     )
     parser.add_argument(
@@ -797,9 +3882,36 @@ def run(argv: Optional[Sequence[str]] = None, *, log=print) -> int:
         default=None,
         help="Write the built-in default mapping.ini to this path and exit.",
     )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help=f"End the run with per-region skipped chunk counts for the {SKIP_REPORT_SIZE} regions "
+        "where the prefilter and --incremental skipped the most chunks.",
+    )
     parser.add_argument("--debug-sample", type=int, default=0, help="Print N sampled biome palette entries from the world (set >0).")
     parser.add_argument("--debug-errors", type=int, default=0, help="Print first N chunk parse errors per region file (0 disables).")
     parser.add_argument("--debug-structure", type=int, default=0, help="Print structure for first N parsed chunks per region file (0 disables).")
+    parser.add_argument(
+        "--no-fast-nbt",
+        action="store_true",
+        help="Always parse chunks with nbtlib instead of the built-in raw NBT cursor (slower; for troubleshooting).",
+    )
+    parser.add_argument(
+        "--no-prefilter",
+        action="store_true",
+        help="Parse every chunk, even ones whose raw bytes contain no biome id from the mapping.",
+    )
+    parser.add_argument(
+        "--palette-cache-size",
+        type=int,
+        default=PALETTE_CACHE_SIZE,
+        help=f"Remembered biome palettes per worker (default: {PALETTE_CACHE_SIZE}; 0 disables the cache).",
+    )
+    parser.add_argument(
+        "--verify-splice",
+        action="store_true",
+        help="Check every byte-spliced chunk against a full nbtlib round-trip and report differences (slow; use with --dry-run).",
+    )
     parser.add_argument("--probe-prefix", type=str, default=None, help="Scan until a biome palette entry starts with this prefix (eg terralith:). Exits without modifying.")
     parser.add_argument("--probe-max-regions", type=int, default=200, help="Max region files to scan in probe mode (0 = no limit).")
     parser.add_argument("--probe-max-chunks", type=int, default=200000, help="Max chunks to scan in probe mode (0 = no limit).")
@@ -817,6 +3929,37 @@ def run(argv: Optional[Sequence[str]] = None, *, log=print) -> int:
         log(f"Wrote default mapping.ini to: {out_path}")
         return 0
 
+    if args.restore or args.restore_journal:
+        if args.executor == "serial":
+            workers = 1
+        else:
+            workers = available_cpu_count() if args.processes == "auto" else args.processes
+        if args.restore_journal:
+            journal_dir = Path(args.restore_journal)
+            if not journal_dir.is_dir():
+                raise SystemExit(f"Journal folder not found: {journal_dir}")
+            region_dir = journal_dir.parent
+            baks, records = {}, _scan_delta_journal(journal_dir)
+            if not records:
+                raise SystemExit(f"No journal records found in: {journal_dir}")
+            log(f"Restoring from journal: {journal_dir}")
+        else:
+            region_dir = _region_dir(Path(args.world), args.dimension)
+            if not region_dir.exists():
+                raise SystemExit(f"Region folder not found: {region_dir}")
+            # Names carry the run's start time, so this is oldest first.
+            journal_dirs = sorted(d for d in region_dir.glob(f"{DELTA_JOURNAL_PREFIX}*") if d.is_dir())
+            baks, records = _find_backups(region_dir, journal_dirs)
+            if not baks and not records:
+                raise SystemExit(f"No backups found in: {region_dir}")
+            log(f"Restoring backups in: {region_dir}")
+            if journal_dirs:
+                log(f"Journals: {', '.join(d.name for d in journal_dirs)}")
+        return _restore_backups(
+            region_dir, baks, records, args.executor, workers, args.start_method, args.dry_run,
+            args.max_write_mbps, args.low_priority, log,
+        )
+
     world_path = Path(args.world)
     region_dir = _region_dir(world_path, args.dimension)
     if not region_dir.exists():
@@ -832,6 +3975,10 @@ def run(argv: Optional[Sequence[str]] = None, *, log=print) -> int:
     else:
         mapping = _load_mapping_from_ini_text(DEFAULT_MAPPING_INI_TEXT)
     unmapped_terralith_to = _normalize_target_biome_id(_normalize_biome_name(args.unmapped_terralith_to)) if args.unmapped_terralith_to else None
+    try:
+        matcher = BiomeMatcher(mapping, unmapped_terralith_to, palette_cache_size=max(0, int(args.palette_cache_size)))
+    except ValueError as e:
+        raise SystemExit(f"Invalid mapping: {e}")
 
     y_min = y_max = None
     if args.y:
@@ -855,103 +4002,512 @@ def run(argv: Optional[Sequence[str]] = None, *, log=print) -> int:
             int(args.probe_max_regions),
             int(args.probe_max_chunks),
             log,
+            fast_nbt=not args.no_fast_nbt,
+            use_prefilter=not args.no_prefilter,
         )
 
+    write_mode = args.write_mode
+    make_backup = not args.no_backup
+    output_world: Optional[Path] = None
+    if args.output_world:
+        output_world = Path(args.output_world)
+        # Paths as given (made absolute, links not followed), so a region folder that is
+        # a link to another drive still maps to the same place in the output.
+        world_abs, out_abs = Path(os.path.abspath(world_path)), Path(os.path.abspath(output_world))
+        try:
+            out_region_dir = output_world / Path(os.path.abspath(region_dir)).relative_to(world_abs)
+        except ValueError:
+            raise SystemExit(f"--output-world needs the region folder inside the world folder: {region_dir}")
+        for w, o in ((world_abs, out_abs), (world_path.resolve(), output_world.resolve())):
+            if o == w or w in o.parents:
+                raise SystemExit(f"--output-world must be outside the world folder: {output_world}")
+        if output_world.exists() and (not output_world.is_dir() or any(output_world.iterdir())):
+            raise SystemExit(f"--output-world must be a new or empty folder: {output_world}")
+        # The source keeps its data, so no backups; rebuilt regions replace their clones.
+        if write_mode == "inplace":
+            log("[warn] --write-mode inplace would write through hardlinks into the source world; using rebuild")
+        write_mode = "rebuild"
+        make_backup = False
+        if args.dry_run:
+            log(f"Output world: {output_world} (dry-run: not created; reading the source world)")
+        else:
+            mirror_started = time.time()
+            cloned = _mirror_world(world_path, output_world)
+            log(
+                f"Output world: {output_world} ({sum(cloned.values())} files cloned in "
+                f"{time.time() - mirror_started:.1f}s: "
+                + ", ".join(f"{n} {how}" for how, n in sorted(cloned.items()))
+                + ")"
+            )
+            if cloned.get("hardlink"):
+                log(
+                    "[warn] Hardlinked files share their data with the source world. The game rewrites region "
+                    "files in place, so only open one of the two worlds."
+                )
+            region_dir = out_region_dir
+            region_files = sorted(region_dir.glob("r.*.*.mca"))
+
     log(f"Region folder: {region_dir}")
     log(f"Regions: {len(region_files)}")
-    log(f"Mapping entries: {len(mapping)} (source: {mapping_src})")
+    manifest_key = _manifest_key(mapping, unmapped_terralith_to, y_min, y_max)
+    manifest: Dict[str, Dict[str, Any]] = {}
+    manifest_timestamps: Dict[str, bytes] = {}
+    unchanged_regions: List[Path] = []
+    if args.incremental == "on":
+        manifest = _load_manifest(region_dir, manifest_key)
+        todo: List[Path] = []
+        for p in region_files:
+            entry = manifest.get(p.name)
+            if entry is not None and _region_unchanged(p, entry):
+                unchanged_regions.append(p)
+                continue
+            todo.append(p)
+            table = _manifest_timestamps(entry) if entry is not None else None
+            if table is not None:
+                manifest_timestamps[p.name] = table
+        region_files = todo
+        if manifest:
+            log(
+                f"Incremental: {len(unchanged_regions)} regions unchanged since the last run with this mapping and "
+                f"options (skipped)"
+                + (f"; {len(manifest_timestamps)} changed regions skip their unchanged chunks" if manifest_timestamps else "")
+            )
+        if not region_files:
+            log("Nothing to do: every region is unchanged since the last run.")
+            return 0
+    log(f"Mapping entries: {len(mapping)} (source: {mapping_src}; {matcher.describe()})")
     if unmapped_terralith_to:
         log(f"Unmapped terralith:* -> {unmapped_terralith_to}")
     if y_min is not None and y_max is not None:
         log(f"Y filter: {y_min}..{y_max}")
     else:
         log("Y filter: off (processing all Y levels)")
-    log(f"Workers: {args.processes}")
-    log(f"Backups: {'off' if args.no_backup else 'on'}")
+    if args.memory_budget.strip().lower() == "auto":
+        memory_budget = _auto_memory_budget()
+    else:
+        try:
+            memory_budget = _parse_size(args.memory_budget) or None
+        except ValueError as e:
+            raise SystemExit(f"--memory-budget: {e}")
+    region_sizes = _region_sizes(region_files)
+    worker_memory = _worker_memory_estimate(region_sizes.values())
+    if args.executor == "serial":
+        workers = 1
+        workers_note = ""
+    elif args.processes == "auto":
+        cpus = available_cpu_count()
+        workers = cpus
+        workers_note = f"; auto: {cpus} CPUs available"
+        if memory_budget is not None and args.executor == "process":
+            fit = max(1, memory_budget // worker_memory)
+            if fit < workers:
+                workers = fit
+                workers_note += f", memory budget fits {fit}"
+    else:
+        workers = args.processes
+        workers_note = ""
+    log(f"Workers: {workers} ({args.executor}{workers_note})")
+    if memory_budget is not None:
+        log(
+            f"Memory budget: {memory_budget / (1 << 30):.1f} GiB "
+            f"(estimated {worker_memory / (1 << 20):.0f} MiB per worker)"
+        )
+    if args.compress_threads > 0:
+        log(f"Compression threads per worker: {args.compress_threads}")
+    backup_method = args.backup_method
+    if backup_method == "hardlink" and write_mode == "inplace":
+        log("[warn] --backup-method hardlink needs --write-mode rebuild; using auto")
+        backup_method = "auto"
+    delta_journal: Optional[Path] = None
+    if backup_method == "delta" and make_backup and not args.dry_run:
+        delta_journal = _new_delta_journal_dir(region_dir)
+    log(f"Backups: {f'on ({backup_method})' if make_backup else 'off'}")
+    if delta_journal is not None:
+        log(f"Delta journal: {delta_journal}")
+    log(f"Write mode: {write_mode}")
+    if args.verify_splice:
+        log("Splice verification: on (differences are printed as [verify-splice] lines)")
 
     debug_limit = int(args.debug_sample) if args.debug_sample and args.debug_sample > 0 else 0
     debug_errors = int(args.debug_errors) if args.debug_errors and args.debug_errors > 0 else 0
     debug_structure = int(args.debug_structure) if args.debug_structure and args.debug_structure > 0 else 0
 
-    regions_processed = 0
-    regions_changed = 0
-    chunks_processed = 0
-    chunks_changed = 0
-    palette_entries_changed = 0
-
-    collected_samples: List[str] = []
+    slow_report = max(0, args.slow_report)
+    soft_deadline = max(0.0, args.soft_deadline)
+    totals = RunTotals(slow_report=slow_report, skip_report=SKIP_REPORT_SIZE if args.verbose else 0)
+    sample_limit = max(0, int(args.debug_sample or 0))
 
-    make_backup = not args.no_backup
     total_regions = len(region_files)
     started = time.time()
     last_progress = started
-    with ProcessPoolExecutor(max_workers=args.processes) as ex:
-        futures = [
-            ex.submit(
-                _process_region_file,
-                str(p),
-                mapping,
-                y_min,
-                y_max,
-                unmapped_terralith_to,
-                debug_limit,
-                debug_errors,
-                debug_structure,
-                args.dry_run,
-                make_backup,
+    devices = _region_devices(region_files)
+    device_count = len({d.dev for d in devices.values()})
+    by_device = args.device_scheduling == "on" or (args.device_scheduling == "auto" and device_count > 1)
+    hdd_workers = max(1, args.hdd_workers)
+    if by_device:
+        tasks = _plan_device_tasks(
+            region_files, devices, workers, hdd_workers, args.split_regions == "auto",
+            max(0, args.batch_kib) * 1024, region_sizes,
+        )
+        regions_on: Dict[DeviceInfo, int] = {}
+        for d in devices.values():
+            regions_on[d] = regions_on.get(d, 0) + 1
+        log(
+            "Devices: "
+            + "; ".join(
+                f"{d.describe()}, {n} regions" + (f", max {hdd_workers} tasks" if d.rotational else "")
+                for d, n in regions_on.items()
+            )
+        )
+    else:
+        tasks = _plan_region_tasks(
+            region_files, workers, args.split_regions == "auto", max(0, args.batch_kib) * 1024, region_sizes
+        )
+        if device_count > 1:
+            log(f"Devices: {device_count} (device-aware scheduling off)")
+    split_state: Dict[Path, _SplitRegion] = {}
+    batched = 0
+    for task in tasks:
+        if task.chunk_range is not None:
+            split_state.setdefault(task.regions[0], _SplitRegion(0)).ranges_left += 1
+        elif len(task.regions) > 1:
+            batched += len(task.regions)
+    if split_state:
+        log(
+            f"Chunk-range tasks: {len(split_state)} large regions split into "
+            f"{sum(s.ranges_left for s in split_state.values())} tasks"
+        )
+        # The parent writes split regions, so finish any interrupted write before reading.
+        for p, state in split_state.items():
+            try:
+                _recover_interrupted_write(p, args.dry_run)
+            except (OSError, ValueError) as e:
+                log(f"ERROR: {p.name}: {e}")
+                state.failed = True
+    if batched:
+        log(f"Batched tasks: {batched} small regions packed into {sum(len(t.regions) > 1 for t in tasks)} tasks")
+
+    # Process workers share the limiters through the pool context; threads share them directly.
+    ctx = _pool_context(args.start_method) if args.executor == "process" else None
+    read_limiter = RateLimiter(args.max_read_mbps * 1024 * 1024, ctx) if args.max_read_mbps > 0 else None
+    write_limiter = RateLimiter(args.max_write_mbps * 1024 * 1024, ctx) if args.max_write_mbps > 0 else None
+    if read_limiter or write_limiter or args.low_priority:
+        log(
+            f"I/O limits: read {f'{args.max_read_mbps:g} MiB/s' if read_limiter else 'unlimited'}, "
+            f"write {f'{args.max_write_mbps:g} MiB/s' if write_limiter else 'unlimited'}; "
+            f"low priority {'on' if args.low_priority else 'off'}"
+        )
+
+    config = RunConfig(
+        matcher,
+        y_min,
+        y_max,
+        unmapped_terralith_to,
+        debug_limit,
+        debug_errors,
+        debug_structure,
+        args.dry_run,
+        make_backup,
+        not args.no_fast_nbt,
+        args.verify_splice,
+        not args.no_prefilter,
+        write_mode,
+        max(0, args.compress_threads),
+        # In pipeline mode, workers are charged only for regions the reader thread has not read yet.
+        read_limiter,
+        write_limiter,
+        args.low_priority,
+        soft_deadline,
+        slow_report,
+        backup_method,
+        str(delta_journal) if delta_journal is not None else None,
+        manifest_timestamps or None,
+    )
+
+    prefetcher: Optional[_RegionPrefetcher] = None
+    writer: Optional[_RegionWriter] = None
+    if args.pipeline:
+        budget = max(1, args.pipeline_mib) * 1024 * 1024
+        log(f"Pipeline: on (read-ahead and write queue budget {args.pipeline_mib} MiB each)")
+        prefetcher = _RegionPrefetcher(
+            list(dict.fromkeys(p for t in tasks for p in t.regions)), budget, read_limiter, args.low_priority
+        )
+        if not args.dry_run:
+            writer = _RegionWriter(
+                budget, make_backup, write_mode, write_limiter, args.low_priority, backup_method, config.delta_journal
+            )
+
+    def jobs():
+        for task in tasks:
+            if task.chunk_range is not None:
+                call_args = (str(task.regions[0]), task.chunk_range, task.sectors)
+                if prefetcher is not None:
+                    call_args += (prefetcher.claim(task.regions[0]),)
+                yield _run_chunk_range_task, call_args, task
+            elif args.pipeline:
+                paid = tuple(prefetcher.claim(p) for p in task.regions)
+                yield _run_region_remap_task, (tuple(str(p) for p in task.regions), paid), task
+            else:
+                yield _run_region_batch_task, (tuple(str(p) for p in task.regions),), task
+
+    # Regions that finished without an error, for the manifest.
+    completed: Set[str] = set()
+    # Regions with chunks that failed to parse or remap; left out of the manifest.
+    chunk_error_regions: List[str] = []
+
+    def account(res: RegionResult) -> None:
+        nonlocal last_progress
+        if res.error:
+            log(f"ERROR: Failed to process region file {res.name}: {res.error}")
+            totals.regions_processed += 1
+            return
+        totals.add(res, sample_limit)
+        if res.chunk_errors:
+            chunk_error_regions.append(res.name)
+        else:
+            completed.add(res.name)
+
+        # Progress output (so long runs don't look "stuck")
+        now = time.time()
+        if res.chunks_changed or (now - last_progress) >= 5.0 or totals.regions_processed == total_regions:
+            elapsed = now - started
+            rps = (totals.regions_processed / elapsed) if elapsed > 0 else 0.0
+            read_mbps = totals.bytes_read / (1024 * 1024) / elapsed if elapsed > 0 else 0.0
+            write_mbps = totals.bytes_written / (1024 * 1024) / elapsed if elapsed > 0 else 0.0
+            log(
+                f"Progress: regions {totals.regions_processed}/{total_regions} "
+                f"({rps:.2f} r/s), chunks {totals.chunks_processed}, changed_chunks {totals.chunks_changed}, "
+                f"skipped_chunks {totals.chunks_skipped}, palette_changes {totals.palette_entries_changed}, "
+                f"read {read_mbps:.1f} MiB/s, write {write_mbps:.1f} MiB/s"
             )
-            for p in region_files
-        ]
+            last_progress = now
 
-        for fut in as_completed(futures):
+    # The rest of tasks that passed the soft deadline; submitted ahead of planned tasks.
+    rescheduled: "deque[Tuple[Callable[..., Any], tuple, RegionTask]]" = deque()
+
+    def split_rest(p: Path, state: _SplitRegion, task: RegionTask, res: RegionResult) -> None:
+        chunk_range = task.chunk_range or (0, 1024)
+        pieces = _split_remaining_chunks(p, chunk_range, task.sectors, res.resume_sector, workers)
+        slowest = max(res.slow_chunks, default=None)
+        log(
+            f"Soft deadline: {p.name} still running after {soft_deadline:g}s ({res.chunks_processed} chunks done); "
+            f"splitting the rest into {len(pieces)} tasks"
+            + (f"; slowest chunk so far: {slowest[2]} ({slowest[0]:.1f}s)" if slowest else "")
+        )
+        for piece in pieces:
+            part = RegionTask(task.weight // len(pieces), (p,), chunk_range, piece)
+            rescheduled.append((_run_chunk_range_task, (str(p), chunk_range, piece), part))
+        state.ranges_left += len(pieces)
+
+    def drain_writer() -> None:
+        while writer is not None:
             try:
-                name, c_proc, c_chg, e_chg, samples = fut.result()
-            except Exception as e:
-                log(f"ERROR: Failed to process region file: {type(e).__name__}: {e}")
-                regions_processed += 1
-                continue
-            regions_processed += 1
-            chunks_processed += c_proc
-            chunks_changed += c_chg
-            palette_entries_changed += e_chg
-            if c_chg:
-                regions_changed += 1
-            if args.debug_sample > 0 and len(collected_samples) < args.debug_sample and samples:
-                # merge samples until we hit limit
-                for s in samples:
-                    if len(collected_samples) >= args.debug_sample:
-                        break
-                    collected_samples.append(s)
+                account(writer.done.get_nowait())
+            except queue.Empty:
+                return
 
-            # Progress output (so long runs don't look "stuck")
-            now = time.time()
-            if c_chg or (now - last_progress) >= 5.0 or regions_processed == total_regions:
-                elapsed = now - started
-                rps = (regions_processed / elapsed) if elapsed > 0 else 0.0
-                log(
-                    f"Progress: regions {regions_processed}/{total_regions} "
-                    f"({rps:.2f} r/s), chunks {chunks_processed}, changed_chunks {chunks_changed}, "
-                    f"palette_changes {palette_entries_changed}"
-                )
-                last_progress = now
+    pool_started = time.time()
+    ex, executor_desc = _make_executor(args.executor, workers, config, args.start_method, ctx)
+    with ex:
+        # Bring every worker up before handing out regions, so startup cost is measured on its own.
+        for f in [ex.submit(_worker_ready) for _ in range(workers)]:
+            f.result()
+        pool_startup = time.time() - pool_started
+        pipeline_started = time.time()
+        for stage in (prefetcher, writer):
+            if stage is not None:
+                stage.start()
+        window = workers * TASKS_IN_FLIGHT_PER_WORKER
+        # Workers themselves take part of the budget; the rest is for region data in flight.
+        task_budget = None
+        if memory_budget is not None:
+            task_budget = max(0, memory_budget - workers * WORKER_BASE_MEMORY)
+        group = group_limits = None
+        if by_device:
+            group = lambda task: devices[task.regions[0]].dev
+            group_limits = {d.dev: hdd_workers for d in devices.values() if d.rotational}
+        for fut, task in _iter_bounded(
+            ex, jobs(), window, _task_memory, task_budget, group, group_limits, rescheduled
+        ):
+            # (region, result, blobs still to be written or None if the worker wrote them)
+            finished: List[Tuple[Path, RegionResult, Optional[Dict[int, Tuple[bytes, bool]]]]] = []
+            if task.chunk_range is None:
+                try:
+                    out = fut.result()
+                except Exception as e:
+                    log(f"ERROR: Failed to process region file: {type(e).__name__}: {e}")
+                    totals.regions_processed += len(task.regions)
+                    if prefetcher is not None:
+                        for p in task.regions:
+                            prefetcher.release(p)
+                    continue
+                if args.pipeline:
+                    done_regions = [(p, res, blobs) for p, (res, blobs) in zip(task.regions, out)]
+                else:
+                    done_regions = [(p, res, res.deferred_blobs) for p, res in zip(task.regions, out)]
+                for p, res, blobs in done_regions:
+                    if not res.resume_sector:
+                        finished.append((p, res, blobs))
+                        continue
+                    # Cut short by the soft deadline: finish it like a split region.
+                    state = _SplitRegion(0, res, blobs or {})
+                    res.deferred_blobs = None
+                    split_rest(p, state, task, res)
+                    if state.ranges_left:
+                        split_state[p] = state
+                    else:
+                        finished.append((p, res, state.updated_blobs))
+            else:
+                p = task.regions[0]
+                state = split_state[p]
+                state.ranges_left -= 1
+                try:
+                    part, blobs = fut.result()
+                except Exception as e:
+                    log(f"ERROR: Failed to process chunk range of {p.name}: {type(e).__name__}: {e}")
+                    state.failed = True
+                else:
+                    if state.result is None:
+                        state.result = part
+                    else:
+                        state.result.merge(part)
+                    state.updated_blobs.update(blobs)
+                    if part.resume_sector:
+                        split_rest(p, state, task, part)
+                if state.ranges_left:
+                    continue
+                del split_state[p]
+                res = state.result
+                if state.failed or res is None:
+                    # Never write a region with chunk ranges missing.
+                    res = RegionResult(p.name, error="a chunk range failed; the region was left unchanged")
+                finished.append((p, res, state.updated_blobs))
+
+            for p, res, blobs in finished:
+                if prefetcher is not None:
+                    prefetcher.release(p)
+                if blobs is not None and res.chunks_changed and not res.error and not args.dry_run:
+                    if writer is not None:
+                        writer.put(p, res, blobs)
+                        continue
+                    try:
+                        written, res.backup_method = _commit_region_changes(
+                            p, blobs, make_backup, write_mode, write_limiter, backup_method, config.delta_journal
+                        )
+                        res.bytes_written += written
+                    except Exception as e:
+                        res.error = f"write failed: {type(e).__name__}: {e}"
+                account(res)
+            drain_writer()
+
+        if writer is not None:
+            writer.close()
+            drain_writer()
+        if prefetcher is not None:
+            prefetcher.stop()
+        pipeline_elapsed = time.time() - pipeline_started
+    # Thread and serial workers wrote their journal segments in this process.
+    _close_delta_segments()
+    if args.incremental != "off" and not args.dry_run:
+        entries = {p.name: manifest[p.name] for p in unchanged_regions}
+        for p in region_files:
+            if p.name in completed:
+                try:
+                    entries[p.name] = _region_state(p)
+                except OSError:
+                    pass
+        _save_manifest(region_dir, manifest_key, entries)
+        if chunk_error_regions:
+            log(
+                f"Incremental: {len(chunk_error_regions)} regions had chunks that failed to parse or remap "
+                f"and will be read again next run: {', '.join(sorted(chunk_error_regions)[:10])}"
+                + (", ..." if len(chunk_error_regions) > 10 else "")
+            )
 
     elapsed = time.time() - started
     mm = int(elapsed // 60)
     ss = int(elapsed % 60)
     log(
         "Summary: "
-        f"regions {regions_processed} processed, {regions_changed} changed; "
-        f"chunks {chunks_processed} processed, {chunks_changed} changed; "
-        f"palette entries changed: {palette_entries_changed}; "
+        f"regions {totals.regions_processed} processed, {totals.regions_changed} changed; "
+        f"chunks {totals.chunks_processed} processed, {totals.chunks_changed} changed; "
+        f"palette entries changed: {totals.palette_entries_changed}; "
+        f"written {totals.bytes_written / (1024 * 1024):.1f} MiB; "
         f"elapsed {mm:02d}:{ss:02d}"
     )
+    log(f"Pool startup: {workers} workers ({executor_desc}) in {pool_startup:.2f}s")
+    if totals.backup_methods:
+        log("Backups made: " + ", ".join(f"{n} {m}" for m, n in sorted(totals.backup_methods.items())))
+    if delta_journal is not None:
+        segments = list(delta_journal.glob("*.seg"))
+        if not segments:
+            shutil.rmtree(delta_journal, ignore_errors=True)
+        else:
+            size = sum(p.stat().st_size for p in segments)
+            log(
+                f"Delta journal: {size / (1024 * 1024):.1f} MiB in {len(segments)} segments; "
+                f"undo with --restore-journal \"{delta_journal}\""
+            )
+    if args.pipeline and pipeline_elapsed > 0:
+        # A stage near 100% is the bottleneck: reader/writer means I/O-bound, workers CPU-bound.
+        def pct(busy: float, lanes: int = 1) -> str:
+            return f"{min(100.0, 100.0 * busy / (pipeline_elapsed * lanes)):.0f}%"
+
+        log(
+            f"Pipeline occupancy: reader {pct(prefetcher.busy)} "
+            f"({prefetcher.bytes_read / (1024 * 1024):.1f} MiB read ahead), "
+            f"workers {pct(totals.worker_seconds, workers)}, "
+            f"writer {pct(writer.busy) if writer is not None else 'off'}"
+            + (f" (queue full {writer.blocked:.1f}s)" if writer is not None else "")
+        )
+    if not args.no_prefilter:
+        log(
+            f"Prefilter: skipped {totals.chunks_skipped} of {totals.chunks_processed} chunks without parsing; "
+            f"{totals.regions_skipped} regions had no candidate chunks at all"
+        )
+    palette_lookups = totals.palette_cache_hits + totals.palette_cache_misses
+    if palette_lookups:
+        log(
+            f"Palette cache: {totals.palette_cache_hits}/{palette_lookups} hits "
+            f"({100.0 * totals.palette_cache_hits / palette_lookups:.1f}%), "
+            f"largest per-worker size {totals.palette_cache_size}/{matcher.palette_cache_size}"
+        )
+    if totals.slowest_regions:
+        log(
+            "Slowest regions (worker time): "
+            + "; ".join(f"{name} {t:.2f}s ({n} chunks)" for t, name, n in sorted(totals.slowest_regions, reverse=True))
+        )
+    if totals.slowest_chunks:
+
+        def chunk_label(name: str, idx: int) -> str:
+            coords = _chunk_coords(name, idx)
+            return f"{name} #{idx}" + (f" (chunk {coords[0]}, {coords[1]})" if coords else "")
+
+        log(
+            "Slowest chunks: "
+            + "; ".join(f"{chunk_label(name, idx)} {t:.2f}s" for t, name, idx in sorted(totals.slowest_chunks, reverse=True))
+        )
+    if unchanged_regions or totals.chunks_unchanged:
+        log(
+            f"Incremental: skipped {len(unchanged_regions)} unchanged regions and "
+            f"{totals.chunks_unchanged} unchanged chunks in changed regions"
+        )
+    if totals.most_skipped:
+        log(f"Skipped chunks by region (top {len(totals.most_skipped)}):")
+        for _, name, skipped, unchanged, processed in sorted(totals.most_skipped, reverse=True):
+            log(
+                f"  {name}: {skipped} of {processed} chunks skipped by the prefilter"
+                + (f", {unchanged} unchanged since the last run (not read)" if unchanged else "")
+            )
     if args.debug_sample > 0:
-        uniq = list(dict.fromkeys(collected_samples))
+        uniq = list(dict.fromkeys(totals.samples))
         log(f"Sample biome palette entries (up to {args.debug_sample}, unique={len(uniq)}):")
         for s in uniq[: args.debug_sample]:
             log(f"  - {s}")
     if args.dry_run:
         log("Dry-run: no files were modified.")
+    elif output_world is not None:
+        log(f"Output world written to: {output_world} (source world unchanged)")
     return 0
 
 
@@ -0,0 +1,167 @@
+"""
+Backups and undoing a run.
+
+Remaps a small world with each way of keeping backups, then puts it back and
+checks every region is byte-identical to the original.
+
+Run: python -m pytest -q tests
+"""
+
+from __future__ import annotations
+
+import mmap
+from pathlib import Path
+
+import pytest
+
+from worlds import SOURCE, chunk_nbt, core, write_region
+
+
+class _TrackedMap(mmap.mmap):
+    opened: list = []
+
+    def __new__(cls, *args, **kwargs):
+        m = super().__new__(cls, *args, **kwargs)
+        cls.opened.append(m)
+        return m
+
+
+@pytest.fixture
+def tracked_maps(monkeypatch):
+    _TrackedMap.opened = []
+    monkeypatch.setattr(core.mmap, "mmap", _TrackedMap)
+    yield _TrackedMap.opened
+    assert all(m.closed for m in _TrackedMap.opened), "a region was still mapped after its task"
+
+
+def _world(tmp_path: Path) -> Path:
+    region_dir = tmp_path / "world" / "region"
+    region_dir.mkdir(parents=True)
+    write_region(region_dir / "r.0.0.mca", [chunk_nbt(SOURCE if i % 3 else "minecraft:plains") for i in range(20)])
+    write_region(region_dir / "r.1.0.mca", [chunk_nbt("minecraft:plains"), chunk_nbt(SOURCE)])
+    write_region(region_dir / "r.2.0.mca", [chunk_nbt("minecraft:river")])
+    return region_dir.parent
+
+
+def _regions(world: Path) -> dict:
+    return {p.name: p.read_bytes() for p in sorted((world / "region").glob("r.*.*.mca"))}
+
+
+def _run(world: Path, *args: str) -> list:
+    out: list = []
+    argv = [str(world), "--executor", "serial", "--incremental", "off", *args]
+    assert core.run(argv, log=out.append) == 0
+    return out
+
+
+def test_restore_journal_round_trip(tmp_path, tracked_maps):
+    world = _world(tmp_path)
+    original = _regions(world)
+    _run(world, "--backup-method", "delta")
+    assert _regions(world) != original
+    (journal,) = (world / "region").glob(core.DELTA_JOURNAL_PREFIX + "*")
+
+    tracked_maps.clear()
+    _run(world, "--restore-journal", str(journal))
+    assert tracked_maps
+    assert _regions(world) == original
+
+    # Nothing left to restore: no region is written again.
+    mtimes = {p.name: p.stat().st_mtime_ns for p in (world / "region").glob("r.*.*.mca")}
+    _run(world, "--restore-journal", str(journal))
+    assert {p.name: p.stat().st_mtime_ns for p in (world / "region").glob("r.*.*.mca")} == mtimes
+
+
+@pytest.mark.parametrize("method", ["auto", "hardlink", "copy"])
+def test_bak_holds_original(tmp_path, method):
+    world = _world(tmp_path)
+    original = _regions(world)
+    _run(world, "--backup-method", method)
+    changed = {name for name, data in _regions(world).items() if data != original[name]}
+    assert changed
+    for name in changed:
+        assert (world / "region" / f"{name}.bak").read_bytes() == original[name]
+
+
+@pytest.mark.skipif(not hasattr(core.os, "copy_file_range"), reason="needs copy_file_range")
+def test_short_kernel_copy_falls_back(tmp_path, monkeypatch):
+    world = _world(tmp_path)
+    original = _regions(world)
+    real = core.os.copy_file_range
+
+    def short(src, dst, count, offset_src=None, offset_dst=None):
+        # Stop at half the file, like a source that shrank under the copy.
+        half = core.os.fstat(src).st_size // 2
+        if offset_src >= half:
+            return 0
+        return real(src, dst, min(count, half - offset_src), offset_src, offset_dst)
+
+    monkeypatch.setattr(core.os, "copy_file_range", short)
+    monkeypatch.setattr(core.os, "sendfile", lambda *a: 0, raising=False)
+    monkeypatch.setattr(core, "_FICLONE", -1)  # no reflinks, whatever the file system
+    _run(world, "--backup-method", "auto")
+    baks = {p.name[: -len(".bak")]: p.read_bytes() for p in (world / "region").glob("*.mca.bak")}
+    assert baks
+    for name, data in baks.items():
+        assert data == original[name]
+
+
+def _mtimes(world: Path) -> dict:
+    return {p.name: p.stat().st_mtime_ns for p in (world / "region").glob("r.*.*.mca")}
+
+
+def test_restore_from_bak(tmp_path, tracked_maps):
+    world = _world(tmp_path)
+    original = _regions(world)
+    _run(world)
+    remapped = _regions(world)
+    baks = sorted(p.name for p in (world / "region").glob("*.bak"))
+    assert baks and remapped != original
+
+    # A dry run reports the work but writes nothing.
+    mtimes = _mtimes(world)
+    _run(world, "--restore", "--dry-run")
+    assert _regions(world) == remapped and _mtimes(world) == mtimes
+
+    _run(world, "--restore")
+    assert _regions(world) == original
+    assert sorted(p.name for p in (world / "region").glob("*.bak")) == baks
+
+    # Regions that already match their backup are not written again.
+    mtimes = _mtimes(world)
+    _run(world, "--restore")
+    assert _mtimes(world) == mtimes
+
+
+def test_restore_prefers_bak_over_journal(tmp_path, tracked_maps):
+    world = _world(tmp_path)
+    original = _regions(world)
+    _run(world, "--backup-method", "delta")
+    remapped = _regions(world)
+    changed = sorted(name for name in original if remapped[name] != original[name])
+    assert len(changed) >= 2
+    # One region also gets a .bak file, holding a state the journal never saw.
+    other = tmp_path / "other.mca"
+    write_region(other, [chunk_nbt("minecraft:desert")])
+    bak_region = changed[0]
+    (world / "region" / f"{bak_region}.bak").write_bytes(other.read_bytes())
+
+    out = _run(world, "--restore")
+    restored = _regions(world)
+    assert restored[bak_region] == other.read_bytes()
+    for name in changed[1:]:
+        assert restored[name] == original[name]
+    assert any("both a .bak file and journal records: 1" in line for line in out)
+
+
+def test_restore_journal_skips_regions_changed_back(tmp_path, tracked_maps):
+    world = _world(tmp_path)
+    original = _regions(world)
+    _run(world, "--backup-method", "delta")
+    # Put one region back by hand: its chunks match the journal, so it is left alone.
+    name = next(n for n, data in _regions(world).items() if data != original[n])
+    (world / "region" / name).write_bytes(original[name])
+    mtime = (world / "region" / name).stat().st_mtime_ns
+    _run(world, "--restore")
+    assert _regions(world) == original
+    assert (world / "region" / name).stat().st_mtime_ns == mtime
@@ -0,0 +1,54 @@
+"""
+--compress-threads: one codec pool per worker, for thread workers too.
+
+Run: python -m pytest -q tests
+"""
+
+from __future__ import annotations
+
+import gc
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import terralith_biome_remap_standalone as core  # noqa: E402
+
+
+def _codec_threads() -> int:
+    return sum(t.name.startswith("chunk-codec") for t in threading.enumerate())
+
+
+def test_each_worker_thread_gets_its_own_pool():
+    before = _codec_threads()
+    pools = {}
+    barrier = threading.Barrier(3)
+
+    def worker(k: int) -> None:
+        pool = core._codec_pool(2)
+        assert core._codec_pool(2) is pool
+        # Three chunks in flight at once; a single shared pool of two threads would hang here.
+        list(pool.map(lambda _: barrier.wait(timeout=5) if _ == 0 else None, range(2)))
+        pools[k] = (id(pool), pool._max_workers)
+
+    threads = [threading.Thread(target=worker, args=(k,)) for k in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len({pool_id for pool_id, _ in pools.values()}) == 3
+    assert all(n == 2 for _, n in pools.values())
+
+    # Pools of finished worker threads do not leave their threads behind.
+    gc.collect()
+    deadline = time.monotonic() + 5
+    while _codec_threads() > before:
+        assert time.monotonic() < deadline, "codec threads of finished workers are still running"
+        time.sleep(0.01)
+        gc.collect()
+
+
+def test_disabled():
+    assert core._codec_pool(0) is None
@@ -0,0 +1,41 @@
+"""
+--incremental and chunks that fail.
+
+A region whose chunks failed to parse or remap must not be recorded as done in
+the manifest, or the next run would skip it and never retry those chunks.
+
+Run: python -m pytest -q tests
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from worlds import MAPPING, SOURCE, chunk_nbt, core, write_region
+
+
+def _run(world: Path) -> list:
+    out: list = []
+    assert core.run([str(world), "--processes", "1", "--no-backup"], log=out.append) == 0
+    return out
+
+
+def test_region_with_failed_chunk_is_retried(tmp_path):
+    world = tmp_path / "world"
+    region_dir = world / "region"
+    region_dir.mkdir(parents=True)
+    # The broken chunk names a Terralith biome, so the prefilter sends it to the parser.
+    broken = b"\x0a\x00\x00\x09\x00\x08sections\x0a\xff\xff\xff\xff" + SOURCE.encode()
+    write_region(region_dir / "r.0.0.mca", [chunk_nbt(SOURCE), broken])
+    write_region(region_dir / "r.1.0.mca", [chunk_nbt(SOURCE)])
+
+    _run(world)
+    manifest = core._load_manifest(region_dir, core._manifest_key(MAPPING, None, None, None))
+    assert "r.1.0.mca" in manifest
+    assert "r.0.0.mca" not in manifest
+
+    # The next run skips the clean region but reads the one with the failed chunk again.
+    out = _run(world)
+    summary = next(line for line in out if line.startswith("Summary"))
+    assert "regions 1 processed" in summary
+    assert any("r.0.0.mca" in line and "read again next run" in line for line in out)
@@ -0,0 +1,142 @@
+"""
+Crash recovery of --write-mode inplace.
+
+Interrupts _write_region_in_place part way, then checks that the journal rolls
+the region back, and that it refuses to when something else (eg the game)
+wrote to the region after the crash.
+
+Run: python -m pytest -q tests
+"""
+
+from __future__ import annotations
+
+import random
+import struct
+import sys
+import zlib
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import terralith_biome_remap_standalone as core  # noqa: E402
+
+
+class _Crash(Exception):
+    pass
+
+
+class _CrashAfter:
+    """File wrapper that dies after `writes` chunk writes (or at the final flush), like a killed process."""
+
+    def __init__(self, f, writes: int):
+        self._f = f
+        self._left = writes
+
+    def write(self, data) -> int:
+        if len(data) > 8:
+            if self._left == 0:
+                raise _Crash()
+            self._left -= 1
+        return self._f.write(data)
+
+    def flush(self) -> None:
+        raise _Crash()
+
+    def __getattr__(self, name):
+        return getattr(self._f, name)
+
+
+def _blob(rng: random.Random, size: int) -> bytes:
+    payload = zlib.compress(rng.randbytes(size))
+    return struct.pack(">I", len(payload) + 1) + b"\x02" + payload
+
+
+def _region(path: Path, rng: random.Random) -> None:
+    header = bytearray(core.HEADER_BYTES)
+    body = bytearray()
+    sector = 2
+    for idx in range(0, 64, 3):
+        blob = _blob(rng, rng.randint(100, 9000))
+        need = -(-len(blob) // core.SECTOR_BYTES)
+        header[idx * 4 : idx * 4 + 4] = (sector << 8 | need).to_bytes(4, "big")
+        header[core.SECTOR_BYTES + idx * 4 : core.SECTOR_BYTES + idx * 4 + 4] = (1000 + idx).to_bytes(4, "big")
+        body += blob.ljust(need * core.SECTOR_BYTES, b"\0")
+        sector += need
+    path.write_bytes(bytes(header) + bytes(body))
+
+
+def _interrupted_write(path: Path, rng: random.Random, writes: int, monkeypatch) -> None:
+    original = path.read_bytes()
+    # Some chunks shrink and stay put, others grow and move to the end of the file.
+    updated = {idx: (_blob(rng, rng.choice([50, 20000])), True) for idx in range(0, 64, 6)}
+    plan = core._plan_in_place_layout(original, updated)
+    monkeypatch.setattr(core, "_throttled", lambda f, limiter: _CrashAfter(f, writes))
+    with pytest.raises(_Crash):
+        core._write_region_in_place(path, len(original), plan)
+    monkeypatch.undo()
+    assert core._journal_path(path).exists()
+
+
+@pytest.mark.parametrize("writes", [0, 1, 4, 10])
+def test_rollback_restores_original(tmp_path, monkeypatch, writes):
+    rng = random.Random(writes)
+    path = tmp_path / "r.0.0.mca"
+    _region(path, rng)
+    original = path.read_bytes()
+    _interrupted_write(path, rng, writes, monkeypatch)
+    assert core._rollback_region_journal(path)
+    assert path.read_bytes() == original
+    assert not core._journal_path(path).exists()
+
+
+def test_rollback_refused_after_game_saved_chunk(tmp_path, monkeypatch):
+    rng = random.Random(1)
+    path = tmp_path / "r.0.0.mca"
+    _region(path, rng)
+    _interrupted_write(path, rng, 2, monkeypatch)
+    # The game saves chunk 3: new timestamp in the header.
+    with open(path, "r+b") as f:
+        f.seek(core.SECTOR_BYTES + 3 * 4)
+        f.write((999999).to_bytes(4, "big"))
+    before = path.read_bytes()
+    with pytest.raises(ValueError, match="changed after an interrupted in-place write"):
+        core._rollback_region_journal(path)
+    assert path.read_bytes() == before
+    assert core._journal_path(path).exists()
+
+
+def test_rollback_refused_after_sector_rewritten(tmp_path, monkeypatch):
+    rng = random.Random(2)
+    path = tmp_path / "r.0.0.mca"
+    _region(path, rng)
+    _interrupted_write(path, rng, 1, monkeypatch)
+    # Something overwrote a sector the interrupted write was going to use.
+    journal = core._journal_path(path).read_bytes()
+    pos = len(core._JOURNAL_MAGIC)
+    _, n_ranges = struct.unpack_from(">QI", journal, pos)
+    pos += 12
+    offsets = []
+    for _ in range(n_ranges):
+        off, length = core._JOURNAL_RANGE.unpack_from(journal, pos)
+        offsets.append(off)
+        pos += core._JOURNAL_RANGE.size + length
+    with open(path, "r+b") as f:
+        f.seek(offsets[-1])
+        f.write(rng.randbytes(core.SECTOR_BYTES))
+    with pytest.raises(ValueError):
+        core._rollback_region_journal(path)
+    assert core._journal_path(path).exists()
+
+
+def test_finished_write_still_rolls_back(tmp_path, monkeypatch):
+    # Every chunk written, but the journal not yet deleted.
+    rng = random.Random(3)
+    path = tmp_path / "r.0.0.mca"
+    _region(path, rng)
+    original = path.read_bytes()
+    _interrupted_write(path, rng, 1000, monkeypatch)
+    assert path.read_bytes() != original
+    assert core._rollback_region_journal(path)
+    assert path.read_bytes() == original
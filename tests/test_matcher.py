@@ -0,0 +1,137 @@
+"""
+BiomeMatcher: rule kinds, their precedence, the fallback and the caches.
+
+Run: python -m pytest -q tests
+"""
+
+from __future__ import annotations
+
+import pickle
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import terralith_biome_remap_standalone as core  # noqa: E402
+
+RULES = {
+    "terralith:cave/*": "minecraft:dripstone_caves",
+    "terralith:*": "minecraft:plains",
+    "terralith:cave/deep*": "minecraft:deep_dark",
+    "terralith:cave/deep_caves": "minecraft:lush_caves",
+    "^terralith:.*_shore$": "minecraft:beach",
+    "mymod:?ea": "minecraft:ocean",
+    "mymod:*_forest": "minecraft:forest",
+}
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        # An exact id beats every prefix that also matches it.
+        ("terralith:cave/deep_caves", "minecraft:lush_caves"),
+        # The longest matching prefix wins, whatever the file order.
+        ("terralith:cave/deep_ocean", "minecraft:deep_dark"),
+        ("terralith:cave/frozen", "minecraft:dripstone_caves"),
+        ("terralith:moonlight_grove", "minecraft:plains"),
+        # Prefixes come before regex rules, even when the regex matches too.
+        ("terralith:sandy_shore", "minecraft:plains"),
+        # Globs with ? or a * that is not at the end are pattern rules.
+        ("mymod:sea", "minecraft:ocean"),
+        ("mymod:seas", None),
+        ("mymod:birch_forest", "minecraft:forest"),
+        # universal_terralith: ids are matched as terralith: ids.
+        ("universal_terralith:cave/frozen", "minecraft:dripstone_caves"),
+        ("minecraft:plains", None),
+    ],
+)
+def test_rule_precedence(raw, expected):
+    assert core.BiomeMatcher(RULES).resolve(raw) == expected
+
+
+def test_regex_matches_whole_id_in_file_order():
+    matcher = core.BiomeMatcher(
+        {"^terralith:.*_shore$": "minecraft:beach", "^terralith:stony_.*": "minecraft:stony_shore"}
+    )
+    assert matcher.resolve("terralith:stony_shore") == "minecraft:beach"
+    assert matcher.resolve("terralith:stony_peaks") == "minecraft:stony_shore"
+    assert matcher.resolve("terralith:stony_shore_2") == "minecraft:stony_shore"
+    assert matcher.resolve("xterralith:sandy_shore") is None
+
+
+def test_fallback_only_for_unmapped_terralith_ids():
+    matcher = core.BiomeMatcher({"terralith:a": "minecraft:forest"}, "minecraft:plains")
+    assert matcher.resolve("terralith:a") == "minecraft:forest"
+    assert matcher.resolve("terralith:b") == "minecraft:plains"
+    assert matcher.resolve("universal_terralith:b") == "minecraft:plains"
+    assert matcher.resolve("mymod:b") is None
+    assert core.BiomeMatcher({"terralith:a": "minecraft:forest"}).resolve("terralith:b") is None
+
+
+def test_mapping_to_itself_is_no_change():
+    matcher = core.BiomeMatcher({"terralith:*": "minecraft:plains"})
+    assert matcher.resolve("minecraft:plains") is None
+    assert core.BiomeMatcher({"minecraft:plains": "minecraft:plains"}).resolve("minecraft:plains") is None
+
+
+def test_invalid_regex_is_rejected():
+    with pytest.raises(ValueError, match="Invalid regex mapping rule"):
+        core.BiomeMatcher({"^terralith:(": "minecraft:plains"})
+
+
+def test_prefilter_needles():
+    assert sorted(core.BiomeMatcher({"terralith:a": "x:y", "mymod:*": "x:z"}).prefilter_needles()) == [
+        "mymod:",
+        "terralith:a",
+    ]
+    assert "terralith:" in core.BiomeMatcher({"terralith:a": "x:y"}, "minecraft:plains").prefilter_needles()
+    # Pattern rules and a bare "*" can match any id, so no chunk can be ruled out.
+    assert core.BiomeMatcher({"^.*$": "x:y"}).prefilter_needles() is None
+    assert core.BiomeMatcher({"*": "x:y"}).prefilter_needles() is None
+
+
+def test_palette_cache_hits_and_bound():
+    matcher = core.BiomeMatcher({"terralith:a": "minecraft:forest"}, palette_cache_size=2)
+    first = matcher.remap_palette(("terralith:a", "minecraft:plains"))
+    assert first == (("minecraft:forest", None), 1)
+    assert matcher.remap_palette(("terralith:a", "minecraft:plains")) == first
+    assert (matcher.palette_hits, matcher.palette_misses) == (1, 1)
+
+    matcher.remap_palette(("minecraft:river",))
+    matcher.remap_palette(("terralith:a",))
+    assert matcher.palette_cache_len() == 2
+    # Least recently used goes first: the first palette has to be resolved again.
+    matcher.remap_palette(("terralith:a", "minecraft:plains"))
+    assert (matcher.palette_hits, matcher.palette_misses) == (1, 4)
+    matcher.remap_palette(("terralith:a",))
+    assert matcher.palette_hits == 2
+
+
+def test_palette_cache_disabled():
+    matcher = core.BiomeMatcher({"terralith:a": "minecraft:forest"}, palette_cache_size=0)
+    for _ in range(3):
+        assert matcher.remap_palette(("terralith:a",)) == (("minecraft:forest",), 1)
+    assert matcher.palette_cache_len() == 0
+    assert (matcher.palette_hits, matcher.palette_misses) == (0, 3)
+
+
+def test_resolve_cache_bound():
+    matcher = core.BiomeMatcher({"terralith:*": "minecraft:plains"}, cache_size=4)
+    for i in range(10):
+        assert matcher.resolve(f"terralith:b{i}") == "minecraft:plains"
+        assert len(matcher._cache) <= 4
+
+
+def test_pickled_and_copied_matchers_keep_rules():
+    matcher = core.BiomeMatcher(RULES, "minecraft:plains", palette_cache_size=7)
+    matcher.remap_palette(("terralith:a",))
+    clone = pickle.loads(pickle.dumps(matcher))
+    assert clone.rules == matcher.rules
+    assert clone.unmapped_terralith_to == "minecraft:plains"
+    assert clone.palette_cache_size == 7
+    for raw in ("terralith:cave/deep_caves", "mymod:sea", "terralith:zzz", "minecraft:plains"):
+        assert clone.resolve(raw) == matcher.resolve(raw)
+    copy = matcher.copy()
+    assert copy.palette_cache_len() == 0 and copy.palette_hits == 0
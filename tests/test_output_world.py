@@ -0,0 +1,46 @@
+"""
+--output-world with a region folder that is a symlink.
+
+The region folder of a world may be a link to another drive. --output-world
+has to accept that and write the remapped regions into <output>/region.
+
+Run: python -m pytest -q tests
+"""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from worlds import MAPPING, SOURCE, chunk_nbt, core, region_biomes, write_region
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="needs symlinks")
+def test_symlinked_region_folder(tmp_path):
+    elsewhere = tmp_path / "other-drive" / "region"
+    elsewhere.mkdir(parents=True)
+    write_region(elsewhere / "r.0.0.mca", [chunk_nbt(SOURCE), chunk_nbt("minecraft:plains")])
+    world = tmp_path / "world"
+    world.mkdir()
+    (world / "level.dat").write_bytes(b"level")
+    try:
+        (world / "region").symlink_to(elsewhere, target_is_directory=True)
+    except OSError:
+        pytest.skip("cannot create symlinks here")
+    before = (elsewhere / "r.0.0.mca").read_bytes()
+    out = tmp_path / "out"
+
+    assert core.run([str(world), "--processes", "1", "--output-world", str(out)], log=lambda _: None) == 0
+
+    assert (elsewhere / "r.0.0.mca").read_bytes() == before
+    assert (out / "level.dat").read_bytes() == b"level"
+    assert region_biomes(out / "region" / "r.0.0.mca") == [MAPPING[SOURCE], "minecraft:plains"]
+
+
+def test_output_inside_world_is_refused(tmp_path):
+    world = tmp_path / "world"
+    (world / "region").mkdir(parents=True)
+    write_region(world / "region" / "r.0.0.mca", [chunk_nbt(SOURCE)])
+    with pytest.raises(SystemExit, match="outside the world folder"):
+        core.run([str(world), "--output-world", str(world / "remapped")], log=lambda _: None)
@@ -0,0 +1,61 @@
+"""
+--max-read-mbps charges chunk reads before they happen.
+
+Region files are memory mapped, so slicing out a chunk is the disk read. With
+--compress-threads, chunks ahead of the one being remapped are read early for
+decompression; they must be paid for before that, not when the loop gets to them.
+
+Run: python -m pytest -q tests
+"""
+
+from __future__ import annotations
+
+from worlds import MAPPING, SOURCE, chunk_nbt, core, write_region
+
+
+class _Recorder:
+    def __init__(self, events: list):
+        self.events = events
+
+    def consume(self, n: int) -> None:
+        self.events.append(("charge", n))
+
+
+def test_chunks_charged_before_read(tmp_path, monkeypatch):
+    path = tmp_path / "r.0.0.mca"
+    write_region(path, [chunk_nbt(SOURCE if i % 2 else "minecraft:plains") for i in range(12)])
+    events: list = []
+    get_blob = core._get_chunk_blob
+
+    def recording_get_blob(original, off_sectors, sector_count):
+        events.append(("read", sector_count * core.SECTOR_BYTES))
+        return get_blob(original, off_sectors, sector_count)
+
+    monkeypatch.setattr(core, "_get_chunk_blob", recording_get_blob)
+    with core._map_region(path) as original:
+        result, _ = core._remap_region_chunks(
+            path, original, None, core.BiomeMatcher(MAPPING), None, None, None,
+            0, 0, 0, True, False, True, compress_threads=2, read_limiter=_Recorder(events),
+        )
+    assert result.chunks_processed == 12
+    reads = [i for i, (kind, _) in enumerate(events) if kind == "read"]
+    assert len(reads) == 12
+    for i in reads:
+        assert events[i - 1] == ("charge", events[i][1])
+    assert sum(n for kind, n in events if kind == "charge") == result.bytes_read
+
+
+def test_pipeline_workers_charged_for_regions_not_prefetched(tmp_path, monkeypatch):
+    region_dir = tmp_path / "world" / "region"
+    region_dir.mkdir(parents=True)
+    for x in range(4):
+        write_region(region_dir / f"r.{x}.0.mca", [chunk_nbt(SOURCE) for _ in range(8)])
+    total = sum(p.stat().st_size for p in region_dir.glob("*.mca"))
+    charged: list = []
+    # A reader thread that never gets to any region, like one held back by a low cap.
+    monkeypatch.setattr(core._RegionPrefetcher, "run", lambda self: None)
+    monkeypatch.setattr(core.RateLimiter, "consume", lambda self, n: charged.append(n))
+    argv = [str(tmp_path / "world"), "--pipeline", "--max-read-mbps", "5", "--executor", "thread", "--no-backup"]
+    assert core.run(argv, log=lambda _: None) == 0
+    # No write limit is set, so every charge is a read; the workers read every region.
+    assert sum(charged) >= total
@@ -0,0 +1,51 @@
+"""
+_iter_bounded: the in-flight window, per-group limits and the jobs queued behind them.
+
+Run: python -m pytest -q tests
+"""
+
+from __future__ import annotations
+
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import terralith_biome_remap_standalone as core  # noqa: E402
+
+
+def _run(tags, window, group=None, group_limits=None):
+    pulled = 0
+    most_queued = 0
+    done = []
+
+    def jobs():
+        nonlocal pulled
+        for tag in tags:
+            pulled += 1
+            yield (lambda t: t), (tag,), tag
+
+    with ThreadPoolExecutor(4) as ex:
+        for fut, tag in core._iter_bounded(ex, jobs(), window, group=group, group_limits=group_limits):
+            most_queued = max(most_queued, pulled - len(done))
+            assert fut.result() == tag
+            done.append(tag)
+    return done, most_queued
+
+
+def test_every_job_runs_once():
+    tags = [("hdd" if i % 3 else "ssd", i) for i in range(50)]
+    done, _ = _run(tags, 4, group=lambda t: t[0], group_limits={"hdd": 1})
+    assert sorted(done) == sorted(tags)
+
+
+def test_jobs_waiting_on_a_capped_group_are_bounded():
+    # Every region on one spinning disk capped at one task: the rest of the task list
+    # must not be pulled into the group's queue all at once.
+    tags = [("hdd", i) for i in range(200)]
+    window = 4
+    done, most_queued = _run(tags, window, group=lambda t: t[0], group_limits={"hdd": 1})
+    assert done == tags
+    # One in flight, at most `window` waiting behind it.
+    assert most_queued <= window + 1
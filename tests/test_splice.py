@@ -0,0 +1,131 @@
+"""
+Byte splice vs nbtlib round-trip.
+
+Builds chunks in memory and checks that patching palette strings in the raw NBT
+(_scan_chunk_biomes -> _plan_palette_edits -> _splice_palette_edits) decodes to
+the same tree as the reference full parse/remap/write (_remap_raw_nbt_with_nbtlib).
+
+Run: python -m pytest -q tests
+"""
+
+from __future__ import annotations
+
+import io
+import random
+import sys
+from pathlib import Path
+
+import nbtlib
+import pytest
+from nbtlib import Byte, Compound, Int, List, Long, LongArray, String
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import terralith_biome_remap_standalone as core  # noqa: E402
+
+MAPPING = core._load_mapping_from_ini_text(core.DEFAULT_MAPPING_INI_TEXT)
+TERRALITH = sorted(MAPPING)
+VANILLA = ["minecraft:plains", "minecraft:river", "minecraft:ocean", "minecraft:forest"]
+# Ids the mapping does not know; only --unmapped-terralith-to rewrites them.
+UNKNOWN = ["terralith:not_in_mapping", "universal_terralith:also_not_in_mapping"]
+
+
+def _biome_id(rng: random.Random) -> str:
+    roll = rng.random()
+    if roll < 0.35:
+        return rng.choice(TERRALITH)
+    if roll < 0.55:
+        return rng.choice(TERRALITH).replace("terralith:", "universal_terralith:", 1)
+    if roll < 0.65:
+        return rng.choice(UNKNOWN)
+    return rng.choice(VANILLA)
+
+
+def _section(rng: random.Random, y: int) -> Compound:
+    # Palettes of 1 to 6 entries, so edits both grow and shrink the strings around them.
+    palette = List[String]([String(_biome_id(rng)) for _ in range(rng.randint(1, 6))])
+    biomes = Compound({"palette": palette})
+    if len(palette) > 1:
+        biomes["data"] = LongArray([rng.getrandbits(63) for _ in range(rng.randint(1, 4))])
+    return Compound(
+        {
+            "Y": Byte(y),
+            "block_states": Compound({"palette": List[Compound]([Compound({"Name": String("minecraft:stone")})])}),
+            "biomes": biomes,
+        }
+    )
+
+
+def _chunk(rng: random.Random, old_layout: bool = False) -> bytes:
+    sections = List[Compound]([_section(rng, y) for y in range(-4, rng.randint(-3, 20))])
+    if old_layout:
+        root = Compound({"DataVersion": Int(2975), "Level": Compound({"xPos": Int(0), "Sections": sections})})
+    else:
+        root = Compound(
+            {
+                "DataVersion": Int(3700),
+                "xPos": Int(0),
+                "zPos": Int(0),
+                "Status": String("minecraft:full"),
+                "sections": sections,
+                "LastUpdate": Long(1),
+            }
+        )
+    buf = io.BytesIO()
+    nbtlib.File(root, gzipped=False, byteorder="big").write(buf)
+    return buf.getvalue()
+
+
+def _parse(raw: bytes):
+    return nbtlib.File.parse(io.BytesIO(raw), byteorder="big")
+
+
+def _splice(raw: bytes, matcher: core.BiomeMatcher, y_min, y_max, unmapped) -> bytes:
+    edits = core._plan_palette_edits(core._scan_chunk_biomes(raw), matcher, y_min, y_max, unmapped, [], 0)
+    return core._splice_palette_edits(raw, edits)
+
+
+@pytest.mark.parametrize("unmapped", [None, "minecraft:plains"])
+@pytest.mark.parametrize("y_range", [(None, None), (0, 63)])
+@pytest.mark.parametrize("old_layout", [False, True])
+def test_splice_matches_nbtlib_round_trip(unmapped, y_range, old_layout):
+    rng = random.Random(f"{unmapped}-{y_range}-{old_layout}")
+    y_min, y_max = y_range
+    matcher = core.BiomeMatcher(MAPPING, unmapped)
+    changed = 0
+    for _ in range(40):
+        raw = _chunk(rng, old_layout)
+        spliced = _splice(raw, matcher, y_min, y_max, unmapped)
+        reference, entries = core._remap_raw_nbt_with_nbtlib(raw, matcher, y_min, y_max, unmapped)
+        assert _parse(spliced) == _parse(reference)
+        if entries:
+            changed += 1
+            assert spliced != raw
+    # The corpus has to exercise the splice, not only chunks without edits.
+    assert changed > 10
+
+
+def test_universal_terralith_ids_are_rewritten():
+    matcher = core.BiomeMatcher(MAPPING)
+    source = TERRALITH[0]
+    root = Compound(
+        {
+            "DataVersion": Int(3700),
+            "sections": List[Compound](
+                [
+                    Compound(
+                        {
+                            "Y": Byte(0),
+                            "biomes": Compound(
+                                {"palette": List[String]([String(source.replace("terralith:", "universal_terralith:", 1))])}
+                            ),
+                        }
+                    )
+                ]
+            ),
+        }
+    )
+    buf = io.BytesIO()
+    nbtlib.File(root, gzipped=False, byteorder="big").write(buf)
+    spliced = _parse(_splice(buf.getvalue(), matcher, None, None, None))
+    assert str(spliced["sections"][0]["biomes"]["palette"][0]) == MAPPING[source]
@@ -0,0 +1,71 @@
+"""
+Regions split into chunk-range tasks.
+
+A region far denser than the rest is remapped by several workers at once, each
+taking a range of chunk indices, and the main process writes it once every
+range is back. The result has to be the same file as remapping it whole.
+
+Run: python -m pytest -q tests
+"""
+
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+
+import pytest
+
+from worlds import SOURCE, chunk_nbt, core, write_region
+
+
+@pytest.mark.parametrize(
+    "indices, parts",
+    [
+        (list(range(0, 1024, 3)), 4),
+        ([0, 1, 2, 900, 901, 1023], 3),
+        ([5], 4),
+        (list(range(100)), 1),
+    ],
+)
+def test_split_chunk_ranges_cover_every_chunk_once(indices, parts):
+    ranges = core._split_chunk_ranges(indices, parts)
+    assert 1 <= len(ranges) <= parts
+    assert ranges[0][0] == 0 and ranges[-1][1] == 1024
+    assert all(lo < hi for lo, hi in ranges)
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+    counts = [sum(lo <= i < hi for i in indices) for lo, hi in ranges]
+    assert sum(counts) == len(indices)
+    assert max(counts) - min(counts) <= max(1, len(indices) // parts)
+
+
+def _world(root: Path) -> Path:
+    region_dir = root / "region"
+    region_dir.mkdir(parents=True)
+    biomes = [SOURCE, "minecraft:plains", "universal_" + SOURCE, "minecraft:river"]
+    write_region(region_dir / "r.0.0.mca", [chunk_nbt(biomes[i % 4]) for i in range(300)])
+    write_region(region_dir / "r.1.0.mca", [chunk_nbt(SOURCE), chunk_nbt("minecraft:plains")])
+    return root
+
+
+def _remap(world: Path, *args: str) -> dict:
+    out: list = []
+    argv = [str(world), "--executor", "thread", "--processes", "4", "--incremental", "off", "--no-backup", *args]
+    assert core.run(argv, log=out.append) == 0
+    return {p.name: p.read_bytes() for p in sorted((world / "region").glob("r.*.*.mca"))}, out
+
+
+@pytest.mark.parametrize("extra", [[], ["--pipeline"], ["--write-mode", "inplace"]])
+def test_split_region_matches_unsplit_run(tmp_path, monkeypatch, extra):
+    # Rewritten chunks get the current time as their timestamp; pin it so runs compare byte for byte.
+    monkeypatch.setattr(core.time, "time", lambda: 1_700_000_000.0)
+    whole = _world(tmp_path / "whole")
+    split = tmp_path / "split"
+    shutil.copytree(whole, split)
+    assert core._plan_chunk_range_tasks(sorted((split / "region").glob("*.mca")), 4)
+
+    expected, _ = _remap(whole, "--split-regions", "off", *extra)
+    got, out = _remap(split, "--split-regions", "auto", *extra)
+    assert "Chunk-range tasks: 1 large regions split into 4 tasks" in out
+    assert got == expected
+    summary = next(line for line in out if line.startswith("Summary"))
+    assert "chunks 302 processed, 151 changed" in summary
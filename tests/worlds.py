@@ -0,0 +1,58 @@
+"""Small synthetic worlds for the tests."""
+
+from __future__ import annotations
+
+import io
+import struct
+import sys
+import zlib
+from pathlib import Path
+from typing import Sequence
+
+import nbtlib
+from nbtlib import Byte, Compound, Int, List, String
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import terralith_biome_remap_standalone as core  # noqa: E402
+
+MAPPING = core._load_mapping_from_ini_text(core.DEFAULT_MAPPING_INI_TEXT)
+SOURCE = sorted(MAPPING)[0]
+
+
+def chunk_nbt(biome: str) -> bytes:
+    """Uncompressed NBT of a one-section chunk whose biome palette is just `biome`."""
+    section = Compound({"Y": Byte(0), "biomes": Compound({"palette": List[String]([String(biome)])})})
+    root = Compound({"DataVersion": Int(3700), "sections": List[Compound]([section])})
+    buf = io.BytesIO()
+    nbtlib.File(root, gzipped=False, byteorder="big").write(buf)
+    return buf.getvalue()
+
+
+def write_region(path: Path, chunks: Sequence[bytes]) -> None:
+    """Write a region file holding the given raw NBT chunks, zlib compressed, at indices 0, 1, ..."""
+    header = bytearray(core.HEADER_BYTES)
+    body = bytearray()
+    sector = 2
+    for idx, raw in enumerate(chunks):
+        payload = zlib.compress(raw)
+        blob = struct.pack(">I", len(payload) + 1) + b"\x02" + payload
+        need = -(-len(blob) // core.SECTOR_BYTES)
+        header[idx * 4 : idx * 4 + 4] = (sector << 8 | need).to_bytes(4, "big")
+        header[core.SECTOR_BYTES + idx * 4 : core.SECTOR_BYTES + idx * 4 + 4] = (1000 + idx).to_bytes(4, "big")
+        body += blob.ljust(need * core.SECTOR_BYTES, b"\0")
+        sector += need
+    path.write_bytes(bytes(header) + bytes(body))
+
+
+def region_biomes(path: Path) -> list:
+    """First palette entry of every chunk of a region, in index order."""
+    data = path.read_bytes()
+    out = []
+    for ptr in core._iter_present_chunks(data):
+        start = ptr.off_sectors * core.SECTOR_BYTES
+        length = struct.unpack_from(">I", data, start)[0]
+        raw = zlib.decompress(data[start + 5 : start + 4 + length])
+        root = nbtlib.File.parse(io.BytesIO(raw), byteorder="big")
+        out.append(str(root["sections"][0]["biomes"]["palette"][0]))
+    return out